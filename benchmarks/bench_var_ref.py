@@ -0,0 +1,116 @@
+"""变量引用查找的微基准。
+
+模拟循环密集型工作流：每一步都要解析节点 inputs/params 中的若干变量引用，
+对比历史的逐次字符串解析与 VarRef 编译缓存两种查找方式的耗时。
+
+用法：
+    python benchmarks/bench_var_ref.py --iterations 5000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from weboter.core.engine.runtime import DataContext  # noqa: E402
+from weboter.public.model.var_ref import VarRef, var_ref_cache_info  # noqa: E402
+
+
+# 一个典型循环节点每一步需要解析的变量引用
+STEP_KEYS = [
+    "$flow{loop.index}",
+    "$flow{loop.items}",
+    "$global{{current_page}}",
+    "$global{{__browser__}}",
+    "$global{{__pw_inst__}}",
+    "$prev_outputs{value}",
+    "$flow{user.profile.name}",
+    "$env{HOME}",
+]
+
+
+def legacy_get(data: dict, key: str):
+    # 与 VarRef 引入之前 DataContext.get_data 的实现保持一致
+    if not key.startswith('$'):
+        raise KeyError(key)
+    if '{' not in key or '}' not in key:
+        raise KeyError(key)
+    prefix_end = key.index('{')
+    suffix_start = key.index('}')
+    prefix = key[1:prefix_end]
+    var_name = key[prefix_end + 1:suffix_start]
+    if prefix not in data:
+        raise KeyError(prefix)
+    value = data[prefix]
+    for part in var_name.split('.'):
+        if part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def build_context() -> DataContext:
+    ctx = DataContext()
+    ctx.set_data("$flow{loop.index}", 0)
+    ctx.set_data("$flow{loop.items}", list(range(100)))
+    ctx.set_data("$flow{user.profile.name}", "alice")
+    ctx.set_data("$global{{current_page}}", object())
+    ctx.set_data("$global{{__browser__}}", object())
+    ctx.set_data("$global{{__pw_inst__}}", object())
+    ctx.set_data("$prev_outputs{value}", 1)
+    ctx.set_data("$env{HOME}", "/root")
+    return ctx
+
+
+def bench(label: str, func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    per_step_us = elapsed / iterations * 1e6
+    print(f"{label:<28} total={elapsed * 1000:9.2f} ms  per_step={per_step_us:7.3f} us")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VarRef lookup micro-benchmark")
+    parser.add_argument("--iterations", type=int, default=5000, help="模拟的循环迭代次数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最好成绩")
+    args = parser.parse_args()
+
+    ctx = build_context()
+    data = ctx.data
+    refs = [VarRef.parse(key) for key in STEP_KEYS]
+
+    def legacy_step():
+        for key in STEP_KEYS:
+            legacy_get(data, key)
+
+    def cached_step():
+        for key in STEP_KEYS:
+            ctx.get_data(key)
+
+    def compiled_step():
+        for ref in refs:
+            ctx.get_ref(ref)
+
+    print(f"iterations={args.iterations} keys_per_step={len(STEP_KEYS)}")
+    results = {}
+    for label, func in (
+        ("legacy string parse", legacy_step),
+        ("get_data (LRU cached)", cached_step),
+        ("get_ref (precompiled)", compiled_step),
+    ):
+        results[label] = min(bench(label, func, args.iterations) for _ in range(args.repeat))
+
+    baseline = results["legacy string parse"]
+    print()
+    for label, elapsed in results.items():
+        print(f"{label:<28} speedup={baseline / elapsed:5.2f}x")
+    print(f"cache: {var_ref_cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
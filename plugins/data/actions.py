@@ -72,6 +72,7 @@ def _resolve_json_path(data: Any, path: str) -> Any:
 class JsonParse(ActionBase):
     name: str = "JsonParse"
     description: str = "将 JSON 字符串解析为对象"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         InputFieldDeclaration(
             name="text",
@@ -92,6 +93,7 @@ class JsonParse(ActionBase):
 class JsonStringify(ActionBase):
     name: str = "JsonStringify"
     description: str = "将对象序列化为 JSON 字符串"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         InputFieldDeclaration(
             name="data",
@@ -133,6 +135,7 @@ class JsonStringify(ActionBase):
 class JsonGetPath(ActionBase):
     name: str = "JsonGetPath"
     description: str = "从 JSON 对象中按路径提取字段，支持 a.b[0].c"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         InputFieldDeclaration(
             name="data",
@@ -187,6 +190,7 @@ class JsonGetPath(ActionBase):
 class RegexExtract(ActionBase):
     name: str = "RegexExtract"
     description: str = "使用正则表达式提取文本，支持单个或全部匹配"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         InputFieldDeclaration(name="text", description="输入文本", required=True, accepted_types=["string"]),
         InputFieldDeclaration(name="pattern", description="正则表达式", required=True, accepted_types=["string"]),
@@ -258,6 +262,7 @@ class RegexExtract(ActionBase):
 class Base64Encode(ActionBase):
     name: str = "Base64Encode"
     description: str = "将字符串进行 Base64 编码"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         InputFieldDeclaration(name="text", description="原始文本", required=True, accepted_types=["string"]),
         InputFieldDeclaration(
@@ -281,6 +286,7 @@ class Base64Encode(ActionBase):
 class Base64Decode(ActionBase):
     name: str = "Base64Decode"
     description: str = "将 Base64 字符串解码为文本"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         InputFieldDeclaration(name="base64", description="Base64 字符串", required=True, accepted_types=["string"]),
         InputFieldDeclaration(
@@ -304,6 +310,7 @@ class Base64Decode(ActionBase):
 class DictMerge(ActionBase):
     name: str = "DictMerge"
     description: str = "合并多个 dict，后者覆盖前者同名 key"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         InputFieldDeclaration(
             name="items",
@@ -331,6 +338,7 @@ class DictMerge(ActionBase):
 class ListUnique(ActionBase):
     name: str = "ListUnique"
     description: str = "列表去重并保持原有顺序"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         InputFieldDeclaration(name="items", description="原始列表", required=True, accepted_types=["list"])
     ]
@@ -180,6 +180,7 @@ class HttpRequest(ActionBase):
 
     name: str = "HttpRequest"
     description: str = "发起任意方法的 HTTP 请求（GET/POST/PUT/DELETE/PATCH/HEAD 等）"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         InputFieldDeclaration(
             name="method",
@@ -221,6 +222,8 @@ class HttpGet(ActionBase):
 
     name: str = "HttpGet"
     description: str = "发起 HTTP GET 请求"
+    touches_page: bool = False
+    cacheable: bool = True
     inputs: list[InputFieldDeclaration] = [
         *_COMMON_INPUTS,
         InputFieldDeclaration(
@@ -243,12 +246,17 @@ class HttpGet(ActionBase):
         result = _do_request("GET", url, headers, None, timeout)
         _set_outputs(io, result)
 
+    def should_cache(self, outputs: dict) -> bool:
+        # 只缓存成功响应，失败响应下次仍需重新请求
+        return bool(outputs.get("ok"))
+
 
 class HttpPost(ActionBase):
     """发起 HTTP POST 请求。"""
 
     name: str = "HttpPost"
     description: str = "发起 HTTP POST 请求，支持 JSON body、表单或原始 body"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         *_COMMON_INPUTS,
         *_BODY_INPUTS,
@@ -268,6 +276,7 @@ class HttpPut(ActionBase):
 
     name: str = "HttpPut"
     description: str = "发起 HTTP PUT 请求，支持 JSON body、表单或原始 body"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         *_COMMON_INPUTS,
         *_BODY_INPUTS,
@@ -287,6 +296,7 @@ class HttpDelete(ActionBase):
 
     name: str = "HttpDelete"
     description: str = "发起 HTTP DELETE 请求"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         *_COMMON_INPUTS,
         *_BODY_INPUTS,
@@ -306,6 +316,7 @@ class HttpPatch(ActionBase):
 
     name: str = "HttpPatch"
     description: str = "发起 HTTP PATCH 请求，支持 JSON body、表单或原始 body"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         *_COMMON_INPUTS,
         *_BODY_INPUTS,
@@ -325,6 +336,7 @@ class HttpHead(ActionBase):
 
     name: str = "HttpHead"
     description: str = "发起 HTTP HEAD 请求，只返回响应头"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = _COMMON_INPUTS
     outputs: list[OutputFieldDeclaration] = [
         OutputFieldDeclaration(name="status_code", description="HTTP 状态码", type="int"),
@@ -0,0 +1,135 @@
+import asyncio
+import sys
+import types
+import unittest
+from unittest import mock
+
+
+if "playwright.async_api" not in sys.modules:
+    async_api_module = types.ModuleType("playwright.async_api")
+
+    class _StubPlaywright:
+        pass
+
+    class _StubBrowser:
+        pass
+
+    class _StubBrowserContext:
+        pass
+
+    class _StubPage:
+        pass
+
+    class _StubLocator:
+        pass
+
+    async_api_module.Playwright = _StubPlaywright
+    async_api_module.Browser = _StubBrowser
+    async_api_module.BrowserContext = _StubBrowserContext
+    async_api_module.Page = _StubPage
+    async_api_module.Locator = _StubLocator
+
+    playwright_module = types.ModuleType("playwright")
+    playwright_module.async_api = async_api_module
+    sys.modules["playwright"] = playwright_module
+    sys.modules["playwright.async_api"] = async_api_module
+
+from weboter.app import browser_pool as browser_pool_module
+from weboter.app.browser_pool import BrowserPool
+
+
+class _FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeBrowser:
+    def __init__(self):
+        self.closed = False
+        self.contexts = []
+
+    def is_connected(self):
+        return not self.closed
+
+    async def new_context(self):
+        context = _FakeContext()
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeBrowserType:
+    def __init__(self, launched):
+        self.launched = launched
+
+    async def launch(self, headless=True):
+        browser = _FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+
+class _FakePlaywright:
+    def __init__(self):
+        self.launched = []
+        self.chromium = _FakeBrowserType(self.launched)
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        pass
+
+
+class BrowserPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.playwright = _FakePlaywright()
+        patcher = mock.patch.object(browser_pool_module.pw, "async_playwright", lambda: self.playwright, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_leases_reuse_warm_browser_and_recycle(self):
+        pool = BrowserPool(workers=1, size=1, recycle_after=2)
+        self.addCleanup(pool.close)
+
+        async def open_context():
+            lease = await pool.lease("chromium")
+            return lease.browser, lease.context
+
+        first_browser, first_context = pool.run(open_context)
+        second_browser, _ = pool.run(open_context)
+        third_browser, _ = pool.run(open_context)
+
+        # 任务结束时 context 被归还；同一浏览器复用到 recycle_after 次后被替换
+        self.assertTrue(first_context.closed)
+        self.assertIs(first_browser, second_browser)
+        self.assertTrue(first_browser.closed)
+        self.assertIsNot(third_browser, first_browser)
+        self.assertFalse(third_browser.closed)
+
+    def test_lease_outside_pooled_task_is_rejected(self):
+        pool = BrowserPool(workers=1, size=0)
+        self.addCleanup(pool.close)
+
+        with self.assertRaisesRegex(RuntimeError, "pooled task"):
+            asyncio.run(pool.lease("chromium"))
+
+    def test_concurrent_leases_respect_context_cap(self):
+        pool = BrowserPool(workers=1, size=1, max_contexts_per_browser=2, recycle_after=0)
+        self.addCleanup(pool.close)
+
+        async def open_contexts():
+            leases = await asyncio.gather(*(pool.lease("chromium") for _ in range(3)))
+            return [lease.browser for lease in leases]
+
+        browsers = pool.run(open_contexts)
+
+        # 前两个 context 共用预热浏览器，第三个超过上限时临时启动新浏览器；任务结束后池内只保留 size 个
+        self.assertIs(browsers[0], browsers[1])
+        self.assertIsNot(browsers[2], browsers[0])
+        self.assertEqual(len(self.playwright.launched), 2)
+        self.assertEqual(sum(not browser.closed for browser in self.playwright.launched), 1)
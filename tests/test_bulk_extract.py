@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import sys
+import types
+import unittest
+
+
+if "playwright.async_api" not in sys.modules:
+    async_api_module = types.ModuleType("playwright.async_api")
+
+    class _StubPlaywright:
+        pass
+
+    class _StubBrowser:
+        pass
+
+    class _StubBrowserContext:
+        pass
+
+    class _StubPage:
+        pass
+
+    class _StubLocator:
+        pass
+
+    async_api_module.Playwright = _StubPlaywright
+    async_api_module.Browser = _StubBrowser
+    async_api_module.BrowserContext = _StubBrowserContext
+    async_api_module.Page = _StubPage
+    async_api_module.Locator = _StubLocator
+    playwright_module = types.ModuleType("playwright")
+    playwright_module.async_api = async_api_module
+    sys.modules["playwright"] = playwright_module
+    sys.modules["playwright.async_api"] = async_api_module
+
+import playwright.async_api as pw
+
+if not hasattr(pw, "TimeoutError"):
+    pw.TimeoutError = type("TimeoutError", (Exception,), {})
+
+from weboter.builtin.basic_action import ExtractList
+from weboter.public.contracts.io_pipe import IOPipe
+
+
+class _FakeRows:
+    def __init__(self, owner, selector):
+        self.owner = owner
+        self.selector = selector
+        self.first = self
+
+    async def wait_for(self, state=None, timeout=None):
+        self.owner.waits += 1
+        if self.owner.empty:
+            raise pw.TimeoutError("waiting for locator to be attached")
+
+    async def evaluate_all(self, expression, arg):
+        self.owner.evaluations.append(arg)
+        return [{"title": "a"}, {"title": "b"}]
+
+
+class _FakePage(pw.Page):
+    def __init__(self, empty=False):
+        self.empty = empty
+        self.waits = 0
+        self.evaluations = []
+        self.selectors = []
+
+    def locator(self, selector):
+        self.selectors.append(selector)
+        return _FakeRows(self, selector)
+
+
+class _ActionIO(IOPipe):
+    def __init__(self):
+        super().__init__()
+        self._cur_node = "node_a"
+        self._flow_data = {}
+
+    @property
+    def cur_node(self) -> str:
+        return self._cur_node
+
+    @property
+    def flow_data(self) -> dict:
+        return self._flow_data
+
+    @flow_data.setter
+    def flow_data(self, value: dict):
+        self._flow_data = value
+
+
+class ExtractListTests(unittest.TestCase):
+    def test_rows_are_extracted_with_one_evaluate_call(self):
+        page = _FakePage()
+        io = _ActionIO()
+        io.page = page
+        io.logger = logging.getLogger("test.extract")
+        io.inputs.update({
+            "row_locator": {"element": "table tr.item", "type": "css"},
+            "fields": {"title": "td.title", "link": {"selector": "a", "source": "attr:href"}, "row_html": {"source": "html"}},
+            "limit": 50,
+        })
+
+        asyncio.run(ExtractList().execute(io))
+
+        self.assertEqual(io.outputs["count"], 2)
+        self.assertEqual((page.selectors, page.waits, len(page.evaluations)), (["table tr.item"], 1, 1))
+        fields, limit = page.evaluations[0]
+        self.assertEqual(limit, 50)
+        self.assertEqual(fields[1], {"name": "link", "selector": "a", "source": "attr:href", "all": False})
+        self.assertEqual(fields[2]["selector"], "")
+
+    def test_no_rows_yield_an_empty_list(self):
+        page = _FakePage(empty=True)
+        io = _ActionIO()
+        io.page = page
+        io.logger = logging.getLogger("test.extract")
+        io.inputs.update({"row_locator": {"element": "li.item", "type": "css"}, "fields": {"title": "a"}, "timeout": 10})
+
+        asyncio.run(ExtractList().execute(io))
+
+        self.assertEqual((io.outputs["items"], io.outputs["count"]), ([], 0))
+        self.assertEqual(page.evaluations, [])
+
+    def test_unknown_field_source_is_rejected(self):
+        io = _ActionIO()
+        io.page = _FakePage()
+        io.inputs.update({"row_locator": {"element": "li", "type": "css"}, "fields": {"x": {"selector": "a", "source": "href"}}})
+
+        with self.assertRaisesRegex(ValueError, "Unsupported data source"):
+            asyncio.run(ExtractList().execute(io))
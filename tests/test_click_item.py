@@ -0,0 +1,127 @@
+import asyncio
+import sys
+import types
+import unittest
+
+
+if "playwright.async_api" not in sys.modules:
+    async_api_module = types.ModuleType("playwright.async_api")
+
+    class _StubPlaywright:
+        pass
+
+    class _StubBrowser:
+        pass
+
+    class _StubBrowserContext:
+        pass
+
+    class _StubPage:
+        pass
+
+    class _StubLocator:
+        pass
+
+    async_api_module.Playwright = _StubPlaywright
+    async_api_module.Browser = _StubBrowser
+    async_api_module.BrowserContext = _StubBrowserContext
+    async_api_module.Page = _StubPage
+    async_api_module.Locator = _StubLocator
+    playwright_module = types.ModuleType("playwright")
+    playwright_module.async_api = async_api_module
+    sys.modules["playwright"] = playwright_module
+    sys.modules["playwright.async_api"] = async_api_module
+
+import playwright.async_api as pw
+
+from weboter.builtin.basic_action import ClickItem
+from weboter.public.contracts.io_pipe import IOPipe
+
+
+class _FakeCandidate:
+    def __init__(self, delay, click_error=None):
+        self.delay = delay
+        self.click_error = click_error
+        self.cancelled = False
+        self.clicked = False
+
+    @property
+    def first(self):
+        return self
+
+    async def wait_for(self, state=None, timeout=None):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+    async def click(self, timeout=None, force=False):
+        if self.click_error is not None:
+            raise self.click_error
+        self.clicked = True
+
+
+class _FakePage(pw.Page):
+    def __init__(self, candidates):
+        self.candidates = candidates
+
+    def locator(self, selector):
+        return self.candidates[selector]
+
+
+class _ActionIO(IOPipe):
+    def __init__(self):
+        super().__init__()
+        self._cur_node = "node_a"
+        self._flow_data = {}
+
+    @property
+    def cur_node(self) -> str:
+        return self._cur_node
+
+    @property
+    def flow_data(self) -> dict:
+        return self._flow_data
+
+    @flow_data.setter
+    def flow_data(self, value: dict):
+        self._flow_data = value
+
+
+class ClickItemTests(unittest.TestCase):
+    def test_first_visible_candidate_wins_and_others_are_cancelled(self):
+        candidates = {"#slow": _FakeCandidate(5), "#missing": _FakeCandidate(5), "#fast": _FakeCandidate(0)}
+        io = _ActionIO()
+        io.page = _FakePage(candidates)
+        io.inputs.update({
+            "locators": [{"element": "#slow", "type": "css"}, {"element": "#missing", "type": "css"}],
+            "locator": {"element": "#fast", "type": "css"},
+            "timeout": 5000,
+        })
+
+        asyncio.run(asyncio.wait_for(ClickItem().execute(io), 5))
+
+        self.assertEqual(io.outputs["matched_index"], 2)
+        self.assertTrue(candidates["#fast"].clicked)
+        self.assertTrue(candidates["#slow"].cancelled and candidates["#missing"].cancelled)
+        self.assertFalse(candidates["#slow"].clicked)
+
+    def test_falls_back_to_next_visible_candidate_when_click_fails(self):
+        candidates = {
+            "#covered": _FakeCandidate(0, click_error=RuntimeError("intercepts pointer events")),
+            "#later": _FakeCandidate(0.05),
+            "#missing": _FakeCandidate(5),
+        }
+        io = _ActionIO()
+        io.page = _FakePage(candidates)
+        io.inputs.update({
+            "locators": [{"element": "#missing", "type": "css"}, {"element": "#covered", "type": "css"}, {"element": "#later", "type": "css"}],
+            "timeout": 5000,
+        })
+
+        asyncio.run(asyncio.wait_for(ClickItem().execute(io), 5))
+
+        self.assertEqual(io.outputs["matched_index"], 2)
+        self.assertTrue(candidates["#later"].clicked)
+        self.assertTrue(candidates["#missing"].cancelled)
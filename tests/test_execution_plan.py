@@ -0,0 +1,541 @@
+import asyncio
+import logging
+from pathlib import Path
+import sys
+import tempfile
+import threading
+import types
+import unittest
+
+
+if "playwright.async_api" not in sys.modules:
+    async_api_module = types.ModuleType("playwright.async_api")
+
+    class _StubPlaywright:
+        pass
+
+    class _StubBrowser:
+        pass
+
+    class _StubBrowserContext:
+        pass
+
+    class _StubPage:
+        pass
+
+    class _StubLocator:
+        pass
+
+    async_api_module.Playwright = _StubPlaywright
+    async_api_module.Browser = _StubBrowser
+    async_api_module.BrowserContext = _StubBrowserContext
+    async_api_module.Page = _StubPage
+    async_api_module.Locator = _StubLocator
+    playwright_module = types.ModuleType("playwright")
+    playwright_module.async_api = async_api_module
+    sys.modules["playwright"] = playwright_module
+    sys.modules["playwright.async_api"] = async_api_module
+
+import playwright.async_api as pw
+
+from weboter.builtin.basic_action import OpenPage, SubFlow
+from weboter.core.engine.action_cache import ActionCacheStats, ActionOutputCache
+from weboter.core.engine.action_manager import action_manager
+from weboter.core.engine.checkpoint import CheckpointStore, TaskCheckpointer
+from weboter.core.engine.control_manager import control_manager
+from weboter.core.engine.excutor import Executor
+from weboter.core.engine.lifecycle import ResourceTracker
+from weboter.core.engine.profiler import StepProfiler
+from weboter.public.contracts import ActionBase, ControlBase, InputFieldDeclaration, LocatorDefine
+from weboter.public.model import Flow, Node, NodeOutputConfig
+
+
+class _EchoAction(ActionBase):
+    name = "Echo"
+    description = "echo inputs"
+    inputs = []
+    outputs = []
+
+    async def execute(self, io):
+        io.outputs.update(io.inputs)
+
+
+class _CountingAction(_EchoAction):
+    name = "Counting"
+    cacheable = True
+    calls = 0
+
+    async def execute(self, io):
+        type(self).calls += 1
+        await super().execute(io)
+
+
+class _FlakyAction(_EchoAction):
+    name = "Flaky"
+    fail = True
+
+    async def execute(self, io):
+        if type(self).fail:
+            raise RuntimeError("flaky failure")
+        await super().execute(io)
+
+
+class _Closable:
+    def __init__(self, kind, closed, fail=False):
+        self.kind = kind
+        self.closed = closed
+        self.fail = fail
+
+    async def close(self):
+        self.closed.append(self.kind)
+        if self.fail:
+            raise RuntimeError(f"{self.kind} already closed")
+
+    async def stop(self):
+        self.closed.append(self.kind)
+
+
+class _OpenBrowserLikeAction(_EchoAction):
+    name = "OpenBrowserLike"
+    closed: list = []
+
+    async def execute(self, io):
+        io.outputs["__pw_inst__"] = _Closable("playwright", self.closed)
+        io.outputs["__browser__"] = _Closable("browser", self.closed)
+        io.outputs["__browser_context__"] = _Closable("context", self.closed)
+        io.outputs["__page__"] = _Closable("page", self.closed, fail=True)
+
+
+class _LocatorAction(_EchoAction):
+    name = "Locate"
+    inputs = [
+        InputFieldDeclaration(name="locator", accepted_types=["LocatorDefine"]),
+        InputFieldDeclaration(name="locators", required=False, accepted_types=["LocatorDefine[]"]),
+    ]
+
+
+class _FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.visits = []
+        self.closed = False
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        self.visits.append((url, wait_until, timeout))
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+        self.context.pages.remove(self)
+
+
+class _FakeBrowserContext(pw.BrowserContext):
+    def __init__(self):
+        self.pages = []
+
+    async def new_page(self):
+        page = _FakePage(self)
+        self.pages.append(page)
+        return page
+
+
+class _NextControl(ControlBase):
+    name = "Next"
+    description = "go to params.next"
+    inputs = []
+
+    async def calc_next(self, io):
+        return io.params["next"]
+
+
+class _EndControl(ControlBase):
+    name = "End"
+    description = "end flow"
+    inputs = []
+
+    async def calc_next(self, io):
+        return "__end__"
+
+
+class ExecutionPlanTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        action_manager.register_package("plantest", [_EchoAction, _CountingAction, _FlakyAction, _OpenBrowserLikeAction, _LocatorAction])
+        control_manager.register_package("plantest", [_EndControl, _NextControl])
+
+    @classmethod
+    def tearDownClass(cls):
+        action_manager.unregister_package("plantest")
+        control_manager.unregister_package("plantest")
+
+    def _flow(self, action: str = "plantest.Echo") -> Flow:
+        node = Node(
+            node_id="node-1",
+            name="Echo",
+            description="",
+            action=action,
+            inputs={"fixed": 1, "name": "$flow{user.name}"},
+            control="plantest.End",
+        )
+        return Flow(flow_id="flow-1", name="demo", description="", start_node_id="node-1", nodes=[node])
+
+    def test_load_compiles_static_and_variable_inputs(self):
+        executor = Executor()
+        executor.load_workflow(self._flow())
+        executor.runtime.set_value("$flow{user.name}", "alice")
+
+        node_plan = executor.plan.get("node-1")
+        self.assertEqual(dict(node_plan.static_inputs), {"fixed": 1})
+        self.assertEqual([key for key, _ in node_plan.var_inputs], ["name"])
+
+        asyncio.run(executor.run())
+        self.assertEqual(executor.runtime.get_value("$prev_outputs{name}"), "alice")
+
+    def test_unknown_action_fails_at_load(self):
+        executor = Executor()
+        with self.assertRaisesRegex(ValueError, "plantest.Missing"):
+            executor.load_workflow(self._flow(action="plantest.Missing"))
+
+    def test_nested_sub_flows_are_compiled_at_load(self):
+        def wrap(flow_id: str, sub_flows: list[Flow]) -> Flow:
+            return Flow(flow_id=flow_id, name=flow_id, description="", start_node_id="node-1", nodes=self._flow().nodes, sub_flows=sub_flows)
+
+        inner = Flow(flow_id="inner", name="inner", description="", start_node_id="node-1", nodes=self._flow().nodes)
+        executor = Executor()
+        executor.load_workflow(wrap("outer", [wrap("middle", [inner])]))
+        self.assertIn(id(inner), executor._plan_cache)
+        self.assertEqual(len(executor._plan_cache), 3)
+
+        broken = Flow(flow_id="inner", name="inner", description="", start_node_id="node-1", nodes=self._flow("plantest.Missing").nodes)
+        with self.assertRaisesRegex(ValueError, r"plantest.Missing.*sub-flow 'inner'.*sub-flow 'middle'"):
+            Executor().load_workflow(wrap("outer", [wrap("middle", [broken])]))
+
+    def test_invalidate_plan_picks_up_patched_node(self):
+        executor = Executor()
+        flow = self._flow()
+        executor.load_workflow(flow)
+
+        flow.nodes[0].inputs = {"fixed": 2}
+        executor.invalidate_plan("node-1")
+
+        self.assertEqual(dict(executor.plan.get("node-1").static_inputs), {"fixed": 2})
+
+    def test_profiler_records_phases_per_node_and_action(self):
+        profiler = StepProfiler()
+        executor = Executor(profiler=profiler)
+        executor.load_workflow(self._flow())
+
+        asyncio.run(executor.run())
+
+        profile = profiler.snapshot()
+        self.assertEqual(profile["step_count"], 1)
+        self.assertEqual(profile["nodes"][0]["node_id"], "node-1")
+        self.assertIn("action", profile["nodes"][0]["phases"])
+        self.assertIn("control", profile["nodes"][0]["phases"])
+        self.assertEqual(profile["actions"]["plantest.Echo"]["action"]["count"], 1)
+
+    def test_profiler_phase_totals_do_not_double_count_sub_flows(self):
+        class _Sleep(_EchoAction):
+            name = "Sleep"
+
+            async def execute(self, io):
+                await asyncio.sleep(0.01)
+
+        action_manager.register_package("profnested", [_Sleep, SubFlow])
+        self.addCleanup(action_manager.unregister_package, "profnested")
+        inner = Node(node_id="sleep", name="Sleep", description="", action="profnested.Sleep", control="plantest.End")
+        outer = Node(
+            node_id="sub",
+            name="Sub",
+            description="",
+            action="profnested.SubFlow",
+            inputs={"flow_id": "inner"},
+            control="plantest.End",
+        )
+        flow = Flow(
+            flow_id="outer",
+            name="outer",
+            description="",
+            start_node_id="sub",
+            nodes=[outer],
+            sub_flows=[Flow(flow_id="inner", name="inner", description="", start_node_id="sleep", nodes=[inner])],
+        )
+        profiler = StepProfiler()
+        executor = Executor(profiler=profiler)
+        executor.load_workflow(flow)
+
+        asyncio.run(executor.run())
+
+        profile = profiler.snapshot()
+        self.assertEqual(profile["step_count"], 2)
+        nodes = {item["node_id"]: item for item in profile["nodes"]}
+        self.assertIn("action", nodes["sleep"]["phases"])
+        # 子流程步骤只记入节点统计，阶段合计与根流程唯一的 SubFlow 步骤一致
+        for phase, total in profile["phase_totals_ms"].items():
+            recorded = nodes["sub"]["phases"].get(phase)
+            self.assertAlmostEqual(total, recorded["total_ms"] if recorded else 0.0, places=2)
+
+    def test_log_mode_none_skips_engine_logs(self):
+        logger = logging.getLogger("plantest.log_mode")
+        logger.setLevel(logging.DEBUG)
+        flow = self._flow()
+        flow.nodes[0].log = "none"
+        executor = Executor(logger=logger)
+        executor.load_workflow(flow)
+
+        with self.assertLogs(logger, level="DEBUG") as captured:
+            logger.debug("marker")
+            asyncio.run(executor.run())
+
+        self.assertEqual(captured.output, ["DEBUG:plantest.log_mode:marker"])
+        self.assertEqual(logger.level, logging.DEBUG)
+        self.assertEqual(executor.node_logger(executor.plan.get("node-1")).level, logging.WARNING)
+
+    def test_hooks_skipped_when_wants_step_declines(self):
+        calls = []
+
+        class _Hooks:
+            def wants_step(self, executor, node, node_plan):
+                calls.append(("wants", node_plan.touches_page))
+                return False
+
+            async def before_step(self, executor, node):
+                calls.append("before")
+
+            async def after_step(self, executor, node, next_node_id):
+                calls.append("after")
+
+        executor = Executor(hooks=_Hooks())
+        executor.load_workflow(self._flow())
+        asyncio.run(executor.run())
+
+        self.assertEqual(calls, [("wants", True)])
+
+    def test_cacheable_action_reuses_outputs_across_runs(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ActionOutputCache(Path(temp_dir), max_entries=2)
+            stats = ActionCacheStats()
+            _CountingAction.calls = 0
+            for _ in range(2):
+                executor = Executor(action_cache=cache, cache_stats=stats)
+                executor.load_workflow(self._flow(action="plantest.Counting"))
+                executor.runtime.set_value("$flow{user.name}", "alice")
+                asyncio.run(executor.run())
+                self.assertEqual(executor.runtime.get_value("$prev_outputs{name}"), "alice")
+
+            self.assertEqual(_CountingAction.calls, 1)
+            self.assertEqual(stats.to_dict(), {"hits": 1, "misses": 1, "stores": 1, "bypassed": 0})
+
+            for index in range(3):
+                cache.put(f"key-{index}", "plantest.Counting", {"index": index})
+            self.assertEqual(cache.summary()["entries"], 2)
+            self.assertIsNone(cache.get("key-0"))
+            self.assertEqual(ActionOutputCache(Path(temp_dir)).get("key-2"), {"index": 2})
+
+    def test_resume_from_checkpoint_skips_completed_nodes(self):
+        first = Node(
+            node_id="node-1",
+            name="First",
+            description="",
+            action="plantest.Counting",
+            inputs={"token": "abc"},
+            outputs=[NodeOutputConfig(src="token", pos="global")],
+            control="plantest.Next",
+            params={"next": "node-2"},
+        )
+        second = Node(
+            node_id="node-2",
+            name="Second",
+            description="",
+            action="plantest.Flaky",
+            inputs={"token": "$global{token}"},
+            control="plantest.End",
+        )
+        flow = Flow(flow_id="flow-2", name="resume", description="", start_node_id="node-1", nodes=[first, second])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = CheckpointStore(Path(temp_dir))
+            _CountingAction.calls = 0
+            _FlakyAction.fail = True
+            checkpointer = TaskCheckpointer(store, "task-1")
+            executor = Executor(checkpointer=checkpointer)
+            executor.load_workflow(flow)
+            executor.runtime.set_value("$global{browser_like}", object())
+            with self.assertRaisesRegex(RuntimeError, "flaky"):
+                asyncio.run(executor.run())
+            checkpointer.close()
+
+            checkpoint = store.load("task-1")
+            self.assertEqual(checkpoint["node_id"], "node-2")
+            self.assertEqual(checkpoint["scopes"]["global"], {"token": "abc"})
+            self.assertEqual(checkpoint["dropped"], ["global.browser_like"])
+
+            _FlakyAction.fail = False
+            resumed = Executor()
+            resumed.load_workflow(flow)
+            asyncio.run(resumed.resume(checkpoint))
+
+            self.assertEqual(_CountingAction.calls, 1)
+            self.assertEqual(resumed.runtime.get_value("$prev_outputs{token}"), "abc")
+
+    def test_checkpoint_writes_do_not_block_steps(self):
+        release = threading.Event()
+
+        class _BlockedStore(CheckpointStore):
+            timed_out = False
+
+            def save(self, task_id, checkpoint):
+                # 执行结束前写入一直阻塞：若写入发生在执行线程上，执行会卡住直到超时
+                if not release.wait(5):
+                    _BlockedStore.timed_out = True
+                super().save(task_id, checkpoint)
+
+        nodes = [
+            Node(
+                node_id=f"node-{index}",
+                name=f"Node {index}",
+                description="",
+                action="plantest.Echo",
+                inputs={"value": index},
+                control="plantest.Next" if index < 3 else "plantest.End",
+                params={"next": f"node-{index + 1}"} if index < 3 else {},
+            )
+            for index in range(1, 4)
+        ]
+        flow = Flow(flow_id="flow-3", name="slow", description="", start_node_id="node-1", nodes=nodes)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = _BlockedStore(Path(temp_dir))
+            checkpointer = TaskCheckpointer(store, "task-2", min_interval=10)
+            executor = Executor(checkpointer=checkpointer)
+            executor.load_workflow(flow)
+
+            asyncio.run(executor.run())
+            release.set()
+
+            checkpointer.close()
+            self.assertFalse(_BlockedStore.timed_out)
+            # 节流期间的检查点合并为最新一个
+            self.assertEqual(checkpointer.written, 2)
+            self.assertEqual(store.load("task-2")["node_id"], "node-3")
+
+            unchanged = TaskCheckpointer(CheckpointStore(Path(temp_dir)), "task-3")
+            unchanged.save(executor.runtime)
+            unchanged.save(executor.runtime)
+            unchanged.close()
+            self.assertEqual((unchanged.written, unchanged.skipped), (1, 1))
+
+    def test_resources_closed_in_reverse_order_when_task_fails(self):
+        opener = Node(
+            node_id="node-1",
+            name="Open",
+            description="",
+            action="plantest.OpenBrowserLike",
+            control="plantest.Next",
+            params={"next": "node-2"},
+        )
+        failing = Node(node_id="node-2", name="Fail", description="", action="plantest.Flaky", control="plantest.End")
+        flow = Flow(flow_id="flow-3", name="teardown", description="", start_node_id="node-1", nodes=[opener, failing])
+        _FlakyAction.fail = True
+        _OpenBrowserLikeAction.closed = []
+        executor = Executor()
+        executor.load_workflow(flow)
+        self.assertEqual(executor.resources.summary(), {"page": 0, "context": 0, "browser": 0, "playwright": 0})
+
+        async def run_and_close():
+            try:
+                await executor.run()
+            except RuntimeError:
+                pass
+            return await executor.resources.close_all()
+
+        errors = asyncio.run(run_and_close())
+        self.assertEqual(_OpenBrowserLikeAction.closed, ["page", "context", "browser", "playwright"])
+        self.assertEqual(errors, ["page: page already closed"])
+        self.assertEqual(executor.resources.summary()["browser"], 0)
+
+    def test_open_page_reuses_current_page_and_caps_open_pages(self):
+        executor = Executor()
+        executor.load_workflow(self._flow())
+        node = executor.runtime.get_node("node-1")
+        context = _FakeBrowserContext()
+        executor.runtime.set_value("$global{{__browser__}}", context)
+
+        async def open_page(**inputs):
+            io = executor.prepare_action_io(node)
+            io.inputs.clear()
+            io.inputs.update(inputs)
+            await OpenPage().execute(io)
+            executor.extract_outputs(node, io)
+            return io.outputs
+
+        async def scenario():
+            # 并发分支在同一 context 中打开的页面不由本流程登记，max_pages 不能关闭它
+            await context.new_page()
+            first = await open_page(url="https://a.test/")
+            await open_page(url="https://b.test/", max_pages=2)
+            third = await open_page(url="https://c.test/", max_pages=2)
+            reused = await open_page(url="https://d.test/", reuse_current=True, wait_until="domcontentloaded", timeout=0)
+            return first, third, reused
+
+        first, third, reused = asyncio.run(scenario())
+
+        self.assertTrue(first["page"].closed)
+        self.assertEqual(third["closed_pages"], 1)
+        foreign = context.pages[0]
+        self.assertFalse(foreign.closed)
+        self.assertTrue(reused["reused"])
+        self.assertIs(reused["page"], third["page"])
+        self.assertEqual(third["page"].visits, [("https://c.test/", "load", 30000), ("https://d.test/", "domcontentloaded", 0)])
+        self.assertEqual(executor.runtime.get_value("$global{{pages}}"), [page for page in context.pages if page is not foreign])
+        self.assertEqual(executor.resources.summary()["page"], 2)
+        with self.assertRaisesRegex(ValueError, "wait_until"):
+            asyncio.run(open_page(url="https://e.test/", wait_until="idle"))
+
+    def test_locator_inputs_are_parsed_once_at_load(self):
+        node = Node(
+            node_id="node-1",
+            name="Locate",
+            description="",
+            action="plantest.Locate",
+            inputs={
+                "locator": [{"element": "ul.items", "type": "css"}, {"element": "li", "type": "css", "pos": 2}],
+                "locators": [{"element": "Submit", "type": "role", "ext": {"name": "Submit"}}],
+            },
+            control="plantest.End",
+        )
+        flow = Flow(flow_id="flow-4", name="locate", description="", start_node_id="node-1", nodes=[node])
+        executor = Executor()
+        executor.load_workflow(flow)
+
+        first = executor.prepare_action_io(node, executor.plan.get("node-1")).inputs
+        second = executor.prepare_action_io(node, executor.plan.get("node-1")).inputs
+        self.assertIsInstance(first["locator"], LocatorDefine)
+        self.assertIs(first["locator"], second["locator"])
+        self.assertEqual(first["locator"].sub.pos, 2)
+        self.assertEqual(hash(first["locators"][0]), hash(LocatorDefine.deserialize(node.inputs["locators"][0])))
+        self.assertIs(LocatorDefine.deserialize(first["locator"]), first["locator"])
+        self.assertEqual(node.inputs["locator"][1]["pos"], 2)
+
+        node.inputs["locators"] = {"element": "x"}
+        with self.assertRaisesRegex(ValueError, "Invalid locator for input 'locators'"):
+            executor.invalidate_plan("node-1")
+
+    def test_driver_pid_is_unknown_without_playwright_internals(self):
+        class _BrokenTransport:
+            @property
+            def _proc(self):
+                raise RuntimeError("transport closed")
+
+        driver = types.SimpleNamespace(_impl_obj=types.SimpleNamespace(_connection=types.SimpleNamespace(_transport=types.SimpleNamespace(_proc=types.SimpleNamespace(pid=4321)))))
+        broken = types.SimpleNamespace(_impl_obj=types.SimpleNamespace(_connection=types.SimpleNamespace(_transport=_BrokenTransport())))
+        tracker = ResourceTracker(process_probe=lambda pid: [pid + 1])
+        for resource in (driver, broken, _Closable("playwright", [])):
+            tracker.register("playwright", resource)
+
+        tracker._collect_processes()
+
+        self.assertEqual(tracker.unknown_drivers, 2)
+        self.assertEqual(tracker.process_ids, {4321, 4322})
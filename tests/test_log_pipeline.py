@@ -0,0 +1,26 @@
+import logging
+import tempfile
+from pathlib import Path
+import unittest
+
+from weboter.app.log_pipeline import TaskLogWriter
+from weboter.core.engine.log_format import LazyRepr
+
+
+class TaskLogWriterTests(unittest.TestCase):
+    def test_arguments_are_rendered_when_logged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = Path(tmp) / "task.log"
+            writer = TaskLogWriter(str(log_path), logging.Formatter("%(levelname)s %(message)s"), flush_interval=0.05)
+            logger = logging.Logger("test.task", logging.INFO)
+            writer.attach(logger)
+            inputs = {"value": 1}
+
+            logger.info("inputs %s", LazyRepr(inputs))
+            # 记录之后修改运行时数据，不能影响已记录的日志
+            inputs["value"] = 2
+            logger.debug("filtered %s", LazyRepr(inputs))
+            writer.detach(logger)
+            writer.close()
+
+            self.assertEqual(log_path.read_text(encoding="utf-8"), "INFO inputs {'value': 1}\n")
@@ -124,3 +124,15 @@ class ManagedEnvTests(unittest.TestCase):
 
         self.assertEqual(result["value"], "se***23")
         self.assertEqual(preview["items"]["env"]["masked"], True)
+
+    def test_env_scope_is_shared_copy_on_write_across_child_runtimes(self):
+        self.service.set_env("xxx.username", "alice")
+        parent = Executor(managed_env=self.service.env_store.export_env_mapping())
+        child = Executor(env=parent._fork_env())
+
+        child.runtime.set_value("$env{xxx.username}", "bob")
+        child.runtime.set_value("$env{xxx.token}", "t-1")
+
+        self.assertEqual(parent.runtime.get_value("$env{xxx.username}"), "alice")
+        self.assertIsNone(parent.runtime.get_value("$env{xxx.token}"))
+        self.assertEqual(child.runtime.get_value("$env{xxx}"), {"username": "bob", "token": "t-1"})
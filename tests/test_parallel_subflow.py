@@ -0,0 +1,328 @@
+import asyncio
+import sys
+import types
+import unittest
+
+
+if "playwright.async_api" not in sys.modules:
+    async_api_module = types.ModuleType("playwright.async_api")
+
+    class _StubPlaywright:
+        pass
+
+    class _StubBrowser:
+        pass
+
+    class _StubBrowserContext:
+        pass
+
+    class _StubPage:
+        pass
+
+    class _StubLocator:
+        pass
+
+    async_api_module.Playwright = _StubPlaywright
+    async_api_module.Browser = _StubBrowser
+    async_api_module.BrowserContext = _StubBrowserContext
+    async_api_module.Page = _StubPage
+    async_api_module.Locator = _StubLocator
+    playwright_module = types.ModuleType("playwright")
+    playwright_module.async_api = async_api_module
+    sys.modules["playwright"] = playwright_module
+    sys.modules["playwright.async_api"] = async_api_module
+
+from weboter.core.engine.action_manager import action_manager
+from weboter.core.engine.control_manager import control_manager
+from weboter.core.engine.excutor import Executor
+from weboter.builtin.basic_action import ForEach, ForkJoin
+from weboter.public.contracts import ActionBase, ControlBase
+from weboter.public.model import Flow, Node
+
+
+class _FakePage:
+    def __init__(self, index: int):
+        self.index = index
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeBrowserContext:
+    def __init__(self):
+        self.pages = []
+
+    async def new_page(self):
+        page = _FakePage(len(self.pages))
+        self.pages.append(page)
+        return page
+
+
+class _SlowTag(ActionBase):
+    name = "SlowTag"
+    description = "sleep then tag the current page"
+    inputs = []
+    outputs = []
+
+    async def execute(self, io):
+        await asyncio.sleep(io.inputs.get("delay", 0.1))
+        io.flow_data["tag"] = f"{io.inputs.get('label')}@{io.page.index}"
+
+
+class _Rendezvous(ActionBase):
+    name = "Rendezvous"
+    description = "wait until every branch has started, then tag the current page"
+    inputs = []
+    outputs = []
+    expected = 0
+    arrived = 0
+    met: asyncio.Event | None = None
+
+    async def execute(self, io):
+        cls = type(self)
+        cls.arrived += 1
+        if cls.arrived == cls.expected:
+            cls.met.set()
+        # 分支串行执行时第一个分支永远等不到其余分支，超时失败
+        await asyncio.wait_for(cls.met.wait(), 5)
+        io.flow_data["tag"] = f"{io.inputs.get('label')}@{io.page.index}"
+
+
+class _Square(ActionBase):
+    name = "Square"
+    description = "square the current item"
+    inputs = []
+    outputs = []
+
+    async def execute(self, io):
+        await asyncio.sleep(0.05)
+        io.flow_data["result"] = {"index": io.flow_data["index"], "value": io.flow_data["item"] ** 2, "page": io.page.index}
+
+
+class _GlobalEcho(ActionBase):
+    name = "GlobalEcho"
+    description = "write the item to $global, yield, then read it back"
+    inputs = []
+    outputs = []
+
+    async def execute(self, io):
+        runtime = io.executor.runtime
+        runtime.set_value("$global{{shared}}", io.flow_data["item"])
+        await asyncio.sleep(0.05)
+        io.flow_data["result"] = runtime.get_value("$global{{shared}}")
+
+
+class _ClosePage(ActionBase):
+    name = "ClosePage"
+    description = "record whether the item page is alive, then close it"
+    inputs = []
+    outputs = []
+
+    async def execute(self, io):
+        io.flow_data["result"] = not io.page.closed
+        await io.page.close()
+
+
+class _End(ControlBase):
+    name = "End"
+    description = "end flow"
+    inputs = []
+
+    async def calc_next(self, io):
+        return "__end__"
+
+
+def _sub_flow(flow_id: str, label: str, delay: float, action: str = "partest.SlowTag") -> Flow:
+    node = Node(
+        node_id=f"{flow_id}-node",
+        name=flow_id,
+        description="",
+        action=action,
+        inputs={"label": label, "delay": delay},
+        control="partest.End",
+        log="none",
+    )
+    return Flow(flow_id=flow_id, name=flow_id, description="", start_node_id=node.node_id, nodes=[node])
+
+
+class ParallelSubflowTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        action_manager.register_package("partest", [_SlowTag, _Rendezvous, _Square, _GlobalEcho, _ClosePage, ForkJoin, ForEach])
+        control_manager.register_package("partest", [_End])
+
+    @classmethod
+    def tearDownClass(cls):
+        action_manager.unregister_package("partest")
+        control_manager.unregister_package("partest")
+
+    def _executor(self, node: Node, sub_flows: list[Flow]) -> tuple[Executor, _FakeBrowserContext]:
+        main = Flow(
+            flow_id="main",
+            name="main",
+            description="",
+            start_node_id=node.node_id,
+            nodes=[node],
+            sub_flows=sub_flows,
+            log="none",
+        )
+        executor = Executor()
+        executor.load_workflow(main)
+        browser = _FakeBrowserContext()
+        executor.runtime.set_value("$global{{__browser__}}", browser)
+        return executor, browser
+
+    def test_fork_join_runs_branches_concurrently_and_merges_in_order(self):
+        node = Node(
+            node_id="fork",
+            name="fork",
+            description="",
+            action="partest.ForkJoin",
+            inputs={
+                "branches": [
+                    {"flow_id": "a", "data_out": [{"src": "$flow{tag}", "dst": "tag"}, {"src": "$flow{tag}", "dst": "a_tag"}]},
+                    {"flow_id": "b", "data_out": [{"src": "$flow{tag}", "dst": "tag"}]},
+                ]
+            },
+            control="partest.End",
+        )
+        executor, browser = self._executor(
+            node, [_sub_flow("a", "A", 0, "partest.Rendezvous"), _sub_flow("b", "B", 0, "partest.Rendezvous")]
+        )
+        _Rendezvous.expected, _Rendezvous.arrived, _Rendezvous.met = 2, 0, asyncio.Event()
+
+        asyncio.run(executor.run())
+
+        outputs = executor.runtime.data_context.data["prev_outputs"]
+        self.assertEqual(outputs["a_tag"], "A@0")
+        self.assertEqual(outputs["tag"], "B@1")
+        self.assertEqual(outputs["branches"], [{"tag": "A@0", "a_tag": "A@0"}, {"tag": "B@1"}])
+        self.assertTrue(all(page.closed for page in browser.pages))
+
+    def test_fork_join_serializes_hooks_across_branches(self):
+        class _Hooks:
+            def __init__(self):
+                self.active = 0
+                self.max_active = 0
+                self.calls = 0
+
+            async def before_step(self, executor, node):
+                self.active += 1
+                self.calls += 1
+                self.max_active = max(self.max_active, self.active)
+                await asyncio.sleep(0.05)
+                self.active -= 1
+
+        node = Node(
+            node_id="fork",
+            name="fork",
+            description="",
+            action="partest.ForkJoin",
+            inputs={"branches": [{"flow_id": "a"}, {"flow_id": "b"}], "new_page": False},
+            control="partest.End",
+        )
+        executor, _ = self._executor(node, [_sub_flow("a", "A", 0), _sub_flow("b", "B", 0)])
+        executor.runtime.set_value("$global{{current_page}}", _FakePage(9))
+        hooks = _Hooks()
+        executor.hooks = hooks
+
+        asyncio.run(executor.run())
+
+        self.assertEqual(hooks.calls, 3)
+        self.assertEqual(hooks.max_active, 1)
+
+    def test_for_each_collects_results_in_order_with_bounded_concurrency(self):
+        square = Node(
+            node_id="square",
+            name="square",
+            description="",
+            action="partest.Square",
+            control="partest.End",
+            log="none",
+        )
+        body = Flow(flow_id="body", name="body", description="", start_node_id="square", nodes=[square])
+        node = Node(
+            node_id="each",
+            name="each",
+            description="",
+            action="partest.ForEach",
+            inputs={"items": "$flow{numbers}", "flow_id": "body", "concurrency": 2, "use_pages": True},
+            control="partest.End",
+        )
+        executor, browser = self._executor(node, [body])
+        executor.runtime.set_value("$flow{numbers}", [1, 2, 3, 4, 5])
+
+        asyncio.run(executor.run())
+
+        outputs = executor.runtime.data_context.data["prev_outputs"]
+        self.assertEqual(outputs["count"], 5)
+        self.assertEqual([item["value"] for item in outputs["results"]], [1, 4, 9, 16, 25])
+        self.assertEqual([item["index"] for item in outputs["results"]], [0, 1, 2, 3, 4])
+        self.assertEqual(len(browser.pages), 2)
+        self.assertTrue(all(page.closed for page in browser.pages))
+
+    def test_for_each_isolates_global_between_concurrent_items(self):
+        echo = Node(
+            node_id="echo",
+            name="echo",
+            description="",
+            action="partest.GlobalEcho",
+            control="partest.End",
+            log="none",
+        )
+        body = Flow(flow_id="body", name="body", description="", start_node_id="echo", nodes=[echo])
+        node = Node(
+            node_id="each",
+            name="each",
+            description="",
+            action="partest.ForEach",
+            inputs={"items": ["a", "b"], "flow_id": "body", "concurrency": 2},
+            control="partest.End",
+        )
+        executor, browser = self._executor(node, [body])
+
+        asyncio.run(executor.run())
+
+        outputs = executor.runtime.data_context.data["prev_outputs"]
+        self.assertEqual(outputs["results"], ["a", "b"])
+        self.assertNotIn("shared", executor.runtime.data_context.data["global"])
+        self.assertEqual(len(browser.pages), 2)
+
+    def test_for_each_replaces_pages_closed_by_previous_items(self):
+        close = Node(node_id="close", name="close", description="", action="partest.ClosePage", control="partest.End", log="none")
+        body = Flow(flow_id="body", name="body", description="", start_node_id="close", nodes=[close])
+        node = Node(
+            node_id="each",
+            name="each",
+            description="",
+            action="partest.ForEach",
+            inputs={"items": [1, 2, 3], "flow_id": "body", "use_pages": True},
+            control="partest.End",
+        )
+        executor, browser = self._executor(node, [body])
+
+        asyncio.run(executor.run())
+
+        self.assertEqual(executor.runtime.data_context.data["prev_outputs"]["results"], [True, True, True])
+        self.assertEqual(len(browser.pages), 3)
+
+    def test_for_each_without_browser_context_runs_serially_or_rejects_use_pages(self):
+        square = Node(node_id="square", name="square", description="", action="partest.Square", control="partest.End", log="none")
+        body = Flow(flow_id="body", name="body", description="", start_node_id="square", nodes=[square])
+
+        def run(inputs):
+            node = Node(node_id="each", name="each", description="", action="partest.ForEach", inputs=inputs, control="partest.End")
+            executor, _ = self._executor(node, [body])
+            executor.runtime.set_value("$global{{__browser__}}", None)
+            executor.runtime.set_value("$global{{current_page}}", _FakePage(7))
+            asyncio.run(executor.run())
+            return executor.runtime.data_context.data["prev_outputs"]["results"]
+
+        results = run({"items": [1, 2, 3], "flow_id": "body", "concurrency": 2})
+        self.assertEqual([(item["value"], item["page"]) for item in results], [(1, 7), (4, 7), (9, 7)])
+        with self.assertRaisesRegex(ValueError, "requires an open browser context"):
+            run({"items": [1], "flow_id": "body", "use_pages": True})
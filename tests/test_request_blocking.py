@@ -0,0 +1,252 @@
+import asyncio
+from pathlib import Path
+import sys
+import tempfile
+import types
+import unittest
+
+
+if "playwright.async_api" not in sys.modules:
+    async_api_module = types.ModuleType("playwright.async_api")
+
+    class _StubPlaywright:
+        pass
+
+    class _StubBrowser:
+        pass
+
+    class _StubBrowserContext:
+        pass
+
+    class _StubPage:
+        pass
+
+    class _StubLocator:
+        pass
+
+    async_api_module.Playwright = _StubPlaywright
+    async_api_module.Browser = _StubBrowser
+    async_api_module.BrowserContext = _StubBrowserContext
+    async_api_module.Page = _StubPage
+    async_api_module.Locator = _StubLocator
+    playwright_module = types.ModuleType("playwright")
+    playwright_module.async_api = async_api_module
+    sys.modules["playwright"] = playwright_module
+    sys.modules["playwright.async_api"] = async_api_module
+
+from weboter.builtin.network import RequestBlocker, ResponseCapture, capture_for, page_block_stats, remove_capture
+from weboter.core.engine.har import HarSession
+
+
+class _FakePage:
+    def __init__(self, url, context):
+        self.url = url
+        self.context = context
+
+
+class _FakeRequest:
+    def __init__(self, url, resource_type, page, navigation=False):
+        self.url = url
+        self.resource_type = resource_type
+        self.frame = types.SimpleNamespace(page=page)
+        self._navigation = navigation
+
+    def is_navigation_request(self):
+        return self._navigation
+
+
+class _FakeRoute:
+    def __init__(self, request):
+        self.request = request
+        self.result = None
+
+    async def fallback(self):
+        self.result = "fallback"
+
+    async def abort(self, error_code=None):
+        self.result = "abort"
+
+
+class _FakeContext:
+    def __init__(self):
+        self.handler = None
+        self.har_routes = []
+        self.listeners = {}
+
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+    async def route_from_har(self, path, not_found=None):
+        self.har_routes.append((path, not_found))
+
+    def on(self, event, handler):
+        self.listeners.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners[event].remove(handler)
+
+    def emit(self, event, payload):
+        for handler in list(self.listeners.get(event, [])):
+            handler(payload)
+
+
+class _FakeResponse:
+    def __init__(self, url, content_type, body, status=200, headers=None, delay=0):
+        self.url = url
+        self.status = status
+        self.headers = {"content-type": content_type, **(headers or {})}
+        self.request = types.SimpleNamespace(method="GET")
+        self._body = body
+        self.delay = delay
+        self.body_reads = 0
+
+    async def body(self):
+        self.body_reads += 1
+        await asyncio.sleep(self.delay)
+        return self._body
+
+
+class RequestBlockerTests(unittest.TestCase):
+    def test_profiles_merge_with_custom_rules(self):
+        blocker = RequestBlocker.from_inputs("no-media, no-third-party", ["stylesheet"], ["*/ads/*"])
+
+        self.assertEqual(blocker.match("https://a.example.com/x.png", "image", "https://www.example.com/"), "resource_type")
+        self.assertEqual(blocker.match("https://www.example.com/ads/1.js", "script", "https://www.example.com/"), "url_pattern")
+        self.assertEqual(blocker.match("https://cdn.tracker.net/t.js", "script", "https://www.example.com/"), "third_party")
+        self.assertIsNone(blocker.match("https://static.example.com/app.js", "script", "https://www.example.com/"))
+        self.assertIsNone(RequestBlocker.from_inputs("", [], []))
+        with self.assertRaisesRegex(ValueError, "Unknown block profile"):
+            RequestBlocker.from_inputs("no-images")
+
+    def test_blocked_requests_are_counted_per_page(self):
+        context = _FakeContext()
+        page = _FakePage("https://www.example.com/", context)
+        other_page = _FakePage("https://www.example.com/other", context)
+        blocker = RequestBlocker.from_inputs("text-only")
+
+        async def scenario():
+            await blocker.install(context)
+            routes = [
+                _FakeRoute(_FakeRequest("https://www.example.com/", "document", page, navigation=True)),
+                _FakeRoute(_FakeRequest("https://www.example.com/a.png", "image", page)),
+                _FakeRoute(_FakeRequest("https://www.example.com/a.woff2", "font", page)),
+                _FakeRoute(_FakeRequest("https://www.example.com/app.js", "script", page)),
+            ]
+            for route in routes:
+                await context.handler(route)
+            return [route.result for route in routes]
+
+        results = asyncio.run(scenario())
+
+        self.assertEqual(results, ["fallback", "abort", "abort", "fallback"])
+        self.assertEqual(page_block_stats(page), {"blocked": 2, "by_type": {"image": 1, "font": 1}})
+        self.assertEqual(page_block_stats(other_page), {"blocked": 0, "by_type": {}})
+        self.assertIsNone(page_block_stats(_FakePage("about:blank", _FakeContext())))
+
+
+class ResponseCaptureTests(unittest.TestCase):
+    def test_matching_responses_are_buffered_with_bounded_size(self):
+        context = _FakeContext()
+        capture = ResponseCapture.from_inputs("api", "*/api/*", max_items=2, max_body_bytes=64)
+
+        async def scenario():
+            capture.attach(context, context)
+            context.emit("response", _FakeResponse("https://x.com/api/1", "application/json; charset=utf-8", b'{"id": 1}'))
+            context.emit("response", _FakeResponse("https://x.com/app.js", "application/json", b"{}"))
+            context.emit("response", _FakeResponse("https://x.com/api/page", "text/html", b"<html>"))
+            context.emit("response", _FakeResponse("https://x.com/api/2", "application/ld+json", b'{"id": 2}'))
+            context.emit("response", _FakeResponse("https://x.com/api/3", "application/json", b"[" + b"0," * 40 + b"0]"))
+            reached = await capture.wait_for(2, 1)
+            return reached, capture.collect()
+
+        reached, items = asyncio.run(scenario())
+
+        self.assertTrue(reached)
+        self.assertEqual([item["url"] for item in items], ["https://x.com/api/2", "https://x.com/api/3"])
+        self.assertEqual(items[0]["json"], {"id": 2})
+        self.assertTrue(items[1]["truncated"])
+        self.assertNotIn("json", items[1])
+        self.assertEqual((capture.matched, capture.dropped), (3, 1))
+        self.assertIs(capture_for(context, "api"), capture)
+
+        remove_capture(context, "api")
+        self.assertIsNone(capture_for(context, "api"))
+        self.assertEqual(context.listeners["response"], [])
+
+    def test_oversized_and_burst_responses_keep_metadata_only(self):
+        context = _FakeContext()
+        capture = ResponseCapture(name="burst", max_items=10, max_body_bytes=100, max_pending_reads=2)
+        large = _FakeResponse("https://x.com/api/big", "application/json", b"{}", headers={"content-length": "5000"})
+        burst = [_FakeResponse(f"https://x.com/api/{index}", "application/json", b"{}", delay=0.05) for index in range(4)]
+
+        async def scenario():
+            capture.attach(context, context)
+            context.emit("response", large)
+            for response in burst:
+                context.emit("response", response)
+            self.assertEqual(capture.describe()["pending"], 2)
+            await capture.drain()
+            return capture.collect()
+
+        items = asyncio.run(scenario())
+
+        self.assertEqual(large.body_reads, 0)
+        self.assertEqual(items[0], {**items[0], "size": 5000, "truncated": True})
+        self.assertEqual([response.body_reads for response in burst], [1, 1, 0, 0])
+        self.assertEqual(sum(1 for item in items if item.get("skipped")), 2)
+        self.assertEqual(sum(1 for item in items if "json" in item), 2)
+        self.assertEqual((capture.matched, capture.skipped), (5, 2))
+
+    def test_wait_for_does_not_await_endless_body_reads(self):
+        context = _FakeContext()
+        capture = ResponseCapture(name="poll")
+        stream = _FakeResponse("https://x.com/api/stream", "application/json", b"{}", delay=60)
+
+        async def scenario():
+            capture.attach(context, context)
+            context.emit("response", stream)
+            context.emit("response", _FakeResponse("https://x.com/api/1", "application/json", b'{"id": 1}'))
+            reached = await asyncio.wait_for(capture.wait_for(1, 0.1), 5)
+            pending = capture.pending_reads
+            for task in list(capture._pending):
+                task.cancel()
+            return reached, pending, capture.collect()
+
+        reached, pending, items = asyncio.run(scenario())
+
+        self.assertTrue(reached)
+        self.assertEqual(pending, 1)
+        self.assertEqual([item["url"] for item in items], ["https://x.com/api/1"])
+
+    def test_wait_for_times_out_when_too_few_responses(self):
+        capture = ResponseCapture.from_inputs()
+
+        self.assertFalse(asyncio.run(capture.wait_for(1, 0.05)))
+        self.assertEqual(capture.collect(), [])
+
+
+class HarSessionTests(unittest.TestCase):
+    def test_record_paths_are_numbered_per_context(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            har = HarSession("record", Path(temp_dir) / "har" / "task.har")
+            first, second = har.next_path(), har.next_path()
+
+            self.assertEqual((first.name, second.name), ("task.har", "task-2.har"))
+            self.assertEqual(har.context_options(first), {"record_har_path": str(first)})
+            self.assertTrue(first.parent.is_dir())
+
+    def test_replay_routes_context_from_existing_har(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "task.har"
+            path.write_text("{}", encoding="utf-8")
+            har = HarSession("replay", path)
+            context = _FakeContext()
+
+            asyncio.run(har.attach(context, har.next_path()))
+
+            self.assertEqual(har.context_options(path), {})
+            self.assertEqual(context.har_routes, [(str(path), "abort")])
+            with self.assertRaises(FileNotFoundError):
+                asyncio.run(har.attach(context, har.next_path()))
+            with self.assertRaisesRegex(ValueError, "Invalid HAR mode"):
+                HarSession("live", path)
@@ -1,4 +1,6 @@
 import asyncio
+import gzip
+import json
 import logging
 import sys
 import tempfile
@@ -11,17 +13,34 @@ from unittest import mock
 if "playwright.async_api" not in sys.modules:
     async_api_module = types.ModuleType("playwright.async_api")
 
+    class _StubPlaywright:
+        pass
+
+    class _StubBrowser:
+        pass
+
+    class _StubBrowserContext:
+        pass
+
     class _StubPage:
         pass
 
+    class _StubLocator:
+        pass
+
+    async_api_module.Playwright = _StubPlaywright
+    async_api_module.Browser = _StubBrowser
+    async_api_module.BrowserContext = _StubBrowserContext
     async_api_module.Page = _StubPage
+    async_api_module.Locator = _StubLocator
     playwright_module = types.ModuleType("playwright")
     playwright_module.async_api = async_api_module
     sys.modules["playwright"] = playwright_module
     sys.modules["playwright.async_api"] = async_api_module
 
 from weboter.app import session as session_module
-from weboter.app.session import ExecutionSessionManager, SESSION_STATUS_PAUSED
+from weboter.app.session import ExecutionSessionManager, SESSION_STATUS_PAUSED, SESSION_STATUS_RUNNING
+from weboter.app.snapshot_writer import SnapshotWriter
 from weboter.public.model import Flow, Node
 
 
@@ -125,6 +144,7 @@ class SessionDebugTests(unittest.IsolatedAsyncioTestCase):
         )
 
     def tearDown(self):
+        self.manager.close()
         self.temp_dir.cleanup()
 
     async def test_breakpoint_pauses_before_step(self):
@@ -144,6 +164,20 @@ class SessionDebugTests(unittest.IsolatedAsyncioTestCase):
         await asyncio.to_thread(self.manager.resume, self.session.record.session_id)
         await task
 
+    async def test_paused_session_waits_without_writes_and_resumes_immediately(self):
+        executor = _FakeExecutor(self.flow, self.node)
+        self.session.request_pause()
+        task = asyncio.create_task(self.session._wait_for_commands(executor))
+        await asyncio.sleep(0.05)
+
+        with mock.patch.object(self.manager, "_save_record", wraps=self.manager._save_record) as save_record:
+            await asyncio.sleep(0.3)
+            self.assertEqual(save_record.call_count, 0)
+
+        await asyncio.to_thread(self.manager.resume, self.session.record.session_id)
+        await asyncio.wait_for(task, 0.5)
+        self.assertEqual(self.session.record.status, SESSION_STATUS_RUNNING)
+
     async def test_session_created_with_pause_before_start_stops_before_first_node(self):
         session = self.manager.create_session(
             task_id="task-2",
@@ -164,6 +198,37 @@ class SessionDebugTests(unittest.IsolatedAsyncioTestCase):
         await asyncio.to_thread(self.manager.resume, session.record.session_id)
         await task
 
+    async def test_hook_mode_skips_steps_but_keeps_breakpoints(self):
+        session = self.manager.create_session(
+            task_id="task-3",
+            workflow_path=self.root / "demo.json",
+            workflow_name="demo",
+            log_path=self.root / "task-3.log",
+            hook_mode="errors",
+        )
+        executor = _FakeExecutor(self.flow, self.node)
+        data_plan = types.SimpleNamespace(touches_page=False, hook_mode=None)
+
+        self.assertFalse(session.wants_step(executor, self.node, data_plan))
+        self.assertTrue(session.wants_step(executor, self.node, types.SimpleNamespace(touches_page=False, hook_mode=("all", 1))))
+
+        session.configure_breakpoints([{"id": "bp-1", "phase": "before_step", "node_id": "node-1"}])
+        self.assertTrue(session.wants_step(executor, self.node, data_plan))
+        session.clear_breakpoints()
+
+        session.request_pause("manual")
+        self.assertTrue(session.wants_step(executor, self.node, data_plan))
+
+    async def test_hook_mode_rejects_unknown_value(self):
+        with self.assertRaisesRegex(ValueError, "hook mode"):
+            self.manager.create_session(
+                task_id="task-4",
+                workflow_path=self.root / "demo.json",
+                workflow_name="demo",
+                log_path=self.root / "task-4.log",
+                hook_mode="every:0",
+            )
+
     async def test_page_script_runs_with_guarded_context(self):
         page = _FakePage()
         executor = _FakeExecutor(self.flow, self.node, page=page)
@@ -199,6 +264,222 @@ class SessionDebugTests(unittest.IsolatedAsyncioTestCase):
         self.assertNotIn("runtime", items[0])
         self.assertNotIn("workflow", items[0])
 
+    async def test_snapshot_writer_drops_step_snapshots_when_queue_is_full(self):
+        writer = SnapshotWriter(queue_size=2, policy="drop")
+        manager = ExecutionSessionManager(self.root / "drop", self.logger, snapshot_writer=writer)
+        session = manager.create_session(
+            task_id="task-5",
+            workflow_path=self.root / "demo.json",
+            workflow_name="demo",
+            log_path=self.root / "task-5.log",
+        )
+        executor = _FakeExecutor(self.flow, self.node)
+
+        # 写入线程未启动时队列只进不出，第三个普通快照被丢弃
+        with mock.patch.object(writer, "_ensure_started"):
+            for _ in range(3):
+                await session.capture_snapshot(executor, phase="before_step", node=self.node)
+        self.assertEqual(session.record.snapshots_dropped, 1)
+
+        writer._ensure_started()
+        self.assertTrue(writer.flush(2.0))
+        files = sorted(manager.snapshot_root("task-5").glob("*.json"))
+        record = manager.get_session("task-5")
+
+        self.assertEqual([path.name for path in files], ["00001_before_step.json", "00002_before_step.json"])
+        self.assertNotIn("\n", files[0].read_text(encoding="utf-8"))
+        self.assertEqual(record.snapshot_count, 3)
+        self.assertEqual(record.last_snapshot_path, str(files[-1]))
+        self.assertEqual(writer.stats()["dropped"], 1)
+        manager.close()
+
+    async def test_snapshots_store_workflow_versions_and_runtime_deltas(self):
+        manager = ExecutionSessionManager(self.root / "delta", self.logger, snapshot_keyframe_every=3)
+        session = manager.create_session(
+            task_id="task-6",
+            workflow_path=self.root / "demo.json",
+            workflow_name="demo",
+            log_path=self.root / "task-6.log",
+        )
+        executor = _FakeExecutor(self.flow, self.node)
+        data = executor.runtime.data_context.data
+
+        await session.capture_snapshot(executor, phase="before_step", node=self.node)
+        data["flow"]["value"] = 2
+        data["cur_outputs"] = {"result": "ok"}
+        await session.capture_snapshot(executor, phase="after_step", node=self.node)
+        await session._apply_command("patch_node", {"node_id": "node-1", "patch": {"name": "Renamed"}}, executor)
+        del data["flow"]["value"]
+        await session.capture_snapshot(executor, phase="before_step", node=self.node)
+        await session.capture_snapshot(executor, phase="after_step", node=self.node)
+        manager.snapshot_writer.flush(2.0)
+
+        stored = json.loads(manager._resolve_snapshot_file("task-6", 2).read_text(encoding="utf-8"))
+        self.assertNotIn("workflow", stored)
+        self.assertNotIn("runtime", stored)
+        self.assertEqual(stored["runtime_delta"]["base"], 1)
+        self.assertIn("runtime", json.loads(manager._resolve_snapshot_file("task-6", 4).read_text(encoding="utf-8")))
+        self.assertEqual(sorted(path.name for path in manager.workflow_version_root("task-6").iterdir()), ["v0001.json", "v0002.json"])
+
+        second = manager.get_snapshot_detail("task-6", 2, sections=["runtime", "workflow"])
+        third = manager.get_snapshot_detail("task-6", 3, sections=["runtime"])
+        self.assertEqual(second["sections"]["runtime"]["items"]["flow"]["items"]["value"], 2)
+        self.assertEqual(second["sections"]["runtime"]["items"]["cur_outputs"]["items"]["result"], "ok")
+        self.assertNotIn("value", third["sections"]["runtime"]["items"]["flow"]["items"])
+        manager.mark_session_finished("task-6", True)
+        self.assertEqual(manager.get_workflow("task-6")["workflow"]["nodes"][0]["name"], "Renamed")
+        manager.close()
+
+    async def test_flush_waits_only_for_the_requested_session(self):
+        writer = SnapshotWriter()
+        manager = ExecutionSessionManager(self.root / "flush", self.logger, snapshot_writer=writer)
+        busy, idle = (
+            manager.create_session(
+                task_id=task_id,
+                workflow_path=self.root / "demo.json",
+                workflow_name="demo",
+                log_path=self.root / f"{task_id}.log",
+            )
+            for task_id in ("task-busy", "task-idle")
+        )
+        executor = _FakeExecutor(self.flow, self.node)
+
+        # 写入线程未启动时 busy 的快照一直未落盘
+        with mock.patch.object(writer, "_ensure_started"):
+            await busy.capture_snapshot(executor, phase="before_step", node=self.node)
+        self.assertTrue(writer.flush(0, session_id=idle.record.session_id))
+        self.assertFalse(writer.flush(0, session_id=busy.record.session_id))
+
+        # 回调抛出任意异常时写入线程仍然存活，后续快照照常落盘
+        writer._ensure_started()
+        with mock.patch.object(busy, "_on_snapshot_written", side_effect=RuntimeError("boom")):
+            self.assertTrue(writer.flush(2.0, session_id=busy.record.session_id))
+        await idle.capture_snapshot(executor, phase="before_step", node=self.node)
+        self.assertTrue(writer.flush(2.0, session_id=idle.record.session_id))
+        self.assertEqual(len(manager.get_snapshots("task-idle", limit=5)), 1)
+        manager.close()
+
+    async def test_failed_keyframe_write_forces_next_keyframe(self):
+        writer = SnapshotWriter()
+        manager = ExecutionSessionManager(self.root / "rekey", self.logger, snapshot_writer=writer, snapshot_keyframe_every=10)
+        session = manager.create_session(
+            task_id="task-9",
+            workflow_path=self.root / "demo.json",
+            workflow_name="demo",
+            log_path=self.root / "task-9.log",
+        )
+        executor = _FakeExecutor(self.flow, self.node)
+
+        with mock.patch.object(writer, "_ensure_started"):
+            await session.capture_snapshot(executor, phase="before_step", node=self.node)
+        with mock.patch.object(Path, "write_bytes", side_effect=OSError("disk full")):
+            writer._ensure_started()
+            self.assertTrue(writer.flush(2.0))
+        await session.capture_snapshot(executor, phase="after_step", node=self.node)
+        writer.flush(2.0)
+
+        stored = json.loads(manager._resolve_snapshot_file("task-9", 2).read_text(encoding="utf-8"))
+        self.assertIn("runtime", stored)
+        self.assertNotIn("runtime_delta", stored)
+        self.assertEqual(writer.stats()["failed"], 1)
+        manager.close()
+
+    async def test_snapshot_index_pages_and_filters_without_reading_bodies(self):
+        executor = _FakeExecutor(self.flow, self.node)
+        for phase in ["before_step", "after_step", "error", "before_step", "after_step"]:
+            await self.session.capture_snapshot(executor, phase=phase, node=self.node)
+        self.manager.snapshot_writer.flush(2.0)
+        session_id = self.session.record.session_id
+        # 列表只读索引：快照正文损坏不影响摘要
+        for path in self.manager.snapshot_root(session_id).glob("*.json"):
+            path.write_text("corrupted", encoding="utf-8")
+
+        first = self.manager.list_snapshots(session_id, limit=2)
+        second = self.manager.list_snapshots(session_id, limit=2, cursor=first["next_cursor"])
+        last = self.manager.list_snapshots(session_id, limit=2, cursor=second["next_cursor"])
+        errors = self.manager.list_snapshots(session_id, phase="error")
+
+        self.assertEqual([item["index"] for item in first["items"]], [5, 4])
+        self.assertEqual([item["index"] for item in second["items"]], [3, 2])
+        self.assertEqual([item["index"] for item in last["items"]], [1])
+        self.assertIsNone(last["next_cursor"])
+        self.assertEqual([item["index"] for item in errors["items"]], [3])
+        self.assertEqual(first["items"][0]["workflow_summary"]["node_count"], 1)
+        self.assertIn("runtime", first["items"][0]["available_sections"])
+        index_path = self.manager.snapshot_root(session_id) / "index.jsonl"
+        self.assertEqual(
+            list(self.manager._iter_snapshot_index(index_path, chunk_size=16)),
+            list(self.manager._iter_snapshot_index(index_path)),
+        )
+
+    async def test_snapshot_index_is_rebuilt_for_legacy_sessions(self):
+        executor = _FakeExecutor(self.flow, self.node)
+        await self.session.capture_snapshot(executor, phase="before_step", node=self.node)
+        await self.session.capture_snapshot(executor, phase="after_step", node=self.node)
+        self.manager.snapshot_writer.flush(2.0)
+        session_id = self.session.record.session_id
+        (self.manager.snapshot_root(session_id) / "index.jsonl").unlink()
+
+        items = self.manager.get_snapshots(session_id)
+
+        self.assertEqual([item["phase"] for item in items], ["after_step", "before_step"])
+        self.assertTrue((self.manager.snapshot_root(session_id) / "index.jsonl").is_file())
+
+    async def test_compressed_snapshots_and_artifacts_round_trip(self):
+        manager = ExecutionSessionManager(
+            self.root / "gz", self.logger, snapshot_writer=SnapshotWriter(compress=True), snapshot_keyframe_every=2
+        )
+        session = manager.create_session(
+            task_id="task-7",
+            workflow_path=self.root / "demo.json",
+            workflow_name="demo",
+            log_path=self.root / "task-7.log",
+        )
+        executor = _FakeExecutor(self.flow, self.node)
+        await session.capture_snapshot(executor, phase="before_step", node=self.node)
+        executor.runtime.data_context.data["flow"]["value"] = 3
+        await session.capture_snapshot(executor, phase="after_step", node=self.node)
+        manager.snapshot_writer.flush(2.0)
+
+        names = sorted(path.name for path in manager.snapshot_root("task-7").glob("0*"))
+        self.assertEqual(names, ["00001_before_step.json.gz", "00002_after_step.json.gz"])
+        self.assertEqual(manager._resolve_snapshot_file("task-7", 2).read_bytes()[:2], b"\x1f\x8b")
+        detail = manager.get_snapshot_detail("task-7", 2, sections=["runtime"])
+        self.assertEqual(detail["sections"]["runtime"]["items"]["flow"]["items"]["value"], 3)
+        self.assertEqual([item["index"] for item in manager.get_snapshots("task-7")], [2, 1])
+
+        with gzip.open(manager.session_root("task-7") / "page_1.html.gz", "wt", encoding="utf-8") as file_obj:
+            file_obj.write("<html></html>")
+        with manager.open_artifact("task-7", "page_1.html") as stream:
+            self.assertEqual(stream.read(), b"<html></html>")
+        with self.assertRaises(ValueError):
+            manager.open_artifact("task-7", "../task-7.json")
+        manager.close()
+
+    async def test_storage_eviction_keeps_error_snapshots_and_live_keyframe(self):
+        manager = ExecutionSessionManager(self.root / "evict", self.logger, snapshot_keyframe_every=2)
+        session = manager.create_session(
+            task_id="task-8",
+            workflow_path=self.root / "demo.json",
+            workflow_name="demo",
+            log_path=self.root / "task-8.log",
+        )
+        executor = _FakeExecutor(self.flow, self.node)
+        # 关键帧为 1、3、5，2 为依赖关键帧 1 的 error 快照
+        for phase in ["before_step", "error", "before_step", "after_step", "before_step", "after_step"]:
+            await session.capture_snapshot(executor, phase=phase, node=self.node)
+        manager.snapshot_writer.flush(2.0)
+        (manager.session_root("task-8") / "page_1.png").write_bytes(b"png")
+
+        result = manager.evict_session_storage("task-8", 10 ** 9)
+
+        self.assertEqual([item["index"] for item in manager.get_snapshots("task-8")], [6, 5, 2, 1])
+        self.assertEqual(result["evicted"], 3)
+        self.assertFalse((manager.session_root("task-8") / "page_1.png").exists())
+        detail = manager.get_snapshot_detail("task-8", 2, sections=["runtime"])
+        self.assertIn("flow", detail["sections"]["runtime"]["items"])
+        manager.close()
+
     async def test_snapshot_detail_returns_requested_sections_only(self):
         executor = _FakeExecutor(self.flow, self.node)
         await self.session.capture_snapshot(executor, phase="before_step", node=self.node)
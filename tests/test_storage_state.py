@@ -0,0 +1,95 @@
+import asyncio
+from pathlib import Path
+import sys
+import tempfile
+import types
+import unittest
+
+
+if "playwright.async_api" not in sys.modules:
+    async_api_module = types.ModuleType("playwright.async_api")
+
+    class _StubPlaywright:
+        pass
+
+    class _StubBrowser:
+        pass
+
+    class _StubBrowserContext:
+        pass
+
+    class _StubPage:
+        pass
+
+    class _StubLocator:
+        pass
+
+    async_api_module.Playwright = _StubPlaywright
+    async_api_module.Browser = _StubBrowser
+    async_api_module.BrowserContext = _StubBrowserContext
+    async_api_module.Page = _StubPage
+    async_api_module.Locator = _StubLocator
+    playwright_module = types.ModuleType("playwright")
+    playwright_module.async_api = async_api_module
+    sys.modules["playwright"] = playwright_module
+    sys.modules["playwright.async_api"] = async_api_module
+
+from weboter.builtin.basic_action import SaveStorageState
+from weboter.core.engine.storage_state import StorageStateStore
+from weboter.public.contracts.io_pipe import IOPipe
+
+
+class _FakeContext:
+    async def storage_state(self):
+        return {
+            "cookies": [{"name": "sid", "value": "abc", "domain": "example.com", "path": "/"}],
+            "origins": [{"origin": "https://example.com", "localStorage": [{"name": "k", "value": "v"}]}],
+        }
+
+
+class _ActionIO(IOPipe):
+    def __init__(self):
+        super().__init__()
+        self._cur_node = "node_a"
+        self._flow_data = {}
+
+    @property
+    def cur_node(self) -> str:
+        return self._cur_node
+
+    @property
+    def flow_data(self) -> dict:
+        return self._flow_data
+
+    @flow_data.setter
+    def flow_data(self, value: dict):
+        self._flow_data = value
+
+
+class StorageStateTests(unittest.TestCase):
+    def test_save_action_persists_state_for_profile(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = StorageStateStore(Path(temp_dir), default_ttl=60)
+            io = _ActionIO()
+            io.executor = types.SimpleNamespace(storage_states=store)
+            io.browser = _FakeContext()
+            io.inputs.update({"profile": "shop.main"})
+
+            asyncio.run(SaveStorageState().execute(io))
+
+            summary = io.outputs["storage_state"]
+            self.assertEqual((summary["profile"], summary["cookies"], summary["origins"]), ("shop.main", 1, 1))
+            self.assertEqual(store.load("shop.main")["cookies"][0]["value"], "abc")
+            self.assertEqual(oct(store.path("shop.main").stat().st_mode & 0o777), oct(0o600))
+            self.assertIsNone(store.load("shop.main", max_age=1e-9))
+
+    def test_expired_or_invalid_profiles_are_not_loaded(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = StorageStateStore(Path(temp_dir))
+            store.save("short", {"cookies": [], "origins": []}, ttl=1e-6)
+
+            self.assertIsNone(store.load("short"))
+            self.assertFalse(store.path("short").exists())
+            self.assertIsNone(store.load("missing"))
+            with self.assertRaisesRegex(ValueError, "Invalid storage profile"):
+                store.path("../escape")
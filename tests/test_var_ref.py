@@ -0,0 +1,28 @@
+import unittest
+
+from weboter.core.engine.runtime import DataContext
+from weboter.public.model import VarRef
+
+
+class VarRefTests(unittest.TestCase):
+    def test_parse_keeps_legacy_brace_semantics(self):
+        ref = VarRef.parse("$flow{user.profile.name}")
+        internal = VarRef.parse("$global{{current_page}}")
+
+        self.assertEqual(ref.prefix, "flow")
+        self.assertEqual(ref.path, ("user", "profile", "name"))
+        self.assertEqual(internal.path, ("{current_page",))
+        self.assertIs(VarRef.parse("$flow{user.profile.name}"), ref)
+        self.assertIsNone(VarRef.parse("flow.user"))
+        self.assertIsNone(VarRef.parse(123))
+
+    def test_data_context_ref_lookup_matches_string_lookup(self):
+        ctx = DataContext()
+        ctx.set_ref(VarRef.parse("$flow{a.b}"), 1)
+
+        self.assertEqual(ctx.get_data("$flow{a.b}"), 1)
+        self.assertIsNone(ctx.get_data("$flow{a.c}"))
+        with self.assertRaisesRegex(KeyError, "未知的变量前缀"):
+            ctx.get_data("$unknown{a}")
+        with self.assertRaisesRegex(KeyError, "格式不正确"):
+            ctx.set_data("flow.a", 1)
@@ -0,0 +1,284 @@
+import asyncio
+import logging
+import queue
+import threading
+from typing import Any, Awaitable, Callable
+
+import playwright.async_api as pw
+
+
+SUPPORTED_BROWSER_TYPES = ("chromium", "firefox", "webkit")
+
+
+class _PooledBrowser:
+    __slots__ = ("browser_type", "browser", "uses", "active", "retired")
+
+    def __init__(self, browser_type: str, browser):
+        self.browser_type = browser_type
+        self.browser = browser
+        self.uses = 0
+        self.active = 0
+        # 达到 recycle_after 后不再分配新 context，最后一个 context 归还时关闭
+        self.retired = False
+
+
+class BrowserLease:
+    """任务从池中租用的浏览器：独享一个新的 BrowserContext，浏览器进程与其他任务共享"""
+
+    def __init__(self, worker: "_PoolWorker", pooled: _PooledBrowser, context):
+        self._worker = worker
+        self._pooled = pooled
+        self.context = context
+        self.released = False
+
+    @property
+    def playwright(self):
+        return self._worker.playwright
+
+    @property
+    def browser(self):
+        return self._pooled.browser
+
+    async def release(self) -> None:
+        if self.released:
+            return
+        self.released = True
+        try:
+            await self.context.close()
+        except Exception:
+            pass
+        await self._worker.give_back(self, self._pooled)
+
+
+class _PoolWorker:
+    """一个常驻事件循环线程及其 playwright 实例；Playwright 对象只能在创建它的事件循环中使用"""
+
+    def __init__(self, pool: "BrowserPool", index: int):
+        self.pool = pool
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, name=f"weboter-browser-{index}", daemon=True)
+        self.playwright = None
+        self.browsers: dict[str, list[_PooledBrowser]] = {}
+        self.leases: list[BrowserLease] = []
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _ensure_playwright(self):
+        if self.playwright is None:
+            self.playwright = await pw.async_playwright().start()
+        return self.playwright
+
+    async def _launch(self, browser_type: str) -> _PooledBrowser:
+        playwright = await self._ensure_playwright()
+        browser = await getattr(playwright, browser_type).launch(headless=self.pool.headless)
+        pooled = _PooledBrowser(browser_type, browser)
+        self.browsers.setdefault(browser_type, []).append(pooled)
+        return pooled
+
+    async def warm(self, browser_type: str | None = None) -> None:
+        for name in [browser_type] if browser_type else self.pool.browser_types:
+            while len(self.browsers.get(name, [])) < self.pool.size:
+                await self._launch(name)
+
+    async def lease(self, browser_type: str, context_options: dict[str, Any] | None = None) -> BrowserLease:
+        pooled_list = self.browsers.setdefault(browser_type, [])
+        # 丢弃已断开的浏览器（崩溃或被工作流自行关闭）
+        pooled_list[:] = [item for item in pooled_list if item.browser.is_connected()]
+        # 同一任务的多次 OpenBrowser（包括并发的 ForkJoin/ForEach 分支）共用负载最低的浏览器，
+        # 所有浏览器都达到 max_contexts_per_browser 时临时启动一个新浏览器，归还后关闭多出的部分
+        candidates = [
+            item for item in pooled_list
+            if not item.retired and item.active < self.pool.max_contexts_per_browser
+        ]
+        pooled = min(candidates, key=lambda item: item.active) if candidates else await self._launch(browser_type)
+        pooled.uses += 1
+        pooled.active += 1
+        if self.pool.recycle_after and pooled.uses >= self.pool.recycle_after:
+            pooled.retired = True
+        try:
+            context = await pooled.browser.new_context(**(context_options or {}))
+        except Exception:
+            pooled.active -= 1
+            raise
+        lease = BrowserLease(self, pooled, context)
+        self.leases.append(lease)
+        return lease
+
+    async def give_back(self, lease: BrowserLease, pooled: _PooledBrowser) -> None:
+        if lease in self.leases:
+            self.leases.remove(lease)
+        pooled.active -= 1
+        if pooled.active > 0:
+            return
+        pooled_list = self.browsers.get(pooled.browser_type, [])
+        if not pooled.retired and len(pooled_list) <= self.pool.size:
+            return
+        if pooled in pooled_list:
+            pooled_list.remove(pooled)
+        try:
+            await pooled.browser.close()
+        except Exception:
+            pass
+        if pooled.retired and pooled.browser_type in self.pool.browser_types:
+            # 回收后补足预热数量，下一个任务无需等待启动
+            try:
+                await self.warm(pooled.browser_type)
+            except Exception as exc:
+                self.pool.log_warning("Browser pool re-warm failed (%s): %s", pooled.browser_type, exc)
+
+    async def release_all(self) -> None:
+        for lease in list(self.leases):
+            await lease.release()
+
+    async def close(self) -> None:
+        await self.release_all()
+        for pooled_list in self.browsers.values():
+            for pooled in pooled_list:
+                try:
+                    await pooled.browser.close()
+                except Exception:
+                    pass
+        self.browsers.clear()
+        if self.playwright is not None:
+            try:
+                await self.playwright.stop()
+            except Exception:
+                pass
+            self.playwright = None
+
+    def owns(self, resource: Any) -> bool:
+        if resource is None:
+            return False
+        if resource is self.playwright:
+            return True
+        return any(item.browser is resource for pooled_list in self.browsers.values() for item in pooled_list)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            name: [
+                {"uses": item.uses, "active_contexts": item.active, "retired": item.retired}
+                for item in pooled_list
+            ]
+            for name, pooled_list in self.browsers.items()
+        }
+
+
+class BrowserPool:
+    """service 持有的预热浏览器池。
+
+    每个 worker 是一个常驻事件循环线程，任务通过 run() 在空闲 worker 上执行整个工作流，
+    OpenBrowser 通过 lease() 从当前 worker 租用浏览器并获得独立的 BrowserContext。
+    run() 结束（成功或失败）时归还该任务的全部租约。
+
+    Playwright 对象不能跨事件循环使用，浏览器只在所属 worker 内复用，不在 worker 之间共享：
+    池中常驻的浏览器数为 workers × size × len(browser_types)。
+    单个浏览器同时最多分配 max_contexts_per_browser 个 context，超出时在该 worker 内临时启动新浏览器。
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        size: int = 1,
+        max_contexts_per_browser: int = 4,
+        recycle_after: int = 50,
+        browser_types: list[str] | tuple[str, ...] = ("chromium",),
+        headless: bool = True,
+        logger: logging.Logger | None = None,
+    ):
+        unknown = [name for name in browser_types if name not in SUPPORTED_BROWSER_TYPES]
+        if unknown:
+            raise ValueError(f"Unsupported browser type in browser_pool: {', '.join(unknown)}")
+        self.worker_count = max(1, int(workers))
+        self.size = max(0, int(size))
+        self.max_contexts_per_browser = max(1, int(max_contexts_per_browser))
+        self.recycle_after = max(0, int(recycle_after))
+        self.browser_types = tuple(browser_types)
+        self.headless = bool(headless)
+        self.logger = logger
+        self._workers: list[_PoolWorker] = []
+        self._idle: queue.SimpleQueue[_PoolWorker] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def log_warning(self, message: str, *args) -> None:
+        if self.logger:
+            self.logger.warning(message, *args)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for index in range(self.worker_count):
+                worker = _PoolWorker(self, index)
+                worker.thread.start()
+                self._workers.append(worker)
+                self._idle.put(worker)
+                asyncio.run_coroutine_threadsafe(self._prewarm(worker), worker.loop)
+
+    async def _prewarm(self, worker: _PoolWorker) -> None:
+        try:
+            await worker.warm()
+        except Exception as exc:
+            self.log_warning("Browser pool pre-warm failed: %s", exc)
+
+    def supports(self, browser_type: str, headless: bool) -> bool:
+        return browser_type in self.browser_types and bool(headless) == self.headless
+
+    def run(self, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """在空闲 worker 的事件循环上运行一个任务，阻塞直到完成"""
+        self.start()
+        worker = self._idle.get()
+        try:
+            future = asyncio.run_coroutine_threadsafe(self._run_on(worker, coro_factory), worker.loop)
+            return future.result()
+        finally:
+            self._idle.put(worker)
+
+    @staticmethod
+    async def _run_on(worker: _PoolWorker, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return await coro_factory()
+        finally:
+            await worker.release_all()
+
+    async def lease(self, browser_type: str, context_options: dict[str, Any] | None = None) -> BrowserLease:
+        """只能在 run() 启动的协程中调用；context_options 透传给 browser.new_context"""
+        loop = asyncio.get_running_loop()
+        for worker in self._workers:
+            if worker.loop is loop:
+                return await worker.lease(browser_type, context_options)
+        raise RuntimeError("Browser pool lease must be requested from a pooled task")
+
+    def owns(self, resource: Any) -> bool:
+        """playwright 实例或浏览器是否属于池；这些对象跨任务复用，任务结束时不能关闭"""
+        return any(worker.owns(resource) for worker in self._workers)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "started": self._started,
+            "workers": self.worker_count,
+            "size": self.size,
+            # 浏览器按 worker 独立预热，size 是每个 worker、每种浏览器的数量
+            "size_scope": "per_worker",
+            "warm_browsers": self.worker_count * self.size * len(self.browser_types),
+            "max_contexts_per_browser": self.max_contexts_per_browser,
+            "recycle_after": self.recycle_after,
+            "browser_types": list(self.browser_types),
+            "browsers": [worker.summary() for worker in self._workers],
+        }
+
+    def close(self, timeout: float = 10.0) -> None:
+        with self._lock:
+            workers, self._workers = self._workers, []
+            self._idle = queue.SimpleQueue()
+            self._started = False
+        for worker in workers:
+            try:
+                asyncio.run_coroutine_threadsafe(worker.close(), worker.loop).result(timeout)
+            except Exception as exc:
+                self.log_warning("Browser pool shutdown failed: %s", exc)
+            worker.loop.call_soon_threadsafe(worker.loop.stop)
+            worker.thread.join(timeout)
@@ -109,6 +109,10 @@ class WorkflowServiceClient:
     def service_processes(self) -> dict[str, Any]:
         return self._request("GET", "/service/processes")
 
+    def service_disk_usage(self, limit: int = 20) -> dict[str, Any]:
+        query = urllib.parse.urlencode({"limit": limit})
+        return self._request("GET", f"/service/disk-usage?{query}")
+
     def list_env(self, group: str | None = None) -> dict[str, Any]:
         query = ""
         if group:
@@ -164,6 +168,9 @@ class WorkflowServiceClient:
         execute: bool = False,
         pause_before_start: bool = False,
         breakpoints: list[dict[str, Any]] | None = None,
+        hook_mode: str = "all",
+        har_mode: str | None = None,
+        har_path: str | None = None,
     ) -> dict[str, Any]:
         return self._request(
             "POST",
@@ -173,6 +180,9 @@ class WorkflowServiceClient:
                 "execute": execute,
                 "pause_before_start": pause_before_start,
                 "breakpoints": breakpoints or [],
+                "hook_mode": hook_mode,
+                "har_mode": har_mode,
+                "har_path": har_path,
             },
         )
 
@@ -185,6 +195,9 @@ class WorkflowServiceClient:
         execute: bool = False,
         pause_before_start: bool = False,
         breakpoints: list[dict[str, Any]] | None = None,
+        hook_mode: str = "all",
+        har_mode: str | None = None,
+        har_path: str | None = None,
     ) -> dict[str, Any]:
         return self._request(
             "POST",
@@ -197,6 +210,9 @@ class WorkflowServiceClient:
                 "execute": execute,
                 "pause_before_start": pause_before_start,
                 "breakpoints": breakpoints or [],
+                "hook_mode": hook_mode,
+                "har_mode": har_mode,
+                "har_path": har_path,
             },
         )
 
@@ -211,6 +227,12 @@ class WorkflowServiceClient:
         query = urllib.parse.urlencode({"lines": lines})
         return self._request("GET", f"/tasks/{task_id}/logs?{query}")
 
+    def get_task_profile(self, task_id: str) -> dict[str, Any]:
+        return self._request("GET", f"/tasks/{task_id}/profile")
+
+    def resume_task(self, task_id: str, rewarm_flow_id: str | None = None) -> dict[str, Any]:
+        return self._request("POST", f"/tasks/{task_id}/resume", {"rewarm_flow_id": rewarm_flow_id})
+
     def list_sessions(self, limit: int = 20) -> dict[str, Any]:
         query = urllib.parse.urlencode({"limit": limit})
         return self._request("GET", f"/sessions?{query}")
@@ -218,8 +240,22 @@ class WorkflowServiceClient:
     def get_session(self, session_id: str) -> dict[str, Any]:
         return self._request("GET", f"/sessions/{session_id}")
 
-    def get_session_snapshots(self, session_id: str, limit: int = 20) -> dict[str, Any]:
-        query = urllib.parse.urlencode({"limit": limit})
+    def get_session_snapshots(
+        self,
+        session_id: str,
+        limit: int = 20,
+        cursor: int | None = None,
+        phase: str | None = None,
+        node_id: str | None = None,
+    ) -> dict[str, Any]:
+        params: dict[str, Any] = {"limit": limit}
+        if cursor is not None:
+            params["cursor"] = cursor
+        if phase:
+            params["phase"] = phase
+        if node_id:
+            params["node_id"] = node_id
+        query = urllib.parse.urlencode(params)
         return self._request("GET", f"/sessions/{session_id}/snapshots?{query}")
 
     def get_session_snapshot_detail(
@@ -49,12 +49,51 @@ class ClientConfig:
     request_timeout: float = 10.0
 
 
+@dataclass
+class ActionCacheConfig:
+    enabled: bool = False
+    max_entries: int = 1000
+    default_ttl: float = 3600.0
+
+
+@dataclass
+class StorageStateConfig:
+    default_ttl: float = 86400.0
+
+
+@dataclass
+class SnapshotConfig:
+    queue_size: int = 64
+    policy: str = "sample"
+    sample_every: int = 5
+    keyframe_every: int = 20
+    compress: bool = False
+    # 配额为 0 表示不限制；超出后由后台线程每 reap_interval 秒回收最早的非 error 快照
+    session_quota_mb: float = 0
+    total_quota_mb: float = 0
+    reap_interval: float = 60.0
+
+
+@dataclass
+class BrowserPoolConfig:
+    enabled: bool = False
+    size: int = 1
+    max_contexts_per_browser: int = 4
+    recycle_after: int = 50
+    browser_types: list[str] = field(default_factory=lambda: ["chromium"])
+    headless: bool = True
+
+
 @dataclass
 class AppConfig:
     paths: PathsConfig = field(default_factory=PathsConfig)
     service: ServiceConfig = field(default_factory=ServiceConfig)
     mcp: MCPConfig = field(default_factory=MCPConfig)
     client: ClientConfig = field(default_factory=ClientConfig)
+    action_cache: ActionCacheConfig = field(default_factory=ActionCacheConfig)
+    browser_pool: BrowserPoolConfig = field(default_factory=BrowserPoolConfig)
+    storage_state: StorageStateConfig = field(default_factory=StorageStateConfig)
+    snapshots: SnapshotConfig = field(default_factory=SnapshotConfig)
     config_path: Path | None = None
 
     def workspace_root_path(self) -> Path:
@@ -92,6 +131,12 @@ class AppConfig:
     def service_secret_state_path(self) -> Path:
         return self.data_root_path() / "secrets.json"
 
+    def action_cache_path(self) -> Path:
+        return self.data_root_path() / "action_cache"
+
+    def storage_state_path(self) -> Path:
+        return self.data_root_path() / "storage_states"
+
 
 def default_config_path() -> Path:
     configured = os.environ.get("WEBOTER_CONFIG", "").strip()
@@ -0,0 +1,84 @@
+import copy
+from logging.handlers import QueueHandler
+import logging
+import queue
+import threading
+
+
+class _MessageQueueHandler(QueueHandler):
+    """在调用线程插值 message 后入队：参数按记录时的状态渲染，之后被修改的运行时数据不影响日志。
+
+    prepare 只对通过级别过滤的记录执行；标准 QueueHandler.prepare 还会在调用线程格式化整行与异常堆栈，
+    这里把这部分留给写入线程。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+
+class TaskLogWriter:
+    """任务日志的后台写入线程。
+
+    任务线程只做 message 参数插值并入队，formatter（时间、级别与异常堆栈）与文件 IO 都在写入线程完成；
+    写入线程按批取出记录并写文件，每批 flush 一次。
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_path: str, formatter: logging.Formatter, flush_interval: float = 0.2, batch_size: int = 512):
+        self.log_path = log_path
+        self.formatter = formatter
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.handler = _MessageQueueHandler(self.queue)
+        self._file = open(log_path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._drain_loop, name="weboter-task-log", daemon=True)
+        self._thread.start()
+
+    def attach(self, logger: logging.Logger) -> None:
+        logger.addHandler(self.handler)
+
+    def detach(self, logger: logging.Logger) -> None:
+        logger.removeHandler(self.handler)
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """投递结束标记并等待写入线程把剩余日志落盘"""
+        self.handler.close()
+        self.queue.put(self._STOP)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._file.close()
+
+    def _drain_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            lines = []
+            while True:
+                if item is self._STOP:
+                    stopping = True
+                    break
+                lines.append(self._format(item))
+                if len(lines) >= self.batch_size:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if lines:
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+
+    def _format(self, record: logging.LogRecord) -> str:
+        try:
+            return self.formatter.format(record)
+        except Exception:
+            return f"{record.levelname} - {record.msg!r} (log format failed)"
@@ -0,0 +1,92 @@
+import os
+from pathlib import Path
+from typing import Any, Iterable
+
+
+def process_exists(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+def read_process_cmdline(pid: int) -> list[str]:
+    cmdline_path = Path(f"/proc/{pid}/cmdline")
+    if not cmdline_path.is_file():
+        return []
+    raw = cmdline_path.read_bytes().split(b"\0")
+    return [item.decode("utf-8", errors="ignore") for item in raw if item]
+
+
+def read_process_stat(pid: int) -> dict[str, Any] | None:
+    stat_path = Path(f"/proc/{pid}/stat")
+    if not stat_path.is_file():
+        return None
+    content = stat_path.read_text(encoding="utf-8").strip()
+    end_comm = content.rfind(")")
+    if end_comm < 0:
+        return None
+    prefix = content[: end_comm + 1]
+    suffix = content[end_comm + 2 :].split()
+    if len(suffix) < 3:
+        return None
+    return {
+        "pid": pid,
+        "comm": prefix[prefix.find("(") + 1 : -1],
+        "state": suffix[0],
+        "ppid": int(suffix[1]),
+        "pgid": int(suffix[2]),
+    }
+
+
+def classify_process(cmdline: list[str], comm: str) -> str:
+    joined = " ".join(cmdline) if cmdline else comm
+    lowered = joined.lower()
+    if "playwright" in lowered:
+        return "playwright"
+    if "chrome" in lowered or "chromium" in lowered or "firefox" in lowered or "webkit" in lowered:
+        return "browser"
+    if "weboter" in lowered:
+        return "service"
+    return "other"
+
+
+def descendant_pids(pid: int) -> list[int]:
+    """返回 pid 的全部子孙进程；没有 /proc 的平台返回空列表"""
+    proc_root = Path("/proc")
+    if not proc_root.is_dir():
+        return []
+    children: dict[int, list[int]] = {}
+    for entry in proc_root.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = read_process_stat(int(entry.name))
+        except OSError:
+            continue
+        if stat is not None:
+            children.setdefault(stat["ppid"], []).append(stat["pid"])
+    result: list[int] = []
+    pending = list(children.get(pid, []))
+    while pending:
+        child = pending.pop()
+        result.append(child)
+        pending.extend(children.get(child, []))
+    return sorted(result)
+
+
+def alive_pids(pids: Iterable[int]) -> list[int]:
+    """过滤出仍在运行的进程，僵尸进程视为已退出"""
+    alive = []
+    for pid in pids:
+        if not process_exists(pid):
+            continue
+        try:
+            stat = read_process_stat(pid)
+        except OSError:
+            stat = None
+        if stat is not None and stat["state"] == "Z":
+            continue
+        alive.append(pid)
+    return sorted(alive)
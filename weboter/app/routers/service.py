@@ -19,6 +19,7 @@ def register_service_routes(
     *,
     service,
     list_service_processes: Callable[[Any | None], dict[str, Any]],
+    disk_usage: Callable[[int], dict[str, Any]],
     raise_http_error: Callable[[Exception], None],
 ) -> None:
     @app.get("/health", tags=["service"])
@@ -51,3 +52,10 @@ def register_service_routes(
             return list_service_processes(service)
         except Exception as exc:
             raise_http_error(exc)
+
+    @app.get("/service/disk-usage", tags=["service"])
+    def service_disk_usage(limit: int = Query(default=20, ge=1, le=200)) -> dict[str, Any]:
+        try:
+            return disk_usage(limit)
+        except Exception as exc:
+            raise_http_error(exc)
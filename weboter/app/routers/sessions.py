@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import asdict
+import mimetypes
 from typing import Any, Callable
 
 from fastapi import FastAPI, Query
+from fastapi.responses import StreamingResponse
 
 from weboter.app.schemas import (
     SessionAddNodeRequest,
@@ -36,9 +38,15 @@ def register_session_routes(app: FastAPI, *, session_manager, raise_http_error:
             raise_http_error(exc)
 
     @app.get("/sessions/{session_id}/snapshots", tags=["session"])
-    def get_session_snapshots(session_id: str, limit: int = Query(default=20, ge=1, le=200)) -> dict[str, Any]:
+    def get_session_snapshots(
+        session_id: str,
+        limit: int = Query(default=20, ge=1, le=200),
+        cursor: int | None = Query(default=None, ge=0),
+        phase: str | None = Query(default=None),
+        node_id: str | None = Query(default=None),
+    ) -> dict[str, Any]:
         try:
-            return {"items": session_manager.get_snapshots(session_id, limit)}
+            return session_manager.list_snapshots(session_id, limit, cursor=cursor, phase=phase, node_id=node_id)
         except Exception as exc:
             raise_http_error(exc)
 
@@ -161,6 +169,22 @@ def register_session_routes(app: FastAPI, *, session_manager, raise_http_error:
         except Exception as exc:
             raise_http_error(exc)
 
+    @app.get("/sessions/{session_id}/artifacts/{name}", tags=["session"])
+    def session_artifact(session_id: str, name: str) -> StreamingResponse:
+        try:
+            stream = session_manager.open_artifact(session_id, name)
+        except Exception as exc:
+            raise_http_error(exc)
+
+        def _chunks():
+            # 压缩产物在这里逐块解压，不整体读入内存
+            with stream:
+                while chunk := stream.read(65536):
+                    yield chunk
+
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        return StreamingResponse(_chunks(), media_type=media_type)
+
     @app.get("/sessions/{session_id}/page", tags=["session"])
     def session_page_snapshot(session_id: str) -> dict[str, Any]:
         try:
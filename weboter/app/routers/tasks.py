@@ -5,6 +5,8 @@ from typing import Any, Callable
 
 from fastapi import FastAPI, Query
 
+from weboter.app.schemas import TaskResumeRequest
+
 
 def register_task_routes(app: FastAPI, *, task_manager, raise_http_error: Callable[[Exception], None]) -> None:
     @app.get("/tasks", tags=["task"])
@@ -27,3 +29,17 @@ def register_task_routes(app: FastAPI, *, task_manager, raise_http_error: Callab
             return task_manager.read_task_log(task_id, lines)
         except Exception as exc:
             raise_http_error(exc)
+
+    @app.post("/tasks/{task_id}/resume", tags=["task"])
+    def resume_task(task_id: str, payload: TaskResumeRequest) -> dict[str, Any]:
+        try:
+            return asdict(task_manager.resume(task_id, rewarm_flow_id=payload.rewarm_flow_id))
+        except Exception as exc:
+            raise_http_error(exc)
+
+    @app.get("/tasks/{task_id}/profile", tags=["task"])
+    def get_task_profile(task_id: str) -> dict[str, Any]:
+        try:
+            return task_manager.get_task_profile(task_id)
+        except Exception as exc:
+            raise_http_error(exc)
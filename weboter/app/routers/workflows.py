@@ -21,11 +21,13 @@ def register_workflow_routes(
     def workflow_upload(payload: WorkflowUploadRequest) -> dict[str, Any]:
         try:
             system_logger.info(
-                "workflow upload path=%s execute=%s pause_before_start=%s breakpoints=%s",
+                "workflow upload path=%s execute=%s pause_before_start=%s breakpoints=%s hook_mode=%s har_mode=%s",
                 payload.path,
                 payload.execute,
                 payload.pause_before_start,
                 len(payload.breakpoints),
+                payload.hook_mode,
+                payload.har_mode,
             )
             if not payload.execute:
                 return service.handle_upload_request(Path(payload.path), False)
@@ -35,6 +37,9 @@ def register_workflow_routes(
                 trigger="upload",
                 pause_before_start=payload.pause_before_start,
                 breakpoints=payload.breakpoints,
+                hook_mode=payload.hook_mode,
+                har_mode=payload.har_mode,
+                har_path=payload.har_path,
             )
             return {
                 "uploaded": str(resolution.managed_path or resolution.source_path),
@@ -47,7 +52,7 @@ def register_workflow_routes(
     def workflow_dir(payload: WorkflowDirectoryRequest) -> dict[str, Any]:
         try:
             system_logger.info(
-                "workflow dir directory=%s name=%s list=%s delete=%s execute=%s pause_before_start=%s breakpoints=%s",
+                "workflow dir directory=%s name=%s list=%s delete=%s execute=%s pause_before_start=%s breakpoints=%s hook_mode=%s har_mode=%s",
                 payload.directory,
                 payload.name,
                 payload.list,
@@ -55,6 +60,8 @@ def register_workflow_routes(
                 payload.execute,
                 payload.pause_before_start,
                 len(payload.breakpoints),
+                payload.hook_mode,
+                payload.har_mode,
             )
             if payload.list:
                 return service.handle_directory_request(Path(payload.directory), payload.name, True, False, False)
@@ -68,6 +75,9 @@ def register_workflow_routes(
                 trigger="directory",
                 pause_before_start=payload.pause_before_start,
                 breakpoints=payload.breakpoints,
+                hook_mode=payload.hook_mode,
+                har_mode=payload.har_mode,
+                har_path=payload.har_path,
             )
             return {
                 "resolved": str(resolution.source_path),
@@ -10,6 +10,9 @@ class WorkflowUploadRequest(BaseModel):
     execute: bool = False
     pause_before_start: bool = False
     breakpoints: List[Dict[str, Any]] = Field(default_factory=list)
+    hook_mode: str = "all"
+    har_mode: str | None = None
+    har_path: str | None = None
 
 
 class WorkflowDirectoryRequest(BaseModel):
@@ -20,6 +23,13 @@ class WorkflowDirectoryRequest(BaseModel):
     execute: bool = False
     pause_before_start: bool = False
     breakpoints: List[Dict[str, Any]] = Field(default_factory=list)
+    hook_mode: str = "all"
+    har_mode: str | None = None
+    har_path: str | None = None
+
+
+class TaskResumeRequest(BaseModel):
+    rewarm_flow_id: str | None = None
 
 
 class SessionSetContextRequest(BaseModel):
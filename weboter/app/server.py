@@ -18,6 +18,12 @@ import uvicorn
 from weboter.app.client import ServiceClientError, WorkflowServiceClient
 from weboter.app.http_utils import raise_http_error
 from weboter.app.panel import PANEL_SESSION_COOKIE, PanelAuthManager
+from weboter.app.process_info import (
+    classify_process as _classify_process,
+    process_exists as _process_exists,
+    read_process_cmdline as _read_process_cmdline,
+    read_process_stat as _read_process_stat,
+)
 from weboter.app.routers.catalog import register_catalog_routes
 from weboter.app.routers.env import register_env_routes
 from weboter.app.routers.panel import register_panel_routes
@@ -26,6 +32,8 @@ from weboter.app.routers.sessions import register_session_routes
 from weboter.app.routers.tasks import register_task_routes
 from weboter.app.routers.workflows import register_workflow_routes
 from weboter.app.session import ExecutionSessionManager
+from weboter.app.session_storage import SessionStorageReaper, collect_disk_usage
+from weboter.app.snapshot_writer import SnapshotWriter
 from weboter.app.service import WorkflowService
 from weboter.app.task_manager import TaskManager
 
@@ -34,14 +42,6 @@ DEFAULT_SERVICE_HOST = "127.0.0.1"
 DEFAULT_SERVICE_PORT = 0
 
 
-def _process_exists(pid: int) -> bool:
-    try:
-        os.kill(pid, 0)
-    except OSError:
-        return False
-    return True
-
-
 def _process_group_exists(pgid: int) -> bool:
     if not hasattr(os, "killpg"):
         return _process_exists(pgid)
@@ -52,48 +52,10 @@ def _process_group_exists(pgid: int) -> bool:
     return True
 
 
-def _read_process_cmdline(pid: int) -> list[str]:
-    cmdline_path = Path(f"/proc/{pid}/cmdline")
-    if not cmdline_path.is_file():
-        return []
-    raw = cmdline_path.read_bytes().split(b"\0")
-    return [item.decode("utf-8", errors="ignore") for item in raw if item]
-
-
-def _read_process_stat(pid: int) -> dict[str, Any] | None:
-    stat_path = Path(f"/proc/{pid}/stat")
-    if not stat_path.is_file():
-        return None
-    content = stat_path.read_text(encoding="utf-8").strip()
-    end_comm = content.rfind(")")
-    if end_comm < 0:
-        return None
-    prefix = content[: end_comm + 1]
-    suffix = content[end_comm + 2 :].split()
-    if len(suffix) < 3:
-        return None
-    return {
-        "pid": pid,
-        "comm": prefix[prefix.find("(") + 1 : -1],
-        "state": suffix[0],
-        "ppid": int(suffix[1]),
-        "pgid": int(suffix[2]),
-    }
-
-
-def _classify_process(cmdline: list[str], comm: str) -> str:
-    joined = " ".join(cmdline) if cmdline else comm
-    lowered = joined.lower()
-    if "playwright" in lowered:
-        return "playwright"
-    if "chrome" in lowered or "chromium" in lowered or "firefox" in lowered or "webkit" in lowered:
-        return "browser"
-    if "weboter" in lowered:
-        return "service"
-    return "other"
-
-
-def list_service_processes(workflow_service: WorkflowService | None = None) -> dict[str, Any]:
+def list_service_processes(
+    workflow_service: WorkflowService | None = None,
+    task_manager: TaskManager | None = None,
+) -> dict[str, Any]:
     workflow_service = workflow_service or WorkflowService()
     state = workflow_service.read_service_state()
     if state is None:
@@ -102,6 +64,9 @@ def list_service_processes(workflow_service: WorkflowService | None = None) -> d
         workflow_service.remove_service_state()
         raise RuntimeError("service 状态文件已过期")
 
+    # 任务结束并完成资源回收后仍存活的 playwright/浏览器进程，按任务归属标注
+    leaks = task_manager.process_leaks() if task_manager is not None else {}
+    leaked_by_pid = {pid: task_id for task_id, pids in leaks.items() for pid in pids}
     processes: list[dict[str, Any]] = []
     proc_root = Path("/proc")
     for entry in sorted(proc_root.iterdir(), key=lambda item: int(item.name) if item.name.isdigit() else 0):
@@ -121,6 +86,7 @@ def list_service_processes(workflow_service: WorkflowService | None = None) -> d
                 "comm": stat["comm"],
                 "kind": _classify_process(cmdline, stat["comm"]),
                 "cmdline": cmdline,
+                "leaked_by_task": leaked_by_pid.get(pid),
             }
         )
 
@@ -131,6 +97,8 @@ def list_service_processes(workflow_service: WorkflowService | None = None) -> d
             "port": state.port,
         },
         "items": processes,
+        "leaks": [{"task_id": task_id, "pids": pids} for task_id, pids in leaks.items()],
+        "browser_pool": workflow_service.browser_pool.summary() if workflow_service.browser_pool else None,
     }
 
 
@@ -187,8 +155,31 @@ def _configure_service_logger(workflow_service: WorkflowService) -> logging.Logg
 def create_app(workflow_service: WorkflowService | None = None) -> FastAPI:
     service = workflow_service or WorkflowService()
     system_logger = _configure_service_logger(service)
-    session_manager = ExecutionSessionManager(service.data_root / "sessions", system_logger)
+    snapshot_config = service.config.snapshots
+    snapshot_writer = SnapshotWriter(
+        queue_size=snapshot_config.queue_size,
+        policy=snapshot_config.policy,
+        sample_every=snapshot_config.sample_every,
+        compress=snapshot_config.compress,
+        logger=system_logger,
+    )
+    session_manager = ExecutionSessionManager(
+        service.data_root / "sessions",
+        system_logger,
+        snapshot_writer=snapshot_writer,
+        snapshot_keyframe_every=snapshot_config.keyframe_every,
+    )
+    storage_reaper = SessionStorageReaper(
+        session_manager,
+        session_quota_bytes=int(snapshot_config.session_quota_mb * 1024 * 1024),
+        total_quota_bytes=int(snapshot_config.total_quota_mb * 1024 * 1024),
+        interval=snapshot_config.reap_interval,
+        logger=system_logger,
+    )
+    storage_reaper.start()
     task_manager = TaskManager(service, system_logger, session_manager=session_manager)
+    # 每个任务线程对应一个浏览器池 worker
+    service.start_browser_pool(task_manager.queue_status()["max_workers"], system_logger)
     panel_auth = PanelAuthManager(service.data_root)
     # 启动时确保存在单用户账号（默认 admin/admin，可通过 CLI 重置）。
     panel_auth.summary()
@@ -203,6 +194,7 @@ def create_app(workflow_service: WorkflowService | None = None) -> FastAPI:
     app.state.system_logger = system_logger
     app.state.task_manager = task_manager
     app.state.session_manager = session_manager
+    app.state.storage_reaper = storage_reaper
     app.state.panel_auth = panel_auth
 
     def _request_source(request: Request) -> str:
@@ -289,7 +281,12 @@ def create_app(workflow_service: WorkflowService | None = None) -> FastAPI:
     register_service_routes(
         app,
         service=service,
-        list_service_processes=list_service_processes,
+        list_service_processes=lambda workflow_service: list_service_processes(workflow_service, task_manager),
+        disk_usage=lambda limit: {
+            **collect_disk_usage(service.data_root, limit),
+            "snapshot_writer": snapshot_writer.stats(),
+            "reaper": storage_reaper.describe(),
+        },
         raise_http_error=raise_http_error,
     )
     register_env_routes(app, service=service, raise_http_error=raise_http_error)
@@ -347,6 +344,9 @@ def serve_foreground(host: str, port: int, workflow_service: WorkflowService | N
     try:
         server.run(sockets=[server_socket])
     finally:
+        app.state.storage_reaper.stop()
+        app.state.session_manager.close()
+        workflow_service.close_browser_pool()
         workflow_service.remove_service_state()
         server_socket.close()
     return 0
@@ -9,13 +9,21 @@ import secrets
 from typing import Any
 from zipfile import ZipFile
 
+from weboter.app.browser_pool import BrowserPool
 from weboter.app.config import AppConfig, load_app_config
 from weboter.app.env_store import ManagedEnvStore
 from weboter.app.state import ServiceState, default_workspace_root
 from weboter.core.plugin_loader import ensure_plugins_initialized, get_plugin_snapshot, refresh_plugins
+from weboter.core.engine.action_cache import ActionCacheStats, ActionOutputCache
 from weboter.core.engine.action_manager import action_manager
+from weboter.core.engine.checkpoint import TaskCheckpointer
 from weboter.core.engine.control_manager import control_manager
+from weboter.core.engine.env_scope import EnvScope
 from weboter.core.engine.excutor import Executor
+from weboter.core.engine.har import HarSession
+from weboter.core.engine.lifecycle import ResourceTracker
+from weboter.core.engine.storage_state import StorageStateStore
+from weboter.core.engine.profiler import StepProfiler
 from weboter.core.workflow_io import WorkflowReader, WorkflowWriter
 from weboter.public.model import Flow, Node, NodeOutputConfig
 
@@ -37,6 +45,22 @@ class WorkflowService:
         self.service_log_path = self.data_root / "service.log"
         self.secret_state_path = config.service_secret_state_path()
         self.env_store = ManagedEnvStore(self.data_root / "env.json")
+        self.action_cache = (
+            ActionOutputCache(
+                config.action_cache_path(),
+                max_entries=config.action_cache.max_entries,
+                default_ttl=config.action_cache.default_ttl,
+            )
+            if config.action_cache.enabled
+            else None
+        )
+        # 按 profile 保存的登录态，OpenBrowser 恢复、SaveStorageState 刷新
+        self.storage_states = StorageStateStore(
+            config.storage_state_path(),
+            default_ttl=config.storage_state.default_ttl,
+        )
+        # 浏览器池只在 service 模式下由 start_browser_pool 启动，本地直接执行不使用
+        self.browser_pool: BrowserPool | None = None
         ensure_plugins_initialized(self.config)
 
     def _read_secret_state(self) -> dict[str, Any]:
@@ -214,6 +238,7 @@ class WorkflowService:
             control=str(payload.get("control", "") or ""),
             params=params,
             log=str(payload.get("log", "short") or "short"),
+            hook_mode=str(payload.get("hook_mode", "") or ""),
         )
 
     def _parse_flow(self, payload: Any, *, context: str) -> Flow:
@@ -259,14 +284,76 @@ class WorkflowService:
         WorkflowWriter.to_json(flow, resolution.source_path, indent=2)
         return resolution.source_path
 
-    def run_workflow(self, workflow_path: Path, logger: logging.Logger | None = None, hooks: Any | None = None) -> Path:
+    def run_workflow(
+        self,
+        workflow_path: Path,
+        logger: logging.Logger | None = None,
+        hooks: Any | None = None,
+        profiler: StepProfiler | None = None,
+        cache_stats: ActionCacheStats | None = None,
+        checkpointer: TaskCheckpointer | None = None,
+        checkpoint: dict[str, Any] | None = None,
+        rewarm_flow_id: str | None = None,
+        resources: ResourceTracker | None = None,
+        har: HarSession | None = None,
+    ) -> Path:
         ensure_plugins_initialized(self.config)
         flow = WorkflowReader.from_json(workflow_path)
-        executor = Executor(logger=logger, hooks=hooks, managed_env=self.env_store.export_env_mapping())
+        # $env 视图每个任务构建一次，子流程执行器共享同一份快照
+        env = EnvScope.build(self.env_store.export_env_mapping())
+        executor = Executor(
+            logger=logger,
+            hooks=hooks,
+            env=env,
+            profiler=profiler,
+            action_cache=self.action_cache,
+            cache_stats=cache_stats,
+            checkpointer=checkpointer,
+            browser_pool=self.browser_pool,
+            storage_states=self.storage_states,
+            har=har,
+            resources=resources,
+        )
         executor.load_workflow(flow)
-        asyncio.run(executor.run())
+
+        async def _main():
+            try:
+                if checkpoint is not None:
+                    await executor.resume(checkpoint, rewarm_flow_id)
+                else:
+                    await executor.run()
+            finally:
+                # 无论成功或失败，按创建的逆序关闭任务打开的页面、context、浏览器与 playwright
+                await executor.resources.close_all(executor.logger)
+
+        if self.browser_pool is not None:
+            # 工作流在浏览器池的常驻事件循环上运行，租用的浏览器在结束时统一归还
+            self.browser_pool.run(_main)
+        else:
+            asyncio.run(_main())
         return workflow_path
 
+    def start_browser_pool(self, workers: int, logger: logging.Logger | None = None) -> BrowserPool | None:
+        pool_config = self.config.browser_pool
+        if not pool_config.enabled or self.browser_pool is not None:
+            return self.browser_pool
+        self.browser_pool = BrowserPool(
+            workers=workers,
+            size=pool_config.size,
+            max_contexts_per_browser=pool_config.max_contexts_per_browser,
+            recycle_after=pool_config.recycle_after,
+            browser_types=pool_config.browser_types,
+            headless=pool_config.headless,
+            logger=logger,
+        )
+        self.browser_pool.start()
+        return self.browser_pool
+
+    def close_browser_pool(self) -> None:
+        if self.browser_pool is not None:
+            self.browser_pool.close()
+            self.browser_pool = None
+
     def list_env(self, group: str | None = None) -> dict[str, Any]:
         return self.env_store.list_items(group)
 
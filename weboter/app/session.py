@@ -1,9 +1,12 @@
 import asyncio
 from dataclasses import asdict, dataclass, field
+from collections.abc import Mapping
 from datetime import datetime
 import ast
+import gzip
 import json
 import logging
+import os
 from pathlib import Path
 import queue
 import threading
@@ -13,6 +16,11 @@ from uuid import uuid4
 
 import playwright.async_api as pw
 
+from weboter.app.snapshot_delta import apply_runtime_delta, diff_runtime
+from weboter.app.session_storage import GZIP_SUFFIX, load_json, open_artifact
+from weboter.app.snapshot_writer import SNAPSHOT_INDEX_NAME, SnapshotWriter
+from weboter.builtin.network import page_block_stats
+from weboter.core.engine.plan import parse_hook_mode
 from weboter.core.workflow_io import WorkflowWriter
 from weboter.public.model import Flow, Node, NodeOutputConfig
 
@@ -29,6 +37,9 @@ CONTROL_PERMISSION = "control"
 PAGE_PERMISSION = "page"
 WORKFLOW_EDIT_PERMISSION = "workflow_edit"
 
+# 快照文件后缀；开启 snapshots.compress 后新快照以 .json.gz 写入，读取时两种格式并存
+_SNAPSHOT_SUFFIXES = (".json", ".json" + GZIP_SUFFIX)
+
 
 @dataclass
 class SessionRecord:
@@ -47,12 +58,14 @@ class SessionRecord:
     pause_reason: str | None = None
     last_error: str | None = None
     snapshot_count: int = 0
+    snapshots_dropped: int = 0
     last_snapshot_path: str | None = None
     current_page_url: str | None = None
     current_page_title: str | None = None
     breakpoints: list[dict[str, Any]] = field(default_factory=list)
     last_stop: dict[str, Any] | None = None
     interrupt_requested: bool = False
+    hook_mode: str = "all"
 
 
 class SessionHooks:
@@ -62,6 +75,9 @@ class SessionHooks:
     async def on_workflow_loaded(self, executor, flow: Flow) -> None:
         await self.session.on_workflow_loaded(executor, flow)
 
+    def wants_step(self, executor, node: Node, node_plan=None) -> bool:
+        return self.session.wants_step(executor, node, node_plan)
+
     async def before_step(self, executor, node: Node) -> None:
         await self.session.before_step(executor, node)
 
@@ -98,6 +114,15 @@ class ExecutionSession:
         self._breakpoints: list[dict[str, Any]] = []
         self._active_executor = None
         self._runtime_loop: asyncio.AbstractEventLoop | None = None
+        # 暂停/守护等待时由 dispatch_command 经 call_soon_threadsafe 唤醒，绑定在运行时事件循环上
+        self._command_ready: asyncio.Event | None = None
+        self._hook_mode = parse_hook_mode(record.hook_mode)
+        self._step_count = 0
+        # id(flow) -> (flow, version)；工作流只在首次出现或被 patch_node/add_node 修改后写入新版本
+        self._flow_versions: dict[int, tuple[Flow, int]] = {}
+        self._workflow_version = 0
+        # 最近一个 runtime 关键帧 (index, runtime)，其余快照只保存相对关键帧的差异
+        self._keyframe: tuple[int, dict[str, Any]] | None = None
 
     def create_hooks(self) -> SessionHooks:
         return SessionHooks(self)
@@ -198,12 +223,24 @@ class ExecutionSession:
             return self._dispatch_command_immediately(action, payload, timeout)
         command = _SessionCommand(action, payload)
         self._commands.put(command)
+        self._wake_command_waiter()
         if not command.event.wait(timeout):
             raise TimeoutError(f"Session command timeout: {action}")
         if command.error:
             raise command.error
         return command.result
 
+    def _wake_command_waiter(self) -> None:
+        loop = self._runtime_loop
+        event = self._command_ready
+        if loop is None or event is None:
+            return
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # 事件循环已关闭：执行已结束，没有等待者
+            pass
+
     def _can_dispatch_immediately(self, action: str) -> bool:
         if action not in {
             "abort",
@@ -239,6 +276,23 @@ class ExecutionSession:
             self.manager._save_record(self.record)
         await self.capture_snapshot(executor, phase="loaded")
 
+    def wants_step(self, executor, node: Node, node_plan=None) -> bool:
+        """按钩子粒度决定本步是否派发 before/after_step；暂停、中断、断点与待处理命令始终派发"""
+        self._active_executor = executor
+        self._step_count += 1
+        if self._pause_requested or self._guard_waiting or self._interrupt_requested or not self._commands.empty():
+            return True
+        if self._has_breakpoint_for(node):
+            return True
+        mode, interval = getattr(node_plan, "hook_mode", None) or self._hook_mode
+        if mode == "all":
+            return True
+        if mode == "page":
+            return bool(getattr(node_plan, "touches_page", True))
+        if mode == "every":
+            return self._step_count % interval == 0
+        return False
+
     async def before_step(self, executor, node: Node) -> None:
         self._active_executor = executor
         self._runtime_loop = asyncio.get_running_loop()
@@ -311,8 +365,7 @@ class ExecutionSession:
             "current_node_name": executor.runtime.get_node_name(executor.runtime.current_node_id) if executor.runtime.current_node_id else None,
             "node": self._serialize_node(node),
             "next_node_id": next_node_id,
-            "runtime": self._serialize_runtime(executor.runtime.data_context.data),
-            "workflow": self._serialize_flow(executor.workflow),
+            "workflow_version": self._ensure_workflow_version(executor.workflow),
             "debug": {
                 "breakpoints": self._serialize_breakpoints(),
                 "interrupt_requested": self._interrupt_requested,
@@ -327,10 +380,6 @@ class ExecutionSession:
                 executor.runtime.data_context.data.get("prev_outputs", {})
             )
 
-        snapshot_path = self.manager.snapshot_root(self.record.session_id) / f"{snapshot_index:05d}_{phase}.json"
-        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
-        snapshot_path.write_text(json.dumps(snapshot, ensure_ascii=False, indent=2), encoding="utf-8")
-
         with self._lock:
             self.record.snapshot_count = snapshot_index
             self.record.current_phase = phase
@@ -338,13 +387,77 @@ class ExecutionSession:
             self.record.current_node_name = snapshot["current_node_name"]
             self.record.current_page_url = page_info.get("url") if page_info else None
             self.record.current_page_title = page_info.get("title") if page_info else None
-            self.record.last_snapshot_path = str(snapshot_path)
             self.record.breakpoints = self._serialize_breakpoints()
             self.record.interrupt_requested = self._interrupt_requested
             self.record.updated_at = self.manager._now()
-            self.manager._save_record(self.record)
+
+        runtime = self._serialize_runtime(executor.runtime.data_context.data)
+        # 写入线程可能在关键帧写入失败时清空 _keyframe，这里只读取一次
+        base = self._keyframe
+        keyframe = base is None or snapshot_index - base[0] >= self.manager.snapshot_keyframe_every
+        if keyframe:
+            base = (snapshot_index, runtime)
+            self._keyframe = base
+            snapshot["runtime"] = runtime
+        else:
+            snapshot["runtime_delta"] = {"base": base[0], **diff_runtime(base[1], runtime)}
+
+        # 索引条目在捕获时生成，列表查询不再解析快照正文；workflow 只取摘要字段，nodes 仅用于计数
+        flow = executor.workflow
+        index_entry = self.manager._snapshot_summary({
+            **snapshot,
+            "runtime": runtime,
+            "workflow": {
+                "flow_id": flow.flow_id,
+                "name": flow.name,
+                "start_node_id": flow.start_node_id,
+                "nodes": flow.nodes,
+            } if flow is not None else None,
+        })
+        # 回收时按关键帧分组，保证被引用的关键帧晚于其增量快照删除
+        index_entry["runtime_base"] = base[0]
+
+        # 编码、落盘与记录保存由后台写入线程完成，记录文件在快照写入后按批保存
+        snapshot_name = f"{snapshot_index:05d}_{phase}.json"
+        if self.manager.snapshot_writer.compress:
+            snapshot_name += GZIP_SUFFIX
+        snapshot_path = self.manager.snapshot_root(self.record.session_id) / snapshot_name
+        if not self.manager.snapshot_writer.submit(
+            self, snapshot_path, snapshot, critical=keyframe, index_entry=index_entry
+        ):
+            with self._lock:
+                self.record.snapshots_dropped += 1
         return snapshot
 
+    def _ensure_workflow_version(self, flow: Flow | None) -> int | None:
+        if flow is None:
+            return None
+        entry = self._flow_versions.get(id(flow))
+        if entry is not None and entry[0] is flow:
+            return entry[1]
+        self._workflow_version += 1
+        self.manager._save_workflow_version(self.record.session_id, self._workflow_version, self._serialize_flow(flow))
+        self._flow_versions[id(flow)] = (flow, self._workflow_version)
+        return self._workflow_version
+
+    def _invalidate_workflow_version(self, flow: Flow | None) -> None:
+        if flow is not None:
+            self._flow_versions.pop(id(flow), None)
+
+    def _on_snapshot_written(self, path: Path) -> None:
+        with self._lock:
+            self.record.last_snapshot_path = str(path)
+
+    def _on_snapshot_failed(self, index: int | None) -> None:
+        # 当前关键帧未能落盘时，下一个快照重新写关键帧，之后的增量不再引用缺失的文件
+        keyframe = self._keyframe
+        if keyframe is not None and keyframe[0] == index:
+            self._keyframe = None
+
+    def _persist_record(self) -> None:
+        with self._lock:
+            self.manager._save_record(self.record)
+
     async def _arm_debug_stop(
         self,
         executor,
@@ -392,7 +505,14 @@ class ExecutionSession:
         await self.capture_snapshot(executor, phase="debug_stop", node=node, next_node_id=next_node_id)
 
     async def _wait_for_commands(self, executor) -> None:
-        while self._pause_requested or self._guard_waiting or not self._commands.empty():
+        if not (self._pause_requested or self._guard_waiting or not self._commands.empty()):
+            return
+        self._runtime_loop = asyncio.get_running_loop()
+        self._command_ready = asyncio.Event()
+        waited = False
+        while True:
+            # 先清除再取命令：取完之后入队的命令会重新置位，不会丢失唤醒
+            self._command_ready.clear()
             while True:
                 try:
                     command = self._commands.get_nowait()
@@ -403,11 +523,22 @@ class ExecutionSession:
             if not (self._pause_requested or self._guard_waiting):
                 break
 
+            # 只在状态变化时保存记录，空闲暂停期间不产生写入
+            status = SESSION_STATUS_GUARD_WAITING if self._guard_waiting else SESSION_STATUS_PAUSED
             with self._lock:
-                self.record.status = SESSION_STATUS_GUARD_WAITING if self._guard_waiting else SESSION_STATUS_PAUSED
-                self.record.updated_at = self.manager._now()
-                self.manager._save_record(self.record)
-            await asyncio.sleep(0.1)
+                if self.record.status != status:
+                    self.record.status = status
+                    self.record.updated_at = self.manager._now()
+                    self.manager._save_record(self.record)
+            waited = True
+            await self._command_ready.wait()
+
+        if waited and not self._abort_requested:
+            with self._lock:
+                if self.record.status in {SESSION_STATUS_PAUSED, SESSION_STATUS_GUARD_WAITING}:
+                    self.record.status = SESSION_STATUS_RUNNING
+                    self.record.updated_at = self.manager._now()
+                    self.manager._save_record(self.record)
 
     async def _execute_command(self, command: _SessionCommand, executor) -> None:
         try:
@@ -427,7 +558,8 @@ class ExecutionSession:
                 self.record.last_stop = None
                 self.record.updated_at = self.manager._now()
                 self.manager._save_record(self.record)
-                return asdict(self.record)
+            self._wake_command_waiter()
+            return asdict(self.record)
 
         if action == "abort":
             with self._lock:
@@ -438,7 +570,9 @@ class ExecutionSession:
                 self.record.last_stop = None
                 self.record.updated_at = self.manager._now()
                 self.manager._save_record(self.record)
-                return asdict(self.record)
+            # abort 经 run_coroutine_threadsafe 立即执行，需要唤醒正在等待命令的步骤
+            self._wake_command_waiter()
+            return asdict(self.record)
 
         if action == "interrupt":
             return self.request_interrupt(payload.get("reason") or "interrupt_next")
@@ -459,12 +593,16 @@ class ExecutionSession:
 
         if action == "patch_node":
             node = self._patch_node(executor.workflow, executor.runtime, payload["node_id"], payload["patch"])
+            self._invalidate_node_plan(executor, node.node_id)
+            self._invalidate_workflow_version(executor.workflow)
             return {"node_id": node.node_id}
 
         if action == "add_node":
             node = self._build_node(payload["node"])
             executor.workflow.nodes.append(node)
             executor.runtime.nodes[node.node_id] = node
+            self._invalidate_node_plan(executor, node.node_id)
+            self._invalidate_workflow_version(executor.workflow)
             return {"node_id": node.node_id}
 
         if action == "run_temporary_node":
@@ -560,6 +698,9 @@ class ExecutionSession:
         page_info: dict[str, Any] = {
             "url": getattr(page, "url", None),
         }
+        blocked = page_block_stats(page)
+        if blocked is not None:
+            page_info["blocked_requests"] = blocked
 
         try:
             page_info["title"] = await page.title()
@@ -574,7 +715,12 @@ class ExecutionSession:
             screenshot_path = session_root / f"{base_name}.png"
             try:
                 html = await page.content()
-                html_path.write_text(html, encoding="utf-8")
+                if self.manager.snapshot_writer.compress:
+                    html_path = html_path.with_name(html_path.name + GZIP_SUFFIX)
+                    with gzip.open(html_path, "wt", encoding="utf-8") as file_obj:
+                        file_obj.write(html)
+                else:
+                    html_path.write_text(html, encoding="utf-8")
                 page_info["html_path"] = str(html_path)
             except Exception as exc:
                 page_info["html_error"] = str(exc)
@@ -742,7 +888,8 @@ class ExecutionSession:
             return f"{data[:2]}***{data[-2:]}"
         if isinstance(data, (int, float, bool)):
             return "***"
-        if isinstance(data, dict):
+        if isinstance(data, Mapping):
+            # $env 为分层只读视图（Mapping），同样只暴露键名
             return {
                 "type": "dict",
                 "key_count": len(data),
@@ -780,6 +927,7 @@ class ExecutionSession:
             "params": node.params,
             "outputs": [asdict(item) for item in node.outputs],
             "log": node.log,
+            "hook_mode": node.hook_mode,
         }
 
     @staticmethod
@@ -858,6 +1006,20 @@ class ExecutionSession:
             return item
         return None
 
+    def _has_breakpoint_for(self, node: Node) -> bool:
+        # after_step 断点的 next_node_id 要执行后才知道，这里只按节点预筛
+        for item in self._breakpoints:
+            if not item.get("enabled", True):
+                continue
+            if item.get("phase") not in {"before_step", "after_step", "*"}:
+                continue
+            if item.get("node_id") and item["node_id"] != node.node_id:
+                continue
+            if item.get("node_name") and item["node_name"] != node.name:
+                continue
+            return True
+        return False
+
     @staticmethod
     def _build_node(data: dict[str, Any]) -> Node:
         node_id = data.get("node_id") or f"runtime_{uuid4().hex[:8]}"
@@ -871,6 +1033,7 @@ class ExecutionSession:
             control=data.get("control", ""),
             params=data.get("params", {}),
             log=data.get("log", "short"),
+            hook_mode=data.get("hook_mode", ""),
         )
 
     async def _run_temporary_node(
@@ -918,12 +1081,19 @@ class ExecutionSession:
             if not jump_to_node_id:
                 executor.runtime.current_node_id = previous_node_id
 
+    @staticmethod
+    def _invalidate_node_plan(executor, node_id: str):
+        # 节点定义变化后重新编译执行计划，未知 action/control 在此处即报错
+        invalidate = getattr(executor, "invalidate_plan", None)
+        if callable(invalidate):
+            invalidate(node_id)
+
     @staticmethod
     def _patch_node(flow: Flow, runtime, node_id: str, patch: dict[str, Any]) -> Node:
         if node_id not in runtime.nodes:
             raise KeyError(f"节点ID未找到: {node_id}")
         node = runtime.nodes[node_id]
-        for key in ["name", "description", "action", "control", "log"]:
+        for key in ["name", "description", "action", "control", "log", "hook_mode"]:
             if key in patch:
                 setattr(node, key, patch[key])
         if "inputs" in patch:
@@ -936,9 +1106,19 @@ class ExecutionSession:
 
 
 class ExecutionSessionManager:
-    def __init__(self, root: Path, system_logger: logging.Logger):
+    def __init__(
+        self,
+        root: Path,
+        system_logger: logging.Logger,
+        snapshot_writer: SnapshotWriter | None = None,
+        snapshot_keyframe_every: int = 20,
+    ):
         self.root = root
         self.system_logger = system_logger
+        self.snapshot_writer = snapshot_writer or SnapshotWriter(logger=system_logger)
+        self.snapshot_keyframe_every = max(1, int(snapshot_keyframe_every))
+        # session_id -> (已读取的索引字节数, {快照编号: 文件名})，详情查询按编号直接定位快照文件
+        self._snapshot_files: dict[str, tuple[int, dict[int, str]]] = {}
         self.root.mkdir(parents=True, exist_ok=True)
         self._lock = threading.RLock()
         self._live_sessions: dict[str, ExecutionSession] = {}
@@ -952,7 +1132,9 @@ class ExecutionSessionManager:
         permissions: list[str] | None = None,
         pause_before_start: bool = False,
         breakpoints: list[dict[str, Any]] | None = None,
+        hook_mode: str = "all",
     ) -> ExecutionSession:
+        parse_hook_mode(hook_mode)
         record = SessionRecord(
             session_id=task_id,
             task_id=task_id,
@@ -963,6 +1145,7 @@ class ExecutionSessionManager:
             updated_at=self._now(),
             log_path=str(log_path),
             permissions=permissions or [OBSERVE_PERMISSION, CONTROL_PERMISSION, PAGE_PERMISSION, WORKFLOW_EDIT_PERMISSION],
+            hook_mode=hook_mode,
         )
         session = ExecutionSession(self, record)
         if breakpoints:
@@ -986,9 +1169,35 @@ class ExecutionSessionManager:
         return self._live_sessions.get(resolved_id)
 
     def get_snapshots(self, session_id: str, limit: int = 20) -> list[dict[str, Any]]:
+        return self.list_snapshots(session_id, limit)["items"]
+
+    def list_snapshots(
+        self,
+        session_id: str,
+        limit: int = 20,
+        cursor: int | None = None,
+        phase: str | None = None,
+        node_id: str | None = None,
+    ) -> dict[str, Any]:
+        """从快照索引由新到旧分页读取摘要，不解析快照正文。
+        cursor 为上一页返回的 next_cursor（索引文件字节偏移），没有更多数据时 next_cursor 为 None。
+        """
         session = self.get_session(session_id)
-        snapshot_files = sorted(self.snapshot_root(session.session_id).glob("*.json"), reverse=True)
-        return [self._snapshot_summary(json.loads(path.read_text(encoding="utf-8"))) for path in snapshot_files[:limit]]
+        self.snapshot_writer.flush(session_id=session.session_id)
+        index_path = self._ensure_snapshot_index(session.session_id)
+        items: list[dict[str, Any]] = []
+        next_cursor = None
+        for offset, entry in self._iter_snapshot_index(index_path, end=cursor):
+            if phase and entry.get("phase") != phase:
+                continue
+            if node_id and entry.get("current_node_id") != node_id:
+                continue
+            entry.pop("file", None)
+            items.append(entry)
+            if len(items) >= limit:
+                next_cursor = offset or None
+                break
+        return {"items": items, "next_cursor": next_cursor}
 
     def get_snapshot_detail(
         self,
@@ -997,8 +1206,9 @@ class ExecutionSessionManager:
         sections: list[str] | None = None,
     ) -> dict[str, Any]:
         session = self.get_session(session_id)
+        self.snapshot_writer.flush(session_id=session.session_id)
         path = self._resolve_snapshot_file(session.session_id, snapshot_index)
-        snapshot = json.loads(path.read_text(encoding="utf-8"))
+        snapshot = self._load_snapshot(session.session_id, path)
         return self._snapshot_detail(snapshot, sections)
 
     def request_pause(self, session_id: str, reason: str = "manual") -> dict[str, Any]:
@@ -1048,28 +1258,17 @@ class ExecutionSessionManager:
         if live is not None:
             return live.dispatch_command("export_workflow", {"path": path})
         # 已终止 session: 从最新快照重建 workflow JSON 并写入目标路径
-        snap_data = self._workflow_from_snapshot(session_id)
+        snap_data = self._latest_workflow_snapshot(session_id)
         workflow_dict = snap_data.get("workflow")
         if not workflow_dict:
             raise ValueError(f"No workflow data available to export for session: {session_id}")
         output_path = Path(path).expanduser().resolve()
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        # 完整 workflow 数据来自快照的 workflow 字段（已完整序列化）
-        record = self.get_session(session_id)
-        snapshot_files = sorted(self.snapshot_root(record.session_id).glob("*.json"), reverse=True)
-        for snap_file in snapshot_files:
-            try:
-                snap = json.loads(snap_file.read_text(encoding="utf-8"))
-            except Exception:
-                continue
-            if snap.get("workflow") is None:
-                continue
-            output_path.write_text(
-                json.dumps(snap["workflow"], ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
-            return {"saved": str(output_path), "source": "snapshot", "snapshot_index": snap.get("index")}
-        raise ValueError(f"No workflow data available to export for session: {session_id}")
+        output_path.write_text(
+            json.dumps(workflow_dict, ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        return {"saved": str(output_path), "source": "snapshot", "snapshot_index": snap_data.get("snapshot_index")}
 
     def get_workflow(self, session_id: str) -> dict[str, Any]:
         live = self.get_live_session(session_id)
@@ -1093,42 +1292,58 @@ class ExecutionSessionManager:
                 }
         raise FileNotFoundError(f"Workflow node not found: {node_id}")
 
-    def _workflow_from_snapshot(self, session_id: str) -> dict[str, Any]:
-        """从该 session 最新快照中读取 workflow 摘要，用于已终止 session 的 workflow 查询"""
+    def _latest_workflow_snapshot(self, session_id: str) -> dict[str, Any]:
+        """返回最新一个带 workflow 的快照（workflow 已按版本展开，不展开 runtime）"""
         record = self.get_session(session_id)
-        snapshot_files = sorted(self.snapshot_root(record.session_id).glob("*.json"), reverse=True)
-        if not snapshot_files:
+        self.snapshot_writer.flush(session_id=record.session_id)
+        index_path = self._ensure_snapshot_index(record.session_id)
+        if not index_path.is_file():
             raise ValueError(f"Session has no snapshots: {session_id}")
-        for snap_file in snapshot_files:
+        cache: dict[tuple[str, int], Any] = {}
+        for _, entry in self._iter_snapshot_index(index_path):
+            if "workflow" not in (entry.get("available_sections") or []):
+                continue
             try:
-                snap = json.loads(snap_file.read_text(encoding="utf-8"))
+                snap = self._load_snapshot(
+                    record.session_id, self.snapshot_root(record.session_id) / entry["file"], cache, runtime=False
+                )
             except Exception:
                 continue
-            workflow = snap.get("workflow")
-            if workflow is None:
+            if snap.get("workflow") is None:
                 continue
-            nodes = workflow.get("nodes") or []
-            node_summaries = nodes[:20]
             return {
-                "session_id": session_id,
                 "task_id": snap.get("task_id"),
                 "current_node_id": snap.get("current_node_id"),
-                "workflow": {
-                    "flow_id": workflow.get("flow_id"),
-                    "name": workflow.get("name"),
-                    "description": workflow.get("description"),
-                    "start_node_id": workflow.get("start_node_id"),
-                    "log": workflow.get("log"),
-                    "node_count": len(nodes),
-                    "nodes": node_summaries,
-                    "remaining_node_count": max(len(nodes) - len(node_summaries), 0),
-                    "available_detail_methods": ["session_workflow_node_detail(node_id)"],
-                },
-                "source": "snapshot",
+                "workflow": snap["workflow"],
                 "snapshot_index": snap.get("index"),
             }
         raise ValueError(f"No workflow data found in snapshots for session: {session_id}")
 
+    def _workflow_from_snapshot(self, session_id: str) -> dict[str, Any]:
+        """从该 session 最新快照中读取 workflow 摘要，用于已终止 session 的 workflow 查询"""
+        snap = self._latest_workflow_snapshot(session_id)
+        workflow = snap["workflow"]
+        nodes = workflow.get("nodes") or []
+        node_summaries = nodes[:20]
+        return {
+            "session_id": session_id,
+            "task_id": snap.get("task_id"),
+            "current_node_id": snap.get("current_node_id"),
+            "workflow": {
+                "flow_id": workflow.get("flow_id"),
+                "name": workflow.get("name"),
+                "description": workflow.get("description"),
+                "start_node_id": workflow.get("start_node_id"),
+                "log": workflow.get("log"),
+                "node_count": len(nodes),
+                "nodes": node_summaries,
+                "remaining_node_count": max(len(nodes) - len(node_summaries), 0),
+                "available_detail_methods": ["session_workflow_node_detail(node_id)"],
+            },
+            "source": "snapshot",
+            "snapshot_index": snap.get("snapshot_index"),
+        }
+
     def get_runtime_value(self, session_id: str, key: str) -> dict[str, Any]:
         session = self._require_live_session(session_id)
         return session.describe_runtime_value(key)
@@ -1184,10 +1399,16 @@ class ExecutionSessionManager:
             record.updated_at = self._now()
             self._save_record(record)
             return
+        # 任务结束前等待该任务的快照落盘，结束后读取快照列表不会缺少最后几条
+        self.snapshot_writer.flush(session_id=session.record.session_id)
         session.mark_finished(success, error)
         with self._lock:
             self._live_sessions.pop(session_id, None)
 
+    def close(self, timeout: float = 5.0) -> None:
+        """service 退出时把排队中的快照写完"""
+        self.snapshot_writer.close(timeout)
+
     # --- 会话清理 ---
 
     _TERMINAL_STATUSES = frozenset({SESSION_STATUS_SUCCEEDED, SESSION_STATUS_FAILED})
@@ -1204,6 +1425,7 @@ class ExecutionSessionManager:
             )
         with self._lock:
             self._live_sessions.pop(record.session_id, None)
+            self._snapshot_files.pop(record.session_id, None)
         session_dir = self.session_root(record.session_id)
         record_file = self._resolve_session_file(record.session_id)
         snapshot_count = record.snapshot_count
@@ -1263,6 +1485,7 @@ class ExecutionSessionManager:
                     pass
             with self._lock:
                 self._live_sessions.pop(record.session_id, None)
+                self._snapshot_files.pop(record.session_id, None)
             session_dir = self.session_root(record.session_id)
             if session_dir.exists():
                 shutil.rmtree(session_dir, ignore_errors=True)
@@ -1281,12 +1504,235 @@ class ExecutionSessionManager:
     def snapshot_root(self, session_id: str) -> Path:
         return self.session_root(session_id) / "snapshots"
 
+    def workflow_version_root(self, session_id: str) -> Path:
+        return self.session_root(session_id) / "workflow"
+
+    def _save_workflow_version(self, session_id: str, version: int, workflow: dict[str, Any]) -> None:
+        path = self.workflow_version_root(session_id) / f"v{version:04d}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(workflow, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+
+    def _load_snapshot(
+        self,
+        session_id: str,
+        path: Path,
+        cache: dict[tuple[str, int], Any] | None = None,
+        runtime: bool = True,
+    ) -> dict[str, Any]:
+        """读取快照并还原完整视图：workflow_version 展开为 workflow，runtime_delta 叠加到关键帧上。
+        旧格式快照（内联 workflow 与完整 runtime）原样返回。cache 在一次查询的多次读取间复用版本与关键帧。
+        """
+        cache = {} if cache is None else cache
+        snapshot = load_json(path)
+        version = snapshot.get("workflow_version")
+        if version is not None and snapshot.get("workflow") is None:
+            key = ("workflow", version)
+            if key not in cache:
+                version_path = self.workflow_version_root(session_id) / f"v{version:04d}.json"
+                cache[key] = json.loads(version_path.read_text(encoding="utf-8"))
+            snapshot["workflow"] = cache[key]
+        delta = snapshot.pop("runtime_delta", None)
+        if runtime and delta is not None:
+            key = ("keyframe", delta["base"])
+            if key not in cache:
+                keyframe_path = self._resolve_snapshot_file(session_id, delta["base"])
+                cache[key] = load_json(keyframe_path)["runtime"]
+            snapshot["runtime"] = apply_runtime_delta(cache[key], delta)
+        return snapshot
+
+    def _snapshot_index_path(self, session_id: str) -> Path:
+        return self.snapshot_root(session_id) / SNAPSHOT_INDEX_NAME
+
+    def _ensure_snapshot_index(self, session_id: str) -> Path:
+        """返回快照索引路径；旧 session 没有索引时解析一次全部快照生成索引"""
+        index_path = self._snapshot_index_path(session_id)
+        if index_path.is_file():
+            return index_path
+        snapshot_files = self._snapshot_files_on_disk(session_id)
+        if not snapshot_files:
+            return index_path
+        cache: dict[tuple[str, int], Any] = {}
+        lines = []
+        for path in snapshot_files:
+            try:
+                raw = load_json(path)
+                entry = self._snapshot_summary(self._load_snapshot(session_id, path, cache))
+            except Exception:
+                continue
+            runtime_base = (raw.get("runtime_delta") or {}).get("base", raw.get("index"))
+            entry.update({"file": path.name, "size": path.stat().st_size, "runtime_base": runtime_base})
+            lines.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        temp_path = index_path.with_suffix(".jsonl.tmp")
+        temp_path.write_text("".join(lines), encoding="utf-8")
+        os.replace(temp_path, index_path)
+        return index_path
+
+    @staticmethod
+    def _iter_snapshot_index(index_path: Path, end: int | None = None, chunk_size: int = 65536):
+        """从 end（默认文件末尾）向前按块读取索引，逐行产出 (行起始偏移, 条目)；无法解析的行被跳过"""
+        if not index_path.is_file():
+            return
+        with open(index_path, "rb") as file_obj:
+            file_obj.seek(0, os.SEEK_END)
+            position = file_obj.tell() if end is None else max(0, min(int(end), file_obj.tell()))
+            head = b""
+            while position > 0:
+                read_size = min(chunk_size, position)
+                position -= read_size
+                file_obj.seek(position)
+                parts = (file_obj.read(read_size) + head).split(b"\n")
+                # 第一段可能是被块边界截断的行，留到下一轮与更前面的数据拼接
+                head = parts[0]
+                offset = position + len(head) + 1
+                located = []
+                for part in parts[1:]:
+                    located.append((offset, part))
+                    offset += len(part) + 1
+                for line_offset, part in reversed(located):
+                    if part.strip():
+                        try:
+                            yield line_offset, json.loads(part)
+                        except ValueError:
+                            continue
+            if head.strip():
+                try:
+                    yield 0, json.loads(head)
+                except ValueError:
+                    pass
+
+    def _snapshot_file_map(self, session_id: str) -> dict[int, str]:
+        """增量读取索引中新追加的行，维护快照编号到文件名的映射"""
+        index_path = self._snapshot_index_path(session_id)
+        with self._lock:
+            offset, files = self._snapshot_files.get(session_id, (0, {}))
+            if index_path.is_file():
+                with open(index_path, "rb") as file_obj:
+                    file_obj.seek(offset)
+                    for line in file_obj:
+                        if not line.endswith(b"\n"):
+                            break
+                        offset += len(line)
+                        try:
+                            entry = json.loads(line)
+                            files[int(entry["index"])] = entry["file"]
+                        except (ValueError, KeyError, TypeError):
+                            continue
+            self._snapshot_files[session_id] = (offset, files)
+            return files
+
     def _resolve_snapshot_file(self, session_id: str, snapshot_index: int) -> Path:
-        matches = sorted(self.snapshot_root(session_id).glob(f"{snapshot_index:05d}_*.json"))
+        file_name = self._snapshot_file_map(session_id).get(snapshot_index)
+        if file_name:
+            path = self.snapshot_root(session_id) / file_name
+            if path.is_file():
+                return path
+        matches = self._snapshot_files_on_disk(session_id, f"{snapshot_index:05d}_")
         if not matches:
             raise FileNotFoundError(f"Snapshot not found: session={session_id} index={snapshot_index}")
         return matches[0]
 
+    def _snapshot_files_on_disk(self, session_id: str, prefix: str = "") -> list[Path]:
+        """按文件名排序返回快照文件，包含压缩与未压缩两种格式"""
+        return sorted(
+            path
+            for path in self.snapshot_root(session_id).glob(f"{prefix}*.json*")
+            if path.name.endswith(_SNAPSHOT_SUFFIXES)
+        )
+
+    def open_artifact(self, session_id: str, name: str):
+        """以二进制流打开 session 目录下的页面产物（html / png），压缩文件边读边解压"""
+        record = self.get_session(session_id)
+        if not name or Path(name).name != name or not name.startswith("page_"):
+            raise ValueError(f"Invalid artifact name: {name}")
+        path = self.session_root(record.session_id) / name
+        if not path.is_file():
+            compressed = path.with_name(name + GZIP_SUFFIX)
+            if not compressed.is_file():
+                raise FileNotFoundError(f"Artifact not found: session={record.session_id} name={name}")
+            path = compressed
+        return open_artifact(path)
+
+    def evict_session_storage(self, session_id: str, bytes_to_free: int) -> dict[str, Any]:
+        """回收 session 存储直到释放 bytes_to_free 字节或无可回收文件。
+
+        先按关键帧分组从最早的组开始删除非 error 快照，组内增量快照全部删除后才删除关键帧；
+        error 快照、最新关键帧与最新快照始终保留。快照不足时再按时间顺序删除页面产物。
+        """
+        record = self.get_session(session_id)
+        session_id = record.session_id
+        self.snapshot_writer.flush(session_id=session_id)
+        index_path = self._ensure_snapshot_index(session_id)
+        freed = 0
+        evicted = 0
+
+        def _remove(path: Path) -> None:
+            nonlocal freed, evicted
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                return
+            freed += size
+            evicted += 1
+
+        with self.snapshot_writer.index_lock:
+            entries = []
+            if index_path.is_file():
+                with open(index_path, "r", encoding="utf-8") as file_obj:
+                    for line in file_obj:
+                        try:
+                            entries.append(json.loads(line))
+                        except ValueError:
+                            continue
+            groups: dict[int, list[dict[str, Any]]] = {}
+            for entry in entries:
+                groups.setdefault(entry.get("runtime_base", entry.get("index")), []).append(entry)
+            newest = entries[-1] if entries else None
+            newest_base = newest.get("runtime_base", newest.get("index")) if newest else None
+            removed: set[int] = set()
+            for base in sorted(groups):
+                if freed >= bytes_to_free:
+                    break
+                keyframe = None
+                remaining = 0
+                for entry in groups[base]:
+                    if entry.get("index") == base:
+                        keyframe = entry
+                    elif freed < bytes_to_free and entry.get("phase") != "error" and entry is not newest:
+                        _remove(self.snapshot_root(session_id) / entry["file"])
+                        removed.add(entry["index"])
+                    else:
+                        remaining += 1
+                if (
+                    keyframe is not None
+                    and not remaining
+                    and freed < bytes_to_free
+                    and base != newest_base
+                    and keyframe.get("phase") != "error"
+                ):
+                    _remove(self.snapshot_root(session_id) / keyframe["file"])
+                    removed.add(keyframe["index"])
+            if removed:
+                temp_path = index_path.with_suffix(".jsonl.tmp")
+                temp_path.write_text(
+                    "".join(
+                        json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+                        for entry in entries
+                        if entry.get("index") not in removed
+                    ),
+                    encoding="utf-8",
+                )
+                os.replace(temp_path, index_path)
+                with self._lock:
+                    self._snapshot_files.pop(session_id, None)
+
+        if freed < bytes_to_free:
+            for path in sorted(self.session_root(session_id).glob("page_*")):
+                if freed >= bytes_to_free:
+                    break
+                _remove(path)
+        return {"session_id": session_id, "freed_bytes": freed, "evicted": evicted}
+
     @staticmethod
     def _snapshot_sections(snapshot: dict[str, Any]) -> list[str]:
         sections: list[str] = []
@@ -0,0 +1,181 @@
+import gzip
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import IO, Any
+
+
+GZIP_SUFFIX = ".gz"
+
+
+def load_json(path: Path) -> Any:
+    """读取 JSON 文件，.gz 文件边读边解压"""
+    if path.suffix == GZIP_SUFFIX:
+        with gzip.open(path, "rt", encoding="utf-8") as file_obj:
+            return json.load(file_obj)
+    with open(path, "r", encoding="utf-8") as file_obj:
+        return json.load(file_obj)
+
+
+def open_artifact(path: Path) -> IO[bytes]:
+    """以二进制流打开产物文件，压缩文件返回解压流"""
+    if path.suffix == GZIP_SUFFIX:
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def directory_size(path: Path) -> tuple[int, int]:
+    """返回目录下全部文件的 (字节数, 文件数)，目录不存在时为 (0, 0)"""
+    total = 0
+    count = 0
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(current))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+                    count += 1
+            except FileNotFoundError:
+                continue
+    return total, count
+
+
+def collect_disk_usage(data_root: Path, limit: int = 20) -> dict[str, Any]:
+    """统计 data_root 各子目录占用，以及占用最大的 session 目录"""
+    directories: dict[str, int] = {}
+    total = 0
+    if data_root.is_dir():
+        for child in sorted(data_root.iterdir()):
+            if child.is_dir():
+                size = directory_size(child)[0]
+                directories[child.name] = size
+            elif child.is_file():
+                size = child.stat().st_size
+                directories["."] = directories.get(".", 0) + size
+            else:
+                continue
+            total += size
+    sessions_root = data_root / "sessions"
+    sessions = []
+    if sessions_root.is_dir():
+        for child in sessions_root.iterdir():
+            if child.is_dir():
+                size, files = directory_size(child)
+                sessions.append({"session_id": child.name, "bytes": size, "files": files})
+    sessions.sort(key=lambda item: item["bytes"], reverse=True)
+    return {
+        "data_root": str(data_root),
+        "total_bytes": total,
+        "directories": directories,
+        "sessions": {
+            "count": len(sessions),
+            "total_bytes": sum(item["bytes"] for item in sessions),
+            "largest": sessions[:limit],
+        },
+    }
+
+
+class SessionStorageReaper:
+    """按配额回收 session 存储的后台线程。
+
+    每 interval 秒检查一次：单个 session 超过 session_quota_bytes 时回收该 session 最早的快照；
+    全部 session 超过 total_quota_bytes 时从最久未更新的 session 开始回收。
+    error 快照与仍被引用的 runtime 关键帧不会被回收，session 记录本身不删除。
+    """
+
+    def __init__(
+        self,
+        manager,
+        session_quota_bytes: int = 0,
+        total_quota_bytes: int = 0,
+        interval: float = 60.0,
+        logger: logging.Logger | None = None,
+    ):
+        self.manager = manager
+        self.session_quota_bytes = max(0, int(session_quota_bytes))
+        self.total_quota_bytes = max(0, int(total_quota_bytes))
+        self.interval = max(1.0, float(interval))
+        self.logger = logger
+        self.last_run: dict[str, Any] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.session_quota_bytes or self.total_quota_bytes)
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="weboter-session-reaper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.reap_once()
+            except Exception as exc:
+                if self.logger:
+                    self.logger.warning("Session storage reaper failed: %s", exc)
+
+    def reap_once(self) -> dict[str, Any]:
+        started = time.time()
+        sessions = []
+        if self.manager.root.is_dir():
+            for child in self.manager.root.iterdir():
+                if child.is_dir():
+                    sessions.append([child.name, directory_size(child)[0], child.stat().st_mtime])
+        freed = 0
+        evicted = 0
+        if self.session_quota_bytes:
+            for item in sessions:
+                if item[1] > self.session_quota_bytes:
+                    result = self.manager.evict_session_storage(item[0], item[1] - self.session_quota_bytes)
+                    item[1] -= result["freed_bytes"]
+                    freed += result["freed_bytes"]
+                    evicted += result["evicted"]
+        if self.total_quota_bytes:
+            total = sum(item[1] for item in sessions)
+            for item in sorted(sessions, key=lambda value: value[2]):
+                if total <= self.total_quota_bytes:
+                    break
+                result = self.manager.evict_session_storage(item[0], total - self.total_quota_bytes)
+                total -= result["freed_bytes"]
+                freed += result["freed_bytes"]
+                evicted += result["evicted"]
+        self.last_run = {
+            "at": started,
+            "duration_ms": round((time.time() - started) * 1000, 1),
+            "sessions": len(sessions),
+            "freed_bytes": freed,
+            "evicted": evicted,
+        }
+        if evicted and self.logger:
+            self.logger.info("Session storage reaper evicted %s files (%s bytes)", evicted, freed)
+        return self.last_run
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "session_quota_bytes": self.session_quota_bytes,
+            "total_quota_bytes": self.total_quota_bytes,
+            "interval": self.interval,
+            "last_run": self.last_run,
+        }
@@ -0,0 +1,38 @@
+from typing import Any
+
+
+def diff_runtime(base: dict[str, Any], current: dict[str, Any]) -> dict[str, Any]:
+    """按作用域（global / flow / cur_outputs ...）及其一级键比较两份序列化后的 runtime。
+
+    返回 {"set": {scope: {key: value}}, "unset": {scope: [key]}, "replace": {scope: value}, "drop": [scope]}，
+    只包含有变化的部分；作用域不是 dict 时整体替换。
+    """
+    delta: dict[str, Any] = {"set": {}, "unset": {}, "replace": {}, "drop": []}
+    for scope, value in current.items():
+        previous = base.get(scope)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            changed = {key: item for key, item in value.items() if key not in previous or previous[key] != item}
+            removed = [key for key in previous if key not in value]
+            if changed:
+                delta["set"][scope] = changed
+            if removed:
+                delta["unset"][scope] = removed
+        elif scope not in base or previous != value:
+            delta["replace"][scope] = value
+    delta["drop"] = [scope for scope in base if scope not in current]
+    return {key: value for key, value in delta.items() if value}
+
+
+def apply_runtime_delta(base: dict[str, Any], delta: dict[str, Any]) -> dict[str, Any]:
+    """diff_runtime 的逆操作；base 不会被修改"""
+    result = {scope: dict(value) if isinstance(value, dict) else value for scope, value in base.items()}
+    for scope in delta.get("drop", []):
+        result.pop(scope, None)
+    for scope, value in delta.get("replace", {}).items():
+        result[scope] = value
+    for scope, keys in delta.get("unset", {}).items():
+        for key in keys:
+            result[scope].pop(key, None)
+    for scope, changed in delta.get("set", {}).items():
+        result.setdefault(scope, {}).update(changed)
+    return result
@@ -0,0 +1,213 @@
+import gzip
+import json
+import logging
+from pathlib import Path
+import queue
+import threading
+from typing import Any
+
+
+SNAPSHOT_POLICIES = ("block", "drop", "sample")
+
+# 快照目录下的追加式索引，每行一个快照摘要，快照文件写入后追加
+SNAPSHOT_INDEX_NAME = "index.jsonl"
+
+# 调试与取证依赖的快照阶段：任何策略下都不丢弃，队列满时等待写入
+CRITICAL_PHASES = frozenset({"loaded", "error", "debug_stop", "finished", "page_script", "temporary_node"})
+
+
+class SnapshotWriter:
+    """session 快照的后台写入线程。
+
+    capture_snapshot 只构建快照并入队，写入线程按批编码（紧凑 JSON）、落盘，
+    每批结束后为涉及的 session 保存一次记录文件。队列有界，积压时按 policy 处理
+    before_step/after_step 等普通快照：
+
+    - block: 等待队列空位，不丢快照
+    - drop: 队列满时丢弃新快照
+    - sample: 队列过半时只保留每 sample_every 个普通快照，满时丢弃
+
+    compress 为 True 时 session 以 .json.gz 命名快照，写入线程按路径后缀决定是否 gzip 压缩。
+    index_lock 保护 index.jsonl 的追加与回收时的整体改写。
+    未落盘的快照按 session 计数，flush(session_id=...) 只等待该 session，不受其他繁忙 session 影响。
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        queue_size: int = 64,
+        policy: str = "sample",
+        sample_every: int = 5,
+        batch_size: int = 32,
+        compress: bool = False,
+        logger: logging.Logger | None = None,
+    ):
+        if policy not in SNAPSHOT_POLICIES:
+            raise ValueError(f"Invalid snapshot policy: {policy}. Expected one of {', '.join(SNAPSHOT_POLICIES)}")
+        self.queue_size = max(1, int(queue_size))
+        self.policy = policy
+        self.sample_every = max(1, int(sample_every))
+        self.batch_size = max(1, int(batch_size))
+        self.compress = bool(compress)
+        self.index_lock = threading.Lock()
+        self.logger = logger
+        self.queue: queue.Queue = queue.Queue(self.queue_size)
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._sample_counter = 0
+        self._pending = 0
+        self._pending_by_session: dict[str, int] = {}
+        self._idle = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def submit(
+        self,
+        session,
+        path: Path,
+        snapshot: dict[str, Any],
+        critical: bool = False,
+        index_entry: dict[str, Any] | None = None,
+    ) -> bool:
+        """入队一个快照；按 policy 被丢弃时返回 False，critical 快照（如 runtime 关键帧）总是入队。
+        index_entry 在快照写入后追加到同目录的 index.jsonl，并补充 file 与 size。
+        """
+        self._ensure_started()
+        item = (session, path, snapshot, index_entry)
+        session_id = session.record.session_id
+        with self._idle:
+            self._pending += 1
+            self._pending_by_session[session_id] = self._pending_by_session.get(session_id, 0) + 1
+        if critical or snapshot.get("phase") in CRITICAL_PHASES or self.policy == "block":
+            self.queue.put(item)
+            return True
+        if self.policy == "sample" and self.queue.qsize() >= self.queue_size // 2:
+            self._sample_counter += 1
+            if self._sample_counter % self.sample_every:
+                return self._discard(session_id)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            return self._discard(session_id)
+        return True
+
+    def flush(self, timeout: float | None = 5.0, session_id: str | None = None) -> bool:
+        """等待已入队的快照落盘，指定 session_id 时只等待该 session 的快照；超时返回 False"""
+        with self._idle:
+            if session_id is None:
+                return self._idle.wait_for(lambda: self._pending == 0, timeout)
+            return self._idle.wait_for(lambda: session_id not in self._pending_by_session, timeout)
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        self.queue.put(self._STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "policy": self.policy,
+            "queue_size": self.queue_size,
+            "compress": self.compress,
+            "queued": self.queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def _discard(self, session_id: str) -> bool:
+        self.dropped += 1
+        self._done([session_id])
+        return False
+
+    def _done(self, session_ids: list[str]) -> None:
+        with self._idle:
+            self._pending -= len(session_ids)
+            for session_id in session_ids:
+                remaining = self._pending_by_session.get(session_id, 0) - 1
+                if remaining > 0:
+                    self._pending_by_session[session_id] = remaining
+                else:
+                    self._pending_by_session.pop(session_id, None)
+            self._idle.notify_all()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._drain_loop, name="weboter-snapshot-writer", daemon=True)
+                self._thread.start()
+
+    def _drain_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            batch = []
+            while True:
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if not batch:
+                continue
+            try:
+                self._write_batch(batch)
+            except Exception as exc:
+                # 任何异常都不能让写入线程退出，否则 critical 快照的阻塞入队会永远等待
+                self._log_warning("Snapshot writer batch failed: %s", exc)
+            finally:
+                self._done([item[0].record.session_id for item in batch])
+
+    def _write_batch(self, batch: list[tuple[Any, Path, dict[str, Any], dict[str, Any] | None]]) -> None:
+        sessions: dict[int, Any] = {}
+        index_lines: dict[Path, list[str]] = {}
+        for session, path, snapshot, index_entry in batch:
+            try:
+                payload = json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                if path.suffix == ".gz":
+                    payload = gzip.compress(payload, compresslevel=6)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(payload)
+                if index_entry is not None:
+                    line = json.dumps(
+                        {**index_entry, "file": path.name, "size": len(payload)},
+                        ensure_ascii=False,
+                        separators=(",", ":"),
+                    )
+                    index_lines.setdefault(path.parent / SNAPSHOT_INDEX_NAME, []).append(line)
+            except Exception as exc:
+                self.failed += 1
+                self._log_warning("Failed to write snapshot %s: %s", path, exc)
+                session._on_snapshot_failed(snapshot.get("index"))
+                continue
+            self.written += 1
+            session._on_snapshot_written(path)
+            sessions[id(session)] = session
+        with self.index_lock:
+            for index_path, lines in index_lines.items():
+                try:
+                    with open(index_path, "a", encoding="utf-8") as file_obj:
+                        file_obj.write("\n".join(lines) + "\n")
+                except Exception as exc:
+                    self._log_warning("Failed to append snapshot index %s: %s", index_path, exc)
+        # 同一批中的多个快照只保存一次 session 记录
+        for session in sessions.values():
+            try:
+                session._persist_record()
+            except Exception as exc:
+                self._log_warning("Failed to save session record %s: %s", session.record.session_id, exc)
+
+    def _log_warning(self, message: str, *args) -> None:
+        if self.logger:
+            self.logger.warning(message, *args)
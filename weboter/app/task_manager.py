@@ -4,13 +4,22 @@ from datetime import datetime
 import json
 import logging
 from pathlib import Path
+import queue
 import threading
 import time
 from typing import Any
 from uuid import uuid4
 
+from weboter.app.log_pipeline import TaskLogWriter
+from weboter.app.process_info import alive_pids, descendant_pids
 from weboter.app.session import ExecutionSessionManager, SESSION_STATUS_GUARD_WAITING, SESSION_STATUS_PAUSED
 from weboter.app.service import WorkflowService
+from weboter.core.engine.action_cache import ActionCacheStats
+from weboter.core.engine.checkpoint import CheckpointStore, TaskCheckpointer
+from weboter.core.engine.har import HarSession, validate_har_mode
+from weboter.core.engine.lifecycle import ResourceTracker
+from weboter.core.engine.plan import parse_hook_mode
+from weboter.core.engine.profiler import StepProfiler
 
 
 TASK_STATUS_QUEUED = "queued"
@@ -19,6 +28,8 @@ TASK_STATUS_GUARD_WAITING = "guard_waiting"
 TASK_STATUS_SUCCEEDED = "succeeded"
 TASK_STATUS_FAILED = "failed"
 TERMINAL_TASK_STATUSES = {TASK_STATUS_SUCCEEDED, TASK_STATUS_FAILED}
+# 资源关闭后等待 driver/浏览器进程退出的时间，超时仍存活的进程记为泄漏
+PROCESS_EXIT_GRACE_SECONDS = 2.0
 
 
 @dataclass
@@ -34,6 +45,17 @@ class TaskRecord:
     finished_at: str | None = None
     log_path: str | None = None
     error: str | None = None
+    profile: dict[str, Any] | None = None
+    hook_mode: str = "all"
+    cache: dict[str, int] | None = None
+    resumed_from: str | None = None
+    rewarm_flow_id: str | None = None
+    checkpoint_node_id: str | None = None
+    leaked_pids: list[int] | None = None
+    # 进程泄漏检查状态：pending / clean / leaked / unknown（读取不到 driver pid），池内浏览器不检查时为 None
+    leak_check: str | None = None
+    har_mode: str | None = None
+    har_path: str | None = None
 
 
 class TaskManager:
@@ -55,6 +77,19 @@ class TaskManager:
         self._queued_count = 0
         self._running_count = 0
         self._count_lock = threading.Lock()
+        # 运行中任务的 profiler，任务结束后聚合结果写入 TaskRecord.profile
+        self._profilers: dict[str, StepProfiler] = {}
+        # 检查点不能放在 task_root 下，list_tasks 会把其中的 *.json 当作任务记录
+        self.checkpoint_store = CheckpointStore(self.workflow_service.data_root / "checkpoints")
+        # record 模式未指定路径时 HAR 写到 <data_root>/har/<task_id>.har
+        self.har_root = self.workflow_service.data_root / "har"
+        # 本进程内已提交且尚未结束的任务；不在其中的 running 任务视为 service 重启遗留
+        self._active_tasks: set[str] = set()
+        # 任务结束后仍存活的 playwright/浏览器进程：task_id -> pids
+        self._process_leaks: dict[str, list[int]] = {}
+        # 等待进程退出放在后台线程里，任务线程结束后立即可以处理下一个任务
+        self._leak_checks: queue.Queue = queue.Queue()
+        self._leak_reaper: threading.Thread | None = None
 
     def submit(
         self,
@@ -62,9 +97,27 @@ class TaskManager:
         trigger: str,
         pause_before_start: bool = False,
         breakpoints: list[dict[str, Any]] | None = None,
+        hook_mode: str = "all",
+        resume_from: str | None = None,
+        rewarm_flow_id: str | None = None,
+        har_mode: str | None = None,
+        har_path: str | None = None,
     ) -> TaskRecord:
+        parse_hook_mode(hook_mode)
+        har_mode = validate_har_mode(har_mode)
+        if har_path and not har_mode:
+            raise ValueError("har_path requires har_mode record or replay")
+        if har_mode == "replay":
+            har_path = self._resolve_replay_har(har_path)
+        checkpoint = None
+        if resume_from:
+            checkpoint = self.checkpoint_store.load(resume_from)
+            if checkpoint is None:
+                raise FileNotFoundError(f"Checkpoint not found for task: {resume_from}")
         task_id = uuid4().hex[:12]
         log_path = self.task_root / f"{task_id}.log"
+        if har_mode == "record":
+            har_path = str(Path(har_path).expanduser().resolve()) if har_path else str(self.har_root / f"{task_id}.har")
         record = TaskRecord(
             task_id=task_id,
             session_id=task_id,
@@ -74,7 +127,16 @@ class TaskManager:
             trigger=trigger,
             created_at=self._now(),
             log_path=str(log_path),
+            hook_mode=hook_mode,
+            resumed_from=resume_from,
+            rewarm_flow_id=rewarm_flow_id,
+            checkpoint_node_id=checkpoint.get("node_id") if checkpoint else None,
+            har_mode=har_mode,
+            har_path=har_path,
         )
+        if checkpoint is not None:
+            # resume 任务持有一份自己的检查点，再次失败时可以继续 resume
+            self.checkpoint_store.save(task_id, checkpoint)
         if self.session_manager is not None:
             self.session_manager.create_session(
                 task_id,
@@ -83,14 +145,53 @@ class TaskManager:
                 log_path,
                 pause_before_start=pause_before_start,
                 breakpoints=breakpoints,
+                hook_mode=hook_mode,
             )
         self._save(record)
         self.system_logger.info("任务已创建: %s -> %s", task_id, workflow_path)
         with self._count_lock:
             self._queued_count += 1
+            self._active_tasks.add(task_id)
         self._executor.submit(self._run_task, task_id)
         return record
 
+    def resume(self, task_id: str, rewarm_flow_id: str | None = None) -> TaskRecord:
+        """基于任务最近的检查点创建 trigger=resume 的新任务，从检查点节点继续执行"""
+        source = self.get_task(task_id)
+        with self._count_lock:
+            active = source.task_id in self._active_tasks
+        if active:
+            raise ValueError(f"Task is still active: {source.task_id}")
+        if source.status == TASK_STATUS_SUCCEEDED:
+            raise ValueError(f"Task already succeeded: {source.task_id}")
+        record = self.submit(
+            Path(source.workflow_path),
+            trigger="resume",
+            hook_mode=source.hook_mode,
+            resume_from=source.task_id,
+            rewarm_flow_id=rewarm_flow_id,
+            # 回放任务恢复后继续回放；录制任务恢复时不覆盖已有的 HAR
+            har_mode="replay" if source.har_mode == "replay" else None,
+            har_path=source.har_path if source.har_mode == "replay" else None,
+        )
+        self.system_logger.info("任务已从检查点恢复: %s -> %s (node=%s)", source.task_id, record.task_id, record.checkpoint_node_id)
+        return record
+
+    def _resolve_replay_har(self, har_path: str | None) -> str:
+        """replay 的 har_path 可以是 HAR 文件路径，也可以是一个 record 任务的 task_id"""
+        if not har_path:
+            raise ValueError("har_mode replay requires har_path (a HAR file or a recorded task id)")
+        candidate = Path(har_path).expanduser()
+        if candidate.is_file():
+            return str(candidate.resolve())
+        try:
+            source = self.get_task(har_path)
+        except (FileNotFoundError, ValueError):
+            source = None
+        if source is not None and source.har_mode == "record" and source.har_path and Path(source.har_path).is_file():
+            return source.har_path
+        raise FileNotFoundError(f"HAR file not found for replay: {har_path}")
+
     def list_tasks(self, limit: int = 20) -> list[TaskRecord]:
         task_files = sorted(self.task_root.glob("*.json"), key=lambda item: item.stat().st_mtime, reverse=True)
         records = [self._load_from_file(task_file) for task_file in task_files[:limit]]
@@ -120,6 +221,18 @@ class TaskManager:
             "content": self._tail_text(log_path, lines),
         }
 
+    def get_task_profile(self, task_id: str) -> dict[str, Any]:
+        """返回任务的分阶段耗时统计；运行中的任务返回实时聚合结果"""
+        record = self.get_task(task_id)
+        profiler = self._profilers.get(record.task_id)
+        profile = profiler.snapshot() if profiler is not None else record.profile
+        return {
+            "task_id": record.task_id,
+            "status": record.status,
+            "live": profiler is not None,
+            "profile": profile,
+        }
+
     def wait_for_task(self, task_id: str, timeout: float | None = None, interval: float = 0.5) -> TaskRecord:
         deadline = None if timeout is None else time.time() + timeout
         while True:
@@ -139,19 +252,69 @@ class TaskManager:
                 "max_workers": self._max_workers,
             }
 
+    def process_leaks(self) -> dict[str, list[int]]:
+        """返回仍存活的泄漏进程，已退出的进程与清空后的任务会被移除"""
+        with self._count_lock:
+            leaks = dict(self._process_leaks)
+        result = {}
+        for task_id, pids in leaks.items():
+            alive = alive_pids(pids)
+            if alive:
+                result[task_id] = alive
+        with self._count_lock:
+            for task_id in leaks:
+                if task_id not in result:
+                    self._process_leaks.pop(task_id, None)
+        return result
+
+    def _schedule_leak_check(self, record: TaskRecord, resources: ResourceTracker) -> None:
+        """标记任务的泄漏检查状态，需要等待进程退出时交给后台 reaper 线程，结果写回任务记录"""
+        if not resources.process_ids:
+            record.leak_check = "unknown" if resources.unknown_drivers else None
+            return
+        record.leak_check = "pending"
+        with self._count_lock:
+            if self._leak_reaper is None:
+                self._leak_reaper = threading.Thread(target=self._reap_leaks, name="weboter-leak-reaper", daemon=True)
+                self._leak_reaper.start()
+        self._leak_checks.put((record, set(resources.process_ids), time.time() + PROCESS_EXIT_GRACE_SECONDS))
+
+    def _reap_leaks(self) -> None:
+        # 按提交顺序处理，后提交的检查截止时间不早于之前的检查
+        while True:
+            record, pids, deadline = self._leak_checks.get()
+            try:
+                alive = alive_pids(pids)
+                while alive and time.time() < deadline:
+                    time.sleep(0.1)
+                    alive = alive_pids(alive)
+                if alive:
+                    with self._count_lock:
+                        self._process_leaks[record.task_id] = alive
+                    self.system_logger.warning("任务 %s 结束后仍有 %d 个浏览器相关进程存活: %s", record.task_id, len(alive), alive)
+                record.leaked_pids = alive or None
+                record.leak_check = "leaked" if alive else "clean"
+                self._save(record)
+            except Exception as exc:
+                self.system_logger.warning("Process leak check failed for task %s: %s", record.task_id, exc)
+
     def _run_task(self, task_id: str) -> None:
         record = self.get_task(task_id)
-        logger = logging.getLogger(f"weboter.task.{task_id}")
-        logger.setLevel(logging.DEBUG)
+        # 任务 logger 只在本任务内使用，不经 logging.getLogger 注册，随任务结束释放，service 长期运行时不逐任务累积
+        logger = logging.Logger(f"weboter.task.{task_id}", logging.DEBUG)
         logger.propagate = False
-        logger.handlers.clear()
         formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-        file_handler = logging.FileHandler(record.log_path, encoding="utf-8")
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        # 日志经队列交给后台线程批量写入，任务线程不做文件 IO
+        log_writer = TaskLogWriter(record.log_path, formatter)
+        log_writer.attach(logger)
         with self._count_lock:
             self._queued_count = max(0, self._queued_count - 1)
             self._running_count += 1
+        profiler = StepProfiler()
+        self._profilers[task_id] = profiler
+        cache_stats = ActionCacheStats()
+        checkpointer = TaskCheckpointer(self.checkpoint_store, task_id, logger)
+        resources = ResourceTracker(process_probe=descendant_pids)
 
         try:
             record.status = TASK_STATUS_RUNNING
@@ -162,9 +325,31 @@ class TaskManager:
             if self.session_manager is not None:
                 live_session = self.session_manager.get_live_session(task_id)
                 hooks = live_session.create_hooks() if live_session is not None else None
-            self.workflow_service.run_workflow(Path(record.workflow_path), logger=logger, hooks=hooks)
+            checkpoint = None
+            if record.resumed_from:
+                checkpoint = self.checkpoint_store.load(task_id)
+                if checkpoint is None:
+                    raise FileNotFoundError(f"Checkpoint not found for task: {task_id}")
+            self.workflow_service.run_workflow(
+                Path(record.workflow_path),
+                logger=logger,
+                hooks=hooks,
+                profiler=profiler,
+                cache_stats=cache_stats,
+                checkpointer=checkpointer,
+                checkpoint=checkpoint,
+                rewarm_flow_id=record.rewarm_flow_id,
+                resources=resources,
+                har=HarSession(record.har_mode, record.har_path) if record.har_mode else None,
+            )
+            # 先等后台写入线程结束，避免删除后又被未落盘的检查点重新写出
+            checkpointer.close()
+            self.checkpoint_store.delete(task_id)
             record.status = TASK_STATUS_SUCCEEDED
             record.finished_at = self._now()
+            record.profile = profiler.snapshot()
+            record.cache = cache_stats.to_dict()
+            self._schedule_leak_check(record, resources)
             self._save(record)
             if self.session_manager is not None:
                 self.session_manager.mark_session_finished(task_id, True)
@@ -174,6 +359,12 @@ class TaskManager:
             record.status = TASK_STATUS_FAILED
             record.error = str(exc)
             record.finished_at = self._now()
+            checkpointer.close()
+            last_checkpoint = self.checkpoint_store.load(task_id)
+            record.checkpoint_node_id = last_checkpoint.get("node_id") if last_checkpoint else None
+            record.profile = profiler.snapshot()
+            record.cache = cache_stats.to_dict()
+            self._schedule_leak_check(record, resources)
             self._save(record)
             if self.session_manager is not None:
                 self.session_manager.mark_session_finished(task_id, False, str(exc))
@@ -181,8 +372,11 @@ class TaskManager:
         finally:
             with self._count_lock:
                 self._running_count = max(0, self._running_count - 1)
-            logger.removeHandler(file_handler)
-            file_handler.close()
+                self._active_tasks.discard(task_id)
+            self._profilers.pop(task_id, None)
+            checkpointer.close()
+            log_writer.detach(logger)
+            log_writer.close()
 
     def _task_file(self, task_id: str) -> Path:
         return self.task_root / f"{task_id}.json"
@@ -41,15 +41,22 @@ except ModuleNotFoundError as exc:
 actions = [
     # special
     basic_action.SubFlow,  # special action for executing sub flows, it should not be used directly in nodes, but will be used by the excutor when executing sub flows
+    basic_action.ForkJoin,
+    basic_action.ForEach,
     # basic
     basic_action.OpenBrowser,
     basic_action.OpenPage,
+    basic_action.SaveStorageState,
     basic_action.ClickItem,
     basic_action.FillInput,
     basic_action.WaitElement,
     basic_action.SleepFor,
     basic_action.EmptyAction,
     basic_action.ExtractData,
+    basic_action.ExtractList,
+    basic_action.ExtractTable,
+    basic_action.CaptureResponses,
+    basic_action.CollectResponses,
     basic_action.GetElement,
     basic_action.NextElement,
     basic_action.PyEvalAction,
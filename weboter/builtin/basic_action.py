@@ -1,8 +1,13 @@
+import asyncio
 import logging
+import time
 
 from weboter.public.contracts import *
+from weboter.public.model import VarRef
 import playwright.async_api as pw
 
+from .network import BLOCK_PROFILES, RequestBlocker, ResponseCapture, capture_for, page_block_stats, remove_capture
+
 try:
     from playwright_stealth import Stealth
 except Exception:
@@ -49,6 +54,129 @@ class SubFlow(ActionBase):
             raise ValueError("Input 'flow_id' is required to execute sub flow.")
         await executor.sub_flow_func(io)
 
+class ForkJoin(ActionBase):
+    """Action to run several sub flows concurrently and join their outputs."""
+    name: str = "ForkJoin"
+    description: str = (
+        "Run several sub flows concurrently, each branch on its own page, and merge their outputs in branch order. "
+        "Each branch works on a copy of $global and its $global writes are not merged back; "
+        "only values declared in the branch data_out are surfaced. "
+        "Debug hooks are serialized across branches, so a pause in one branch holds the others at their next step"
+    )
+    inputs: list[InputFieldDeclaration] = [
+        InputFieldDeclaration(
+            name="branches",
+            description="A list of branches: {flow_id, data_in, data_out}; data_in/data_out follow SubFlow picker rules",
+            required=True,
+            accepted_types=["list"]
+        ),
+        InputFieldDeclaration(
+            name="new_page",
+            description="Open a dedicated page in the shared browser context for each branch",
+            required=False,
+            accepted_types=["boolean"],
+            default=True
+        )
+    ]
+    outputs: list[OutputFieldDeclaration] = [
+        OutputFieldDeclaration(
+            name="branches",
+            description="Per-branch data_out values (dst without '$'), in branch order",
+            type="list"
+        )
+    ]
+
+    async def execute(self, io: IOPipe):
+        executor = io.executor
+        if not executor:
+            raise ValueError("Executor is required in IOPipe context to execute fork/join.")
+        if not hasattr(executor, "fork_join_func") or not callable(executor.fork_join_func):
+            raise ValueError("Executor does not have a callable 'fork_join_func' method to execute fork/join.")
+        await executor.fork_join_func(io)
+
+class ForEach(ActionBase):
+    """Action to run a sub flow for every item of a list with bounded concurrency."""
+    name: str = "ForEach"
+    description: str = "Run a sub flow once per list item with a concurrency limit, collecting results in order"
+    inputs: list[InputFieldDeclaration] = [
+        InputFieldDeclaration(
+            name="items",
+            description="The list to iterate, usually a variable reference like $flow{items}",
+            required=True,
+            accepted_types=["list"]
+        ),
+        InputFieldDeclaration(
+            name="flow_id",
+            description="The ID of the sub flow to run for each item",
+            required=True,
+            accepted_types=["string"]
+        ),
+        InputFieldDeclaration(
+            name="item_var",
+            description="Name of the $flow variable holding the current item inside the sub flow",
+            required=False,
+            accepted_types=["string"],
+            default="item"
+        ),
+        InputFieldDeclaration(
+            name="index_var",
+            description="Name of the $flow variable holding the current index inside the sub flow",
+            required=False,
+            accepted_types=["string"],
+            default="index"
+        ),
+        InputFieldDeclaration(
+            name="data_in",
+            description="Extra VarPickers passed to every item, same rules as SubFlow",
+            required=False,
+            accepted_types=["list"],
+            default=[]
+        ),
+        InputFieldDeclaration(
+            name="result_src",
+            description="Variable read from the sub flow after each item as its result",
+            required=False,
+            accepted_types=["string"],
+            default="$flow{result}"
+        ),
+        InputFieldDeclaration(
+            name="concurrency",
+            description="Maximum number of items running at the same time; above 1, every item gets its own copy of $global and a pooled page",
+            required=False,
+            accepted_types=["integer"],
+            default=1
+        ),
+        InputFieldDeclaration(
+            name="use_pages",
+            description="Run items on pooled pages from the shared browser context (one page per concurrent slot, closed pages are replaced); always on when concurrency > 1, which falls back to serial execution when no browser context is open. Requires a browser context when set explicitly",
+            required=False,
+            accepted_types=["boolean"],
+            default=False
+        )
+    ]
+    outputs: list[OutputFieldDeclaration] = [
+        OutputFieldDeclaration(
+            name="results",
+            description="Per-item results read from result_src, in item order",
+            type="list"
+        ),
+        OutputFieldDeclaration(
+            name="count",
+            description="Number of items processed",
+            type="integer"
+        )
+    ]
+
+    async def execute(self, io: IOPipe):
+        executor = io.executor
+        if not executor:
+            raise ValueError("Executor is required in IOPipe context to execute for-each.")
+        if not hasattr(executor, "for_each_func") or not callable(executor.for_each_func):
+            raise ValueError("Executor does not have a callable 'for_each_func' method to execute for-each.")
+        if not io.inputs.get("flow_id"):
+            raise ValueError("Input 'flow_id' is required to execute for-each.")
+        await executor.for_each_func(io)
+
 class OpenBrowser(ActionBase):
     """Action to open a web browser instance."""
     name: str = "OpenBrowser"
@@ -67,6 +195,41 @@ class OpenBrowser(ActionBase):
             required=False,
             accepted_types=["boolean"],
             default=True
+        ),
+        InputFieldDeclaration(
+            name="block_profile",
+            description=f"Request blocking profiles, comma separated or a list: {', '.join(BLOCK_PROFILES)}",
+            required=False,
+            accepted_types=["string", "list"],
+            default=""
+        ),
+        InputFieldDeclaration(
+            name="block_resource_types",
+            description="Extra resource types to block, e.g. image, font, media, stylesheet, script",
+            required=False,
+            accepted_types=["list"],
+            default=[]
+        ),
+        InputFieldDeclaration(
+            name="block_url_patterns",
+            description="Extra URL glob patterns to block, e.g. *://*.doubleclick.net/*",
+            required=False,
+            accepted_types=["list"],
+            default=[]
+        ),
+        InputFieldDeclaration(
+            name="storage_profile",
+            description="Restore cookies and localStorage saved by SaveStorageState under this profile name",
+            required=False,
+            accepted_types=["string"],
+            default=""
+        ),
+        InputFieldDeclaration(
+            name="storage_max_age",
+            description="Ignore the saved storage state when it is older than this many seconds, 0 means only use its own expiry",
+            required=False,
+            accepted_types=["number"],
+            default=0
         )
     ]
     outputs: list[OutputFieldDeclaration] = [
@@ -74,6 +237,21 @@ class OpenBrowser(ActionBase):
             name="browser",
             description="The opened browser instance",
             type="Browser"
+        ),
+        OutputFieldDeclaration(
+            name="request_blocking",
+            description="The effective request blocking rules, null when nothing is blocked",
+            type="object"
+        ),
+        OutputFieldDeclaration(
+            name="storage_restored",
+            description="Whether a saved storage state was restored into the browser context",
+            type="boolean"
+        ),
+        OutputFieldDeclaration(
+            name="har_path",
+            description="The HAR file recorded or replayed for this context when the task runs in HAR mode",
+            type="string"
         )
     ]
 
@@ -81,29 +259,103 @@ class OpenBrowser(ActionBase):
         inputs = io.inputs
         browser_type = inputs.get("browser_type")
         headless = inputs.get("headless", True)
-
-        pw_instance = await pw.async_playwright().start()
-
-        if browser_type == "chromium":
-            browser = await pw_instance.chromium.launch(headless=headless)
-        elif browser_type == "firefox":
-            browser = await pw_instance.firefox.launch(headless=headless)
-        elif browser_type == "webkit":
-            browser = await pw_instance.webkit.launch(headless=headless)
+        # 先校验拦截规则，避免配置错误时已经启动浏览器
+        blocker = RequestBlocker.from_inputs(
+            inputs.get("block_profile"),
+            inputs.get("block_resource_types"),
+            inputs.get("block_url_patterns"),
+        )
+        storage_state = None
+        storage_profile = inputs.get("storage_profile")
+        if storage_profile:
+            store = getattr(io.executor, "storage_states", None)
+            if store is None:
+                io.logger.warning("Storage state store is not available, profile '%s' is ignored", storage_profile)
+            else:
+                storage_state = store.load(storage_profile, inputs.get("storage_max_age") or None)
+                if storage_state is None:
+                    io.logger.info("No valid storage state for profile '%s', starting with an empty context", storage_profile)
+        context_options = {"storage_state": storage_state} if storage_state is not None else {}
+        har = getattr(io.executor, "har", None)
+        har_path = har.next_path() if har is not None else None
+        if har is not None:
+            context_options.update(har.context_options(har_path))
+
+        pool = getattr(io.executor, "browser_pool", None)
+        if pool is not None and pool.supports(browser_type, headless):
+            # 从 service 浏览器池租用预热的浏览器，任务结束时由池统一回收 context
+            lease = await pool.lease(browser_type, context_options)
+            pw_instance, browser, browser_context = lease.playwright, lease.browser, lease.context
         else:
-            raise ValueError(f"Unsupported browser type: {browser_type}")
-        
-        browser_context = await browser.new_context()
+            pw_instance = await pw.async_playwright().start()
+
+            if browser_type == "chromium":
+                browser = await pw_instance.chromium.launch(headless=headless)
+            elif browser_type == "firefox":
+                browser = await pw_instance.firefox.launch(headless=headless)
+            elif browser_type == "webkit":
+                browser = await pw_instance.webkit.launch(headless=headless)
+            else:
+                raise ValueError(f"Unsupported browser type: {browser_type}")
+
+            browser_context = await browser.new_context(**context_options)
         if Stealth is not None:
             stealth = Stealth()
             await stealth.apply_stealth_async(browser_context)
+        if blocker is not None:
+            await blocker.install(browser_context)
+        if har is not None:
+            # 回放处理器最后注册、最先匹配，HAR 中的请求不会再经过拦截规则
+            await har.attach(browser_context, har_path)
 
         io.outputs['browser'] = browser
+        io.outputs['request_blocking'] = blocker.describe() if blocker is not None else None
+        io.outputs['storage_restored'] = storage_state is not None
+        io.outputs['har_path'] = str(har_path) if har_path is not None else None
         # 特殊变量会被额外处理
         io.outputs['__pw_inst__'] = pw_instance
         io.outputs['__browser__'] = browser
         io.outputs['__browser_context__'] = browser_context
 
+class SaveStorageState(ActionBase):
+    """Action to save the current browser context's cookies and localStorage under a profile name."""
+    name: str = "SaveStorageState"
+    description: str = "Save cookies and localStorage of the current browser context for OpenBrowser storage_profile"
+    inputs: list[InputFieldDeclaration] = [
+        InputFieldDeclaration(
+            name="profile",
+            description="Storage profile name (letters, digits, '_', '.', '-')",
+            required=True,
+            accepted_types=["string"]
+        ),
+        InputFieldDeclaration(
+            name="ttl",
+            description="Seconds before the saved state expires, empty means the service default",
+            required=False,
+            accepted_types=["number"],
+            default=None
+        )
+    ]
+    outputs: list[OutputFieldDeclaration] = [
+        OutputFieldDeclaration(
+            name="storage_state",
+            description="Summary of the saved state: {profile, saved_at, expires_at, cookies, origins}",
+            type="object"
+        )
+    ]
+
+    async def execute(self, io: IOPipe):
+        profile = io.inputs.get("profile")
+        if not profile:
+            raise ValueError("Input 'profile' is required.")
+        if not io.browser:
+            raise ValueError("Browser instance is required in context.")
+        store = getattr(io.executor, "storage_states", None)
+        if store is None:
+            raise ValueError("Storage state store is not available in this executor.")
+        state = await io.browser.storage_state()
+        io.outputs["storage_state"] = store.save(profile, state, io.inputs.get("ttl"))
+
 class OpenPage(ActionBase):
     """Action to open a web page given a URL."""
     name: str = "OpenPage"
@@ -114,6 +366,34 @@ class OpenPage(ActionBase):
             description="The URL of the web page to open",
             required=True,
             accepted_types=["string"]
+        ),
+        InputFieldDeclaration(
+            name="wait_until",
+            description="When navigation is considered finished: commit, domcontentloaded, load or networkidle",
+            required=False,
+            accepted_types=["string"],
+            default="load"
+        ),
+        InputFieldDeclaration(
+            name="timeout",
+            description="Navigation timeout in milliseconds, 0 disables the timeout",
+            required=False,
+            accepted_types=["number"],
+            default=30000
+        ),
+        InputFieldDeclaration(
+            name="reuse_current",
+            description="Navigate the current page instead of opening a new tab",
+            required=False,
+            accepted_types=["boolean"],
+            default=False
+        ),
+        InputFieldDeclaration(
+            name="max_pages",
+            description="Close the oldest pages this flow opened (tracked in $global{{pages}}) when more than this many are open, 0 means no limit; pages used by concurrent ForkJoin/ForEach branches are never closed",
+            required=False,
+            accepted_types=["integer"],
+            default=0
         )
     ]
     outputs: list[OutputFieldDeclaration] = [
@@ -121,9 +401,31 @@ class OpenPage(ActionBase):
             name="page",
             description="The opened web page object",
             type="WebPage"
+        ),
+        OutputFieldDeclaration(
+            name="blocked_requests",
+            description="Requests blocked while loading the page: {blocked, by_type}; null when OpenBrowser has no blocking profile",
+            type="object"
+        ),
+        OutputFieldDeclaration(
+            name="load_ms",
+            description="Milliseconds spent in page.goto",
+            type="number"
+        ),
+        OutputFieldDeclaration(
+            name="reused",
+            description="Whether the current page was navigated instead of opening a new tab",
+            type="boolean"
+        ),
+        OutputFieldDeclaration(
+            name="closed_pages",
+            description="Number of old pages closed because of max_pages",
+            type="integer"
         )
     ]
 
+    WAIT_UNTIL_VALUES = ("commit", "domcontentloaded", "load", "networkidle")
+
     async def execute(self, io: IOPipe):
         inputs = io.inputs
         url = inputs.get("url")
@@ -133,9 +435,22 @@ class OpenPage(ActionBase):
             raise ValueError("Browser instance is required in context.")
         if not isinstance(io.browser, pw.BrowserContext):
             raise ValueError("Browser in context is not a valid BrowserContext object.")
-        
-        page = await io.browser.new_page()
-        await page.goto(url)
+        wait_until = inputs.get("wait_until") or "load"
+        if wait_until not in self.WAIT_UNTIL_VALUES:
+            raise ValueError(f"Input 'wait_until' must be one of {', '.join(self.WAIT_UNTIL_VALUES)}, got '{wait_until}'.")
+        timeout = inputs.get("timeout", 30000)
+        if not isinstance(timeout, (int, float)) or timeout < 0:
+            raise ValueError("Input 'timeout' must be a non-negative number of milliseconds.")
+
+        current = io.page
+        reused = bool(inputs.get("reuse_current")) and current is not None and not current.is_closed()
+        page = current if reused else await io.browser.new_page()
+        started = time.perf_counter()
+        await page.goto(url, wait_until=wait_until, timeout=timeout)
+        load_ms = round((time.perf_counter() - started) * 1000, 1)
+        executor = io.executor
+        tracked = executor.runtime.get_value("$global{{pages}}") if executor is not None else None
+        closed_pages = await self._close_extra_pages(tracked or [], page, inputs.get("max_pages") or 0)
         
         output = io.outputs
         if not output.get("pages"):
@@ -144,9 +459,32 @@ class OpenPage(ActionBase):
             raise ValueError("Output 'pages' must be a list.")
         
         io.outputs['page'] = page
+        io.outputs['blocked_requests'] = page_block_stats(page)
+        io.outputs['load_ms'] = load_ms
+        io.outputs['reused'] = reused
+        io.outputs['closed_pages'] = closed_pages
         # 特殊变量会被额外处理
         io.outputs['__page__'] = page
 
+    @staticmethod
+    async def _close_extra_pages(tracked: list, keep, max_pages: int) -> int:
+        """按打开顺序关闭本流程打开的最早页面，使其数量不超过 max_pages；当前页面始终保留。
+
+        只处理 $global{{pages}} 中登记的页面，同一 context 中并发分支使用的页面不在其中，不会被关闭。
+        """
+        if max_pages <= 0:
+            return 0
+        pages = [item for item in tracked if item is not keep and not item.is_closed()]
+        extra = len(pages) + 1 - max_pages
+        closed = 0
+        for item in pages[:max(0, extra)]:
+            try:
+                await item.close()
+                closed += 1
+            except Exception:
+                pass
+        return closed
+
 class ClickItem(ActionBase):
     """Action to click an item on the web page given a locator."""
     name: str = "ClickItem"
@@ -160,7 +498,7 @@ class ClickItem(ActionBase):
         ),
         InputFieldDeclaration(
             name="locators",
-            description="候选 locator 列表（LocatorDefine 数组），按顺序逐一尝试，任一成功即停止。与 locator 字段互补，适合动态页面。",
+            description="候选 locator 列表（LocatorDefine 数组），与 locator 一起并发等待可见，最先可见的候选被点击，同时可见时取下标小者（locators 在前，locator 在后）；胜出者点击失败时改点下一个可见的候选。与 locator 字段互补，适合动态页面。",
             required=False,
             accepted_types=["LocatorDefine[]"]
         ),
@@ -193,7 +531,13 @@ class ClickItem(ActionBase):
             default=False
         )
     ]
-    outputs: list[OutputFieldDeclaration] = []
+    outputs: list[OutputFieldDeclaration] = [
+        OutputFieldDeclaration(
+            name="matched_index",
+            description="Index of the clicked candidate (locators first, then locator); null when nothing was clicked with no_error",
+            type="integer"
+        )
+    ]
 
     async def execute(self, io: IOPipe):
         inputs = io.inputs
@@ -224,30 +568,70 @@ class ClickItem(ActionBase):
         if inputs.get("locator") is not None:
             raw_locators.append(inputs["locator"])
 
-        if len(raw_locators) == 1:
-            # 单候选直接执行，保持原有行为
-            element = utils.get_locator(scope, LocatorDefine.deserialize(raw_locators[0]))
-            if no_error:
-                try:
-                    await element.click(timeout=timeout, force=force)
-                except pw.TimeoutError:
-                    pass
+        elements = [utils.get_locator(scope, LocatorDefine.deserialize(raw)) for raw in raw_locators]
+        io.outputs["matched_index"] = None
+        try:
+            if len(elements) == 1:
+                # 单候选直接执行，保持原有行为
+                await elements[0].click(timeout=timeout, force=force)
+                index = 0
             else:
-                await element.click(timeout=timeout, force=force)
-        else:
-            # 多候选：逐一尝试，全部失败时按 no_error 决定是否抛出
-            per_timeout = max(1000, timeout // len(raw_locators))
-            last_error: Exception | None = None
-            for raw in raw_locators:
-                element = utils.get_locator(scope, LocatorDefine.deserialize(raw))
+                # 多候选：并发等待全部候选，按可见先后依次点击，成功后其余等待被取消
+                index = await self._click_first_visible(elements, timeout, force)
+            io.outputs["matched_index"] = index
+        except pw.TimeoutError:
+            if not no_error:
+                raise
+
+    @staticmethod
+    async def _click_first_visible(elements: list, timeout: float, force: bool) -> int:
+        """按可见先后点击候选并返回点击成功的下标；同时可见时取下标最小者。
+
+        胜出者点击失败（被遮挡、已脱离 DOM 等）时改点下一个已可见或随后变为可见的候选，
+        点击使用剩余的超时预算，全部失败时抛出最后一个错误。
+        """
+        started = time.perf_counter()
+        waiters = {
+            asyncio.ensure_future(element.wait_for(state="visible", timeout=timeout)): index
+            for index, element in enumerate(elements)
+        }
+        pending = set(waiters)
+        visible: list[int] = []
+        last_error: BaseException | None = None
+
+        def harvest(done) -> None:
+            nonlocal last_error
+            for task in sorted(done, key=waiters.__getitem__):
+                if task.exception() is None:
+                    visible.append(waiters[task])
+                else:
+                    last_error = task.exception()
+
+        try:
+            while pending or visible:
+                # 点击期间变为可见的候选按下标排在已有候选之后
+                done = {task for task in pending if task.done()}
+                pending -= done
+                harvest(done)
+                if not visible:
+                    if not pending:
+                        break
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    harvest(done)
+                    continue
+                index = visible.pop(0)
+                click_timeout = max(1, timeout - (time.perf_counter() - started) * 1000)
                 try:
-                    await element.click(timeout=per_timeout, force=force)
-                    last_error = None
-                    break
-                except pw.TimeoutError as exc:
+                    await elements[index].click(timeout=click_timeout, force=force)
+                    return index
+                except Exception as exc:
                     last_error = exc
-            if last_error is not None and not no_error:
-                raise last_error
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
 
 class FillInput(ActionBase):
     """Action to fill an input field on the web page given a locator."""
@@ -353,6 +737,7 @@ class SleepFor(ActionBase):
     """Action to pause execution for a specified duration."""
     name: str = "SleepFor"
     description: str = "Pause execution for a specified duration in seconds"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         InputFieldDeclaration(
             name="duration",
@@ -379,6 +764,7 @@ class EmptyAction(ActionBase):
     """A no-op action that does nothing."""
     name: str = "EmptyAction"
     description: str = "An action that does nothing"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         InputFieldDeclaration(
             name="message",
@@ -393,7 +779,7 @@ class EmptyAction(ActionBase):
     async def execute(self, io: IOPipe):
         message = io.inputs.get("message", "")
         if message:
-            io.logger.info(f"   EmptyAction: {message}")
+            io.logger.info("   EmptyAction: %s", message)
 
 class ExtractData(ActionBase):
     """Action to get data from the web page using a locator."""
@@ -473,9 +859,253 @@ class ExtractData(ActionBase):
         else:
             raise ValueError(f"Unsupported data source type: {data_source}")
 
-        io.logger.debug(f"   Extracted data: {data}")
+        io.logger.debug("   Extracted data: %.2000s", data)
         io.outputs["data"] = data
 
+# ExtractList / ExtractTable 在页面内一次 evaluate 完成全部提取，避免逐元素往返
+_BULK_EXTRACT_HELPERS_JS = """
+const pick = (root, selector) => {
+    if (!selector) return [root];
+    if (selector.startsWith("xpath=")) {
+        const result = document.evaluate(selector.slice(6), root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const nodes = [];
+        for (let i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+        return nodes;
+    }
+    return Array.from(root.querySelectorAll(selector));
+};
+const read = (el, source) => {
+    if (source === "text") return (el.innerText ?? el.textContent ?? "").trim();
+    if (source === "html") return el.innerHTML;
+    if (source === "value") return el.value ?? null;
+    return el.getAttribute(source.slice(5));
+};
+"""
+
+_EXTRACT_LIST_JS = "(rows, [fields, limit]) => {" + _BULK_EXTRACT_HELPERS_JS + """
+    const selected = limit > 0 ? rows.slice(0, limit) : rows;
+    return selected.map((row) => {
+        const record = {};
+        for (const field of fields) {
+            const nodes = pick(row, field.selector);
+            record[field.name] = field.all
+                ? nodes.map((node) => read(node, field.source))
+                : (nodes.length ? read(nodes[0], field.source) : null);
+        }
+        return record;
+    });
+}"""
+
+_EXTRACT_TABLE_JS = "(table, [columns, source, headerRow, limit]) => {" + _BULK_EXTRACT_HELPERS_JS + """
+    const rows = Array.from(table.rows || []);
+    let headers = [];
+    let body = rows;
+    if (headerRow && rows.length) {
+        const headRow = (table.tHead && table.tHead.rows[0]) || rows[0];
+        headers = Array.from(headRow.cells).map((cell) => (cell.innerText ?? cell.textContent ?? "").trim());
+        body = rows.filter((row) => row !== headRow && !(table.tHead && table.tHead.contains(row)));
+    }
+    if (columns.length) headers = columns;
+    if (limit > 0) body = body.slice(0, limit);
+    const records = body.map((row) => {
+        const record = {};
+        Array.from(row.cells).forEach((cell, index) => {
+            record[headers[index] || `column_${index}`] = read(cell, source);
+        });
+        return record;
+    });
+    return {columns: headers, rows: records};
+}"""
+
+
+def _validate_data_source(source: str) -> str:
+    if source in ("text", "html", "value") or (isinstance(source, str) and source.startswith("attr:") and len(source) > 5):
+        return source
+    raise ValueError(f"Unsupported data source type: {source}")
+
+
+def _normalize_fields(fields) -> list[dict]:
+    """fields: {name: selector} 或 {name: {selector, source, all}}；selector 为空表示行元素本身"""
+    if not isinstance(fields, dict) or not fields:
+        raise ValueError("Input 'fields' must be a non-empty object of field name to selector.")
+    normalized = []
+    for name, spec in fields.items():
+        if spec is None or isinstance(spec, str):
+            spec = {"selector": spec or ""}
+        if not isinstance(spec, dict):
+            raise ValueError(f"Field '{name}' must be a selector string or an object.")
+        normalized.append({
+            "name": str(name),
+            "selector": spec.get("selector") or "",
+            "source": _validate_data_source(spec.get("source") or "text"),
+            "all": bool(spec.get("all", False)),
+        })
+    return normalized
+
+
+def _require_page(io: IOPipe):
+    page = io.page
+    if not page:
+        raise ValueError("Current page is required in context.")
+    if not isinstance(page, pw.Page):
+        raise ValueError("Current page in context is not a valid Page object.")
+    return page
+
+
+class ExtractList(ActionBase):
+    """Action to extract a list of records from repeated elements in a single page round-trip."""
+    name: str = "ExtractList"
+    description: str = "Extract records from all elements matching a row locator, reading fields by CSS/XPath sub-selectors in one evaluate call"
+    inputs: list[InputFieldDeclaration] = [
+        InputFieldDeclaration(
+            name="row_locator",
+            description="The locator of the repeated row elements; all matches are used",
+            required=True,
+            accepted_types=["LocatorDefine"]
+        ),
+        InputFieldDeclaration(
+            name="fields",
+            description="Map of field name to a CSS selector (or 'xpath=...') relative to the row, or {selector, source, all}; source is text, html, value or attr:<name>",
+            required=True,
+            accepted_types=["object"]
+        ),
+        InputFieldDeclaration(
+            name="limit",
+            description="Maximum number of rows to extract, 0 means all",
+            required=False,
+            accepted_types=["integer"],
+            default=0
+        ),
+        InputFieldDeclaration(
+            name="timeout",
+            description="Maximum time to wait for the first row (in milliseconds); when no row appears the result is an empty list",
+            required=False,
+            accepted_types=["integer"],
+            default=5000
+        )
+    ]
+    outputs: list[OutputFieldDeclaration] = [
+        OutputFieldDeclaration(
+            name="items",
+            description="The extracted records, one object per row",
+            type="list"
+        ),
+        OutputFieldDeclaration(
+            name="count",
+            description="Number of extracted records",
+            type="integer"
+        )
+    ]
+
+    async def execute(self, io: IOPipe):
+        inputs = io.inputs
+        if not inputs.get("row_locator"):
+            raise ValueError("Input 'row_locator' is required.")
+        fields = _normalize_fields(inputs.get("fields"))
+        limit = inputs.get("limit") or 0
+        timeout = inputs.get("timeout", 5000)
+        if not isinstance(timeout, (int, float)):
+            timeout = 5000
+        page = _require_page(io)
+
+        row_locator = LocatorDefine.deserialize(inputs["row_locator"]).with_pos("all", innermost=True)
+        rows = utils.get_locator(page, row_locator)
+        # 只等待第一行出现，之后的全部读取在页面内一次完成；超时内没有任何行视为空列表
+        try:
+            await rows.first.wait_for(state="attached", timeout=timeout)
+        except pw.TimeoutError:
+            items = []
+        else:
+            items = await rows.evaluate_all(_EXTRACT_LIST_JS, [fields, int(limit)])
+
+        io.logger.debug("   Extracted %d records", len(items))
+        io.outputs["items"] = items
+        io.outputs["count"] = len(items)
+
+class ExtractTable(ActionBase):
+    """Action to extract an HTML table into a list of records in a single page round-trip."""
+    name: str = "ExtractTable"
+    description: str = "Extract rows of an HTML table as records keyed by header text in one evaluate call"
+    inputs: list[InputFieldDeclaration] = [
+        InputFieldDeclaration(
+            name="locator",
+            description="The locator of the <table> element",
+            required=True,
+            accepted_types=["LocatorDefine"]
+        ),
+        InputFieldDeclaration(
+            name="columns",
+            description="Column names overriding the header cells, empty means use the header row",
+            required=False,
+            accepted_types=["list"],
+            default=[]
+        ),
+        InputFieldDeclaration(
+            name="header_row",
+            description="Whether the table has a header row (thead or the first row)",
+            required=False,
+            accepted_types=["boolean"],
+            default=True
+        ),
+        InputFieldDeclaration(
+            name="data_source",
+            description="What to read from each cell: text, html or attr:<name>",
+            required=False,
+            accepted_types=["string"],
+            default="text"
+        ),
+        InputFieldDeclaration(
+            name="limit",
+            description="Maximum number of body rows to extract, 0 means all",
+            required=False,
+            accepted_types=["integer"],
+            default=0
+        ),
+        InputFieldDeclaration(
+            name="timeout",
+            description="Maximum time to wait for the table (in milliseconds)",
+            required=False,
+            accepted_types=["integer"],
+            default=5000
+        )
+    ]
+    outputs: list[OutputFieldDeclaration] = [
+        OutputFieldDeclaration(
+            name="rows",
+            description="The table body rows as records keyed by column name",
+            type="list"
+        ),
+        OutputFieldDeclaration(
+            name="columns",
+            description="The column names used as record keys",
+            type="list"
+        )
+    ]
+
+    async def execute(self, io: IOPipe):
+        inputs = io.inputs
+        if not inputs.get("locator"):
+            raise ValueError("Input 'locator' is required.")
+        columns = inputs.get("columns") or []
+        if not isinstance(columns, list):
+            raise ValueError("Input 'columns' must be a list.")
+        source = _validate_data_source(inputs.get("data_source") or "text")
+        timeout = inputs.get("timeout", 5000)
+        if not isinstance(timeout, (int, float)):
+            timeout = 5000
+        page = _require_page(io)
+
+        table = utils.get_locator(page, LocatorDefine.deserialize(inputs["locator"]))
+        await table.wait_for(state="attached", timeout=timeout)
+        result = await table.evaluate(
+            _EXTRACT_TABLE_JS,
+            [[str(item) for item in columns], source, bool(inputs.get("header_row", True)), int(inputs.get("limit") or 0)],
+        )
+
+        io.logger.debug("   Extracted %d table rows", len(result["rows"]))
+        io.outputs["rows"] = result["rows"]
+        io.outputs["columns"] = result["columns"]
+
 class GetElement(ActionBase):
     """Action to get a web element using a locator."""
     name: str = "GetElement"
@@ -631,6 +1261,7 @@ class SetData(ActionBase):
     """Action to set runtime data by variable key."""
     name: str = "SetData"
     description: str = "Set runtime data into env/global/flow/prev_outputs/cur_outputs by key"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         InputFieldDeclaration(
             name="key",
@@ -661,19 +1292,14 @@ class SetData(ActionBase):
 
     @staticmethod
     def _is_var_key(key: str) -> bool:
-        if not isinstance(key, str):
-            return False
-        if not key.startswith("$"):
-            return False
-        if "{" not in key or "}" not in key:
-            return False
-        return True
+        return VarRef.parse(key) is not None
 
     async def execute(self, io: IOPipe):
         key = io.inputs.get("key")
         if not key:
             raise ValueError("Input 'key' is required.")
-        if not self._is_var_key(key):
+        ref = VarRef.parse(key)
+        if ref is None:
             raise ValueError(f"Input 'key' must be a variable reference like $flow{{name}}: {key}")
 
         executor = io.executor
@@ -681,7 +1307,10 @@ class SetData(ActionBase):
             raise ValueError("Executor runtime with 'set_value' is required for SetData action.")
 
         value = io.inputs.get("value", None)
-        executor.runtime.set_value(key, value)
+        if hasattr(executor.runtime, "set_ref"):
+            executor.runtime.set_ref(ref, value)
+        else:
+            executor.runtime.set_value(key, value)
 
         io.outputs["key"] = key
         io.outputs["value"] = value
@@ -690,6 +1319,7 @@ class WriteTextFile(ActionBase):
     """Action to write text content to a file."""
     name: str = "WriteTextFile"
     description: str = "Write text content to a file on disk"
+    touches_page: bool = False
     inputs: list[InputFieldDeclaration] = [
         InputFieldDeclaration(
             name="path",
@@ -758,6 +1388,8 @@ class FetchUrl(ActionBase):
     """Action to fetch text content from an HTTP URL."""
     name: str = "FetchUrl"
     description: str = "Fetch text content from a URL"
+    touches_page: bool = False
+    cacheable: bool = True
     inputs: list[InputFieldDeclaration] = [
         InputFieldDeclaration(
             name="url",
@@ -821,4 +1453,186 @@ class FetchUrl(ActionBase):
             response_encoding = encoding or response.headers.get_content_charset() or "utf-8"
             io.outputs["content"] = raw_content.decode(response_encoding, errors="ignore")
             io.outputs["final_url"] = response.geturl()
-            io.outputs["status_code"] = getattr(response, "status", 200)
\ No newline at end of file
+            io.outputs["status_code"] = getattr(response, "status", 200)
+
+    def should_cache(self, outputs: dict) -> bool:
+        return int(outputs.get("status_code") or 0) < 400
+
+class CaptureResponses(ActionBase):
+    """Action to start capturing network responses whose URL and content type match."""
+    name: str = "CaptureResponses"
+    description: str = "Listen for responses matching URL patterns and content types and buffer their bodies for CollectResponses"
+    inputs: list[InputFieldDeclaration] = [
+        InputFieldDeclaration(
+            name="url_pattern",
+            description="Glob pattern(s) matched against the response URL, comma separated string or list; empty matches all URLs",
+            required=False,
+            accepted_types=["string", "list"],
+            default=""
+        ),
+        InputFieldDeclaration(
+            name="content_types",
+            description="Media type glob(s) to capture, '*' captures everything; defaults to JSON responses",
+            required=False,
+            accepted_types=["string", "list"],
+            default=""
+        ),
+        InputFieldDeclaration(
+            name="name",
+            description="Capture name used by CollectResponses; starting a capture with an existing name replaces it",
+            required=False,
+            accepted_types=["string"],
+            default="default"
+        ),
+        InputFieldDeclaration(
+            name="scope",
+            description="'context' captures all pages of the browser context including pages opened later, 'page' only the current page",
+            required=False,
+            accepted_types=["string"],
+            default="context"
+        ),
+        InputFieldDeclaration(
+            name="max_items",
+            description="Maximum number of buffered responses; the oldest are dropped when full",
+            required=False,
+            accepted_types=["integer"],
+            default=100
+        ),
+        InputFieldDeclaration(
+            name="max_body_bytes",
+            description="Responses larger than this are recorded without body, 0 means no limit",
+            required=False,
+            accepted_types=["integer"],
+            default=1000000
+        )
+    ]
+    outputs: list[OutputFieldDeclaration] = [
+        OutputFieldDeclaration(
+            name="capture",
+            description="The capture settings: {name, url_patterns, content_types, max_items, max_body_bytes}",
+            type="object"
+        )
+    ]
+
+    async def execute(self, io: IOPipe):
+        inputs = io.inputs
+        scope = inputs.get("scope") or "context"
+        if scope == "context":
+            context = io.browser
+            if not context:
+                raise ValueError("Browser instance is required in context.")
+            target = context
+        elif scope == "page":
+            target = _require_page(io)
+            context = target.context
+        else:
+            raise ValueError(f"Input 'scope' must be 'context' or 'page', got '{scope}'.")
+
+        capture = ResponseCapture.from_inputs(
+            name=inputs.get("name"),
+            url_patterns=inputs.get("url_pattern"),
+            content_types=inputs.get("content_types"),
+            max_items=inputs.get("max_items"),
+            max_body_bytes=inputs.get("max_body_bytes"),
+        )
+        capture.attach(target, context)
+        io.logger.debug("   Capturing responses on %s: %s", scope, capture.url_patterns or "all URLs")
+        io.outputs["capture"] = capture.describe()
+
+class CollectResponses(ActionBase):
+    """Action to read the responses buffered by CaptureResponses."""
+    name: str = "CollectResponses"
+    description: str = "Return the responses buffered by a CaptureResponses capture, optionally waiting for a minimum count"
+    inputs: list[InputFieldDeclaration] = [
+        InputFieldDeclaration(
+            name="name",
+            description="Capture name given to CaptureResponses",
+            required=False,
+            accepted_types=["string"],
+            default="default"
+        ),
+        InputFieldDeclaration(
+            name="min_count",
+            description="Wait until at least this many responses are buffered",
+            required=False,
+            accepted_types=["integer"],
+            default=0
+        ),
+        InputFieldDeclaration(
+            name="timeout",
+            description="Maximum time to wait for min_count responses (in milliseconds)",
+            required=False,
+            accepted_types=["integer"],
+            default=5000
+        ),
+        InputFieldDeclaration(
+            name="clear",
+            description="Remove the returned responses from the buffer",
+            required=False,
+            accepted_types=["boolean"],
+            default=True
+        ),
+        InputFieldDeclaration(
+            name="stop",
+            description="Stop the capture after collecting",
+            required=False,
+            accepted_types=["boolean"],
+            default=False
+        )
+    ]
+    outputs: list[OutputFieldDeclaration] = [
+        OutputFieldDeclaration(
+            name="responses",
+            description="Captured responses: {url, status, content_type, method, size, json or text}; truncated, skipped or error is set when the body was not kept",
+            type="list"
+        ),
+        OutputFieldDeclaration(
+            name="count",
+            description="Number of returned responses",
+            type="integer"
+        ),
+        OutputFieldDeclaration(
+            name="dropped",
+            description="Responses dropped so far because the buffer was full",
+            type="integer"
+        ),
+        OutputFieldDeclaration(
+            name="skipped",
+            description="Responses whose body was not read because too many reads were pending",
+            type="integer"
+        ),
+        OutputFieldDeclaration(
+            name="pending",
+            description="Matched responses whose body was still being read when the timeout expired; they are not returned",
+            type="integer"
+        ),
+        OutputFieldDeclaration(
+            name="timed_out",
+            description="Whether min_count was not reached within the timeout",
+            type="boolean"
+        )
+    ]
+
+    async def execute(self, io: IOPipe):
+        inputs = io.inputs
+        name = inputs.get("name") or "default"
+        context = io.browser
+        capture = capture_for(context, name)
+        if capture is None:
+            raise ValueError(f"No response capture named '{name}', run CaptureResponses first.")
+        timeout = inputs.get("timeout", 5000)
+        if not isinstance(timeout, (int, float)):
+            timeout = 5000
+
+        reached = await capture.wait_for(int(inputs.get("min_count") or 0), timeout / 1000)
+        responses = capture.collect(clear=inputs.get("clear", True) is not False)
+        if inputs.get("stop"):
+            remove_capture(context, name)
+
+        io.logger.debug("   Collected %d responses from capture '%s'", len(responses), name)
+        io.outputs["responses"] = responses
+        io.outputs["count"] = len(responses)
+        io.outputs["dropped"] = capture.dropped
+        io.outputs["skipped"] = capture.skipped
+        io.outputs["pending"] = capture.pending_reads
+        io.outputs["timed_out"] = not reached
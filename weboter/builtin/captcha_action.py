@@ -158,10 +158,10 @@ class SimpleSlideCaptcha(ActionBase):
         if "image" not in inputs or "slider" not in inputs or "bar" not in inputs or "retry" not in inputs:
             raise ValueError("Missing required input locators: 'image', 'slider', 'bar', or 'retry'.")
         
-        image_locator = LocatorDefine.from_dict(inputs["image"])
-        slider_locator = LocatorDefine.from_dict(inputs["slider"])
-        bar_locator = LocatorDefine.from_dict(inputs["bar"])
-        retry_locator = LocatorDefine.from_dict(inputs["retry"])
+        image_locator = LocatorDefine.deserialize(inputs["image"])
+        slider_locator = LocatorDefine.deserialize(inputs["slider"])
+        bar_locator = LocatorDefine.deserialize(inputs["bar"])
+        retry_locator = LocatorDefine.deserialize(inputs["retry"])
 
         fix_k = inputs.get("fix_k", 1.0)
         fix_b = inputs.get("fix_b", 0.0)
@@ -317,11 +317,11 @@ class SimpleSlideNCC(ActionBase):
         if "whole_image" not in inputs or "piece_image" not in inputs or "slider" not in inputs or "bar" not in inputs or "retry" not in inputs:
             raise ValueError("Missing required input locators: 'whole_image', 'piece_image', 'slider', 'bar', or 'retry'.")
         
-        whole_image_locator = LocatorDefine.from_dict(inputs["whole_image"])
-        piece_image_locator = LocatorDefine.from_dict(inputs["piece_image"])
-        slider_locator = LocatorDefine.from_dict(inputs["slider"])
-        bar_locator = LocatorDefine.from_dict(inputs["bar"])
-        retry_locator = LocatorDefine.from_dict(inputs["retry"])
+        whole_image_locator = LocatorDefine.deserialize(inputs["whole_image"])
+        piece_image_locator = LocatorDefine.deserialize(inputs["piece_image"])
+        slider_locator = LocatorDefine.deserialize(inputs["slider"])
+        bar_locator = LocatorDefine.deserialize(inputs["bar"])
+        retry_locator = LocatorDefine.deserialize(inputs["retry"])
 
         fix_k = inputs.get("fix_k", 1.0)
         fix_b = inputs.get("fix_b", 0.0)
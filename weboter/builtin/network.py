@@ -0,0 +1,382 @@
+import asyncio
+from collections import deque
+import fnmatch
+import json
+import time
+from typing import Any, Iterable
+from urllib.parse import urlsplit
+import weakref
+
+
+# Playwright request.resource_type 的取值
+RESOURCE_TYPES = (
+    "document", "stylesheet", "image", "media", "font", "script", "texttrack",
+    "xhr", "fetch", "eventsource", "websocket", "manifest", "other",
+)
+
+BLOCK_PROFILES: dict[str, dict[str, Any]] = {
+    # 只需要 DOM 文本：不下载图片、媒体、字体和样式表
+    "text-only": {"resource_types": ("image", "media", "font", "stylesheet")},
+    "no-media": {"resource_types": ("image", "media", "font")},
+    # 拦截与页面不同站点的子资源（统计、广告、第三方 CDN 等）
+    "no-third-party": {"third_party": True},
+}
+
+# context -> RequestBlocker，OpenPage 与调试会话据此读取页面拦截统计
+_BLOCKERS: "weakref.WeakKeyDictionary[Any, RequestBlocker]" = weakref.WeakKeyDictionary()
+
+
+def _split_names(value: Any) -> list[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    raise ValueError(f"Expected a string or list, got {type(value).__name__}")
+
+
+def _site(url: str | None) -> str | None:
+    """粗略的站点归属：取主机名最后两段，不处理公共后缀表"""
+    if not url:
+        return None
+    host = urlsplit(url).hostname
+    if not host:
+        return None
+    labels = host.split(".")
+    return ".".join(labels[-2:]) if len(labels) > 2 else host
+
+
+def _request_page(request):
+    # service worker 发起的请求没有 frame，访问时会抛异常
+    try:
+        return request.frame.page
+    except Exception:
+        return None
+
+
+class RequestBlocker:
+    """通过 context.route 拦截匹配的子资源请求，并按页面统计拦截数量；页面导航请求永远放行"""
+
+    def __init__(
+        self,
+        resource_types: Iterable[str] = (),
+        url_patterns: Iterable[str] = (),
+        third_party: bool = False,
+        profiles: Iterable[str] = (),
+    ):
+        self.resource_types = frozenset(resource_types)
+        unknown = sorted(self.resource_types - set(RESOURCE_TYPES))
+        if unknown:
+            raise ValueError(f"Unknown resource type: {', '.join(unknown)}")
+        self.url_patterns = tuple(url_patterns)
+        self.third_party = bool(third_party)
+        self.profiles = tuple(profiles)
+        self._page_stats: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.total_blocked = 0
+
+    @classmethod
+    def from_inputs(cls, profiles: Any = None, resource_types: Any = None, url_patterns: Any = None) -> "RequestBlocker | None":
+        """由 profile 名称与自定义规则组合出拦截器；没有任何规则时返回 None"""
+        profile_names = _split_names(profiles)
+        types = set(_split_names(resource_types))
+        patterns = _split_names(url_patterns)
+        third_party = False
+        for name in profile_names:
+            profile = BLOCK_PROFILES.get(name)
+            if profile is None:
+                raise ValueError(f"Unknown block profile: {name}. Available: {', '.join(BLOCK_PROFILES)}")
+            types.update(profile.get("resource_types", ()))
+            third_party = third_party or profile.get("third_party", False)
+        if not types and not patterns and not third_party:
+            return None
+        return cls(types, patterns, third_party, profile_names)
+
+    def match(self, url: str, resource_type: str, page_url: str | None = None) -> str | None:
+        """返回拦截原因（resource_type / url_pattern / third_party），不拦截时返回 None"""
+        if resource_type in self.resource_types:
+            return "resource_type"
+        if any(fnmatch.fnmatchcase(url, pattern) for pattern in self.url_patterns):
+            return "url_pattern"
+        if self.third_party:
+            page_site = _site(page_url)
+            if page_site is not None and _site(url) not in (None, page_site):
+                return "third_party"
+        return None
+
+    async def install(self, context) -> None:
+        await context.route("**/*", self._handle)
+        _BLOCKERS[context] = self
+
+    async def _handle(self, route) -> None:
+        request = route.request
+        if request.is_navigation_request():
+            await route.fallback()
+            return
+        page = _request_page(request)
+        reason = self.match(request.url, request.resource_type, getattr(page, "url", None))
+        if reason is None:
+            # fallback 而不是 continue_，让后注册的其他 route 处理器仍有机会处理该请求
+            await route.fallback()
+            return
+        self._record(page, request.resource_type)
+        await route.abort("blockedbyclient")
+
+    def _record(self, page, resource_type: str) -> None:
+        self.total_blocked += 1
+        if page is None:
+            return
+        stats = self._page_stats.get(page)
+        if stats is None:
+            stats = self._page_stats[page] = {"blocked": 0, "by_type": {}}
+        stats["blocked"] += 1
+        stats["by_type"][resource_type] = stats["by_type"].get(resource_type, 0) + 1
+
+    def page_stats(self, page) -> dict[str, Any]:
+        stats = self._page_stats.get(page) or {"blocked": 0, "by_type": {}}
+        return {"blocked": stats["blocked"], "by_type": dict(stats["by_type"])}
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "profiles": list(self.profiles),
+            "resource_types": sorted(self.resource_types),
+            "url_patterns": list(self.url_patterns),
+            "third_party": self.third_party,
+        }
+
+
+def blocker_for(context) -> RequestBlocker | None:
+    if context is None:
+        return None
+    try:
+        return _BLOCKERS.get(context)
+    except TypeError:
+        return None
+
+
+def page_block_stats(page) -> dict[str, Any] | None:
+    """页面所属 context 安装了拦截器时返回该页面的拦截统计，否则返回 None"""
+    try:
+        context = page.context
+    except Exception:
+        return None
+    blocker = blocker_for(context)
+    return blocker.page_stats(page) if blocker is not None else None
+
+
+# 默认只捕获 JSON 响应（含 application/ld+json、application/problem+json 等）
+DEFAULT_CAPTURE_CONTENT_TYPES = ("application/json", "*+json", "text/json")
+
+# context -> {name: ResponseCapture}；page 范围的捕获同样登记在页面所属 context 下
+_CAPTURES: "weakref.WeakKeyDictionary[Any, dict[str, ResponseCapture]]" = weakref.WeakKeyDictionary()
+
+
+def _media_type(headers: dict[str, str] | None) -> str:
+    value = (headers or {}).get("content-type") or ""
+    return value.split(";", 1)[0].strip().lower()
+
+
+def _content_length(headers: dict[str, str] | None) -> int | None:
+    try:
+        return int((headers or {}).get("content-length"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ResponseCapture:
+    """监听 response 事件，把 URL 与 content-type 匹配的响应体写入有界缓冲区。
+
+    缓冲区满时丢弃最早的条目并计入 dropped；超过 max_body_bytes 的响应只记录元数据，
+    content-length 已声明超限时不读取响应体。
+    响应体在后台任务中读取，collect 前通过 drain 等待已匹配响应读取完成；
+    同时读取的任务不超过 max_pending_reads 个，超出时只记录元数据（skipped: true）并计入 skipped。
+    """
+
+    def __init__(
+        self,
+        name: str = "default",
+        url_patterns: Iterable[str] = (),
+        content_types: Iterable[str] = DEFAULT_CAPTURE_CONTENT_TYPES,
+        max_items: int = 100,
+        max_body_bytes: int = 1_000_000,
+        max_pending_reads: int = 32,
+    ):
+        self.name = name
+        self.url_patterns = tuple(url_patterns)
+        self.content_types = tuple(item.lower() for item in content_types)
+        self.max_items = max(1, int(max_items))
+        self.max_body_bytes = max(0, int(max_body_bytes))
+        self.max_pending_reads = max(1, int(max_pending_reads))
+        self.items: deque[dict[str, Any]] = deque(maxlen=self.max_items)
+        self.matched = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.target = None
+        self._pending: set[asyncio.Task] = set()
+        self._arrived = asyncio.Event()
+
+    @classmethod
+    def from_inputs(
+        cls,
+        name: Any = None,
+        url_patterns: Any = None,
+        content_types: Any = None,
+        max_items: Any = None,
+        max_body_bytes: Any = None,
+    ) -> "ResponseCapture":
+        types = _split_names(content_types)
+        return cls(
+            name=str(name or "default"),
+            url_patterns=_split_names(url_patterns),
+            content_types=types or DEFAULT_CAPTURE_CONTENT_TYPES,
+            max_items=100 if max_items is None else max_items,
+            max_body_bytes=1_000_000 if max_body_bytes is None else max_body_bytes,
+        )
+
+    def match(self, url: str, media_type: str) -> bool:
+        if self.url_patterns and not any(fnmatch.fnmatchcase(url, pattern) for pattern in self.url_patterns):
+            return False
+        if "*" in self.content_types:
+            return True
+        return any(fnmatch.fnmatchcase(media_type, pattern) for pattern in self.content_types)
+
+    def attach(self, target, context) -> None:
+        """在 page 或 context 上注册监听；同一 context 下同名的旧捕获先被移除"""
+        captures = _CAPTURES.setdefault(context, {})
+        previous = captures.get(self.name)
+        if previous is not None:
+            previous.detach()
+        target.on("response", self._on_response)
+        self.target = target
+        captures[self.name] = self
+
+    def detach(self) -> None:
+        if self.target is None:
+            return
+        try:
+            self.target.remove_listener("response", self._on_response)
+        except Exception:
+            pass
+        self.target = None
+
+    def _on_response(self, response) -> None:
+        # 同步回调里只做匹配判断，响应体读取放到任务中，不阻塞事件分发
+        media_type = _media_type(response.headers)
+        if not self.match(response.url, media_type):
+            return
+        self.matched += 1
+        entry: dict[str, Any] = {
+            "url": response.url,
+            "status": response.status,
+            "content_type": media_type,
+            "method": getattr(response.request, "method", None),
+            "captured_at": time.time(),
+        }
+        declared = _content_length(response.headers)
+        if self.max_body_bytes and declared is not None and declared > self.max_body_bytes:
+            entry["size"] = declared
+            entry["truncated"] = True
+            self._store(entry)
+            return
+        if len(self._pending) >= self.max_pending_reads:
+            # 突发的大量响应不再排队读取，避免任务无界增长
+            entry["skipped"] = True
+            self.skipped += 1
+            self._store(entry)
+            return
+        task = asyncio.ensure_future(self._read(response, media_type, entry))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _read(self, response, media_type: str, entry: dict[str, Any]) -> None:
+        try:
+            body = await response.body()
+        except Exception as exc:
+            # 重定向、页面关闭后等情况下响应体不可读
+            entry["error"] = str(exc)
+        else:
+            entry["size"] = len(body)
+            if self.max_body_bytes and len(body) > self.max_body_bytes:
+                entry["truncated"] = True
+            else:
+                text = body.decode("utf-8", errors="replace")
+                if "json" in media_type:
+                    try:
+                        entry["json"] = json.loads(text)
+                    except ValueError:
+                        entry["text"] = text
+                else:
+                    entry["text"] = text
+        self._store(entry)
+
+    def _store(self, entry: dict[str, Any]) -> None:
+        if len(self.items) == self.max_items:
+            self.dropped += 1
+        self.items.append(entry)
+        self._arrived.set()
+
+    @property
+    def pending_reads(self) -> int:
+        return len(self._pending)
+
+    async def drain(self, timeout: float | None = None) -> bool:
+        """等待已匹配响应的读取完成，最多 timeout 秒；未完成的读取留在后台继续，返回 False"""
+        if not self._pending:
+            return True
+        _, pending = await asyncio.wait(list(self._pending), timeout=timeout)
+        return not pending
+
+    async def wait_for(self, min_count: int, timeout: float) -> bool:
+        """等待缓冲区至少有 min_count 条响应，timeout 为秒；超时返回 False。
+
+        长轮询、流式等读取不完的响应不会拖过 timeout，仍在读取的数量见 pending_reads。
+        """
+        deadline = time.monotonic() + timeout
+        await self.drain(max(0.0, timeout))
+        while len(self.items) < min_count:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._arrived.clear()
+            # 读取完成的响应写入缓冲区时会设置 _arrived，这里不再等待其余读取
+            try:
+                await asyncio.wait_for(self._arrived.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    def collect(self, clear: bool = True) -> list[dict[str, Any]]:
+        items = list(self.items)
+        if clear:
+            self.items.clear()
+        return items
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "url_patterns": list(self.url_patterns),
+            "content_types": list(self.content_types),
+            "max_items": self.max_items,
+            "max_body_bytes": self.max_body_bytes,
+            "buffered": len(self.items),
+            "matched": self.matched,
+            "dropped": self.dropped,
+            "skipped": self.skipped,
+            "pending": self.pending_reads,
+        }
+
+
+def capture_for(context, name: str = "default") -> ResponseCapture | None:
+    if context is None:
+        return None
+    try:
+        return (_CAPTURES.get(context) or {}).get(name)
+    except TypeError:
+        return None
+
+
+def remove_capture(context, name: str) -> None:
+    captures = _CAPTURES.get(context) or {}
+    capture = captures.pop(name, None)
+    if capture is not None:
+        capture.detach()
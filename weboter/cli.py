@@ -11,6 +11,7 @@ import sys
 from weboter.app.client import ServiceClientError, WorkflowServiceClient
 from weboter.app.config import load_app_config
 from weboter.app.panel import PanelAuthManager
+from weboter.app.session_storage import collect_disk_usage
 
 
 DEFAULT_SERVICE_HOST = "127.0.0.1"
@@ -68,12 +69,13 @@ def build_parser() -> argparse.ArgumentParser:
               weboter service status --json
                             weboter service ps
               weboter service logs --lines 100
+              weboter service disk-usage
               weboter service stop
             """
         ),
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
-    service_parser.add_argument("action", choices=["start", "restart", "stop", "status", "logs", "ps", "refresh-plugins"])
+    service_parser.add_argument("action", choices=["start", "restart", "stop", "status", "logs", "ps", "disk-usage", "refresh-plugins"])
     service_parser.add_argument("--host", default=None, help=f"service 监听地址，默认读取配置文件（当前 {config.service.host}）")
     service_parser.add_argument("--port", type=int, default=None, help=f"service 监听端口，默认读取配置文件（当前 {config.service.port}）")
     service_parser.add_argument("--lines", type=int, default=200, help="查看日志时输出的最后行数")
@@ -143,6 +145,18 @@ def build_parser() -> argparse.ArgumentParser:
     workflow_parser.add_argument("--execute", action="store_true", help="解析后立即执行 workflow")
     workflow_parser.add_argument("--pause-before-start", action="store_true", help="提交执行时要求在第一个节点前停住")
     workflow_parser.add_argument("--breakpoints", help="提交执行时预设断点，支持 JSON 字符串或 @文件路径")
+    workflow_parser.add_argument(
+        "--hook-mode",
+        default="all",
+        help="调试钩子粒度：all（默认，每步快照）、page（仅会改变页面的节点）、errors（仅出错/断点/暂停）、every:N（每 N 步）",
+    )
+    workflow_parser.add_argument(
+        "--har",
+        dest="har_mode",
+        choices=["record", "replay"],
+        help="record 录制任务的全部网络请求到 HAR；replay 从 HAR 回放，不访问网络",
+    )
+    workflow_parser.add_argument("--har-path", help="HAR 文件路径；replay 时也可以是一个 record 任务的 task_id")
     workflow_parser.add_argument("--wait", action="store_true", help="提交执行任务后等待任务结束")
     workflow_parser.add_argument("--timeout", type=float, default=0, help="等待任务完成的超时时间，0 表示不限")
     workflow_parser.add_argument("--local", action="store_true", help="不经过后台 service，直接在当前进程执行")
@@ -161,15 +175,18 @@ def build_parser() -> argparse.ArgumentParser:
                             weboter task show 3d61013
               weboter task logs <task_id> --lines 100
               weboter task wait <task_id> --timeout 30
+              weboter task profile <task_id>
+              weboter task resume <task_id> --rewarm-flow open_browser
             """
         ),
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
-    task_parser.add_argument("action", choices=["list", "get", "show", "logs", "wait"])
+    task_parser.add_argument("action", choices=["list", "get", "show", "logs", "wait", "profile", "resume"])
     task_parser.add_argument("task_id", nargs="?", help="任务 ID")
     task_parser.add_argument("--limit", type=int, default=20, help="任务列表数量")
     task_parser.add_argument("--lines", type=int, default=200, help="查看日志时输出的最后行数")
     task_parser.add_argument("--timeout", type=float, default=0, help="等待任务完成的超时时间，0 表示不限")
+    task_parser.add_argument("--rewarm-flow", help="resume 时先运行的子流程 ID，用于重新打开浏览器等无法写入检查点的资源")
     task_parser.add_argument("--json", action="store_true", help="以 JSON 输出任务结果")
 
     session_parser = subparsers.add_parser(
@@ -182,6 +199,7 @@ def build_parser() -> argparse.ArgumentParser:
               weboter session list
               weboter session get <session_id>
               weboter session snapshots <session_id> --limit 10
+              weboter session snapshots <session_id> --phase error --node-id <node_id>
               weboter session snapshot-detail <session_id> --snapshot-index 3 --sections runtime,page
               weboter session workflow <session_id>
               weboter session workflow-node-detail <session_id> --node-id login
@@ -225,6 +243,8 @@ def build_parser() -> argparse.ArgumentParser:
     session_parser.add_argument("--limit", type=int, default=20, help="列表或快照摘要的返回数量")
     session_parser.add_argument("--snapshot-index", type=int, help="快照索引")
     session_parser.add_argument("--sections", help="逗号分隔的详情 section，例如 runtime,page")
+    session_parser.add_argument("--cursor", type=int, help="snapshots 翻页游标，取上一页返回的 next_cursor")
+    session_parser.add_argument("--phase", help="snapshots 按阶段过滤，例如 error、before_step")
     session_parser.add_argument("--reason", default="interrupt_next", help="interrupt 的原因")
     session_parser.add_argument("--key", help="上下文或 runtime key")
     session_parser.add_argument("--value", help="JSON 值，或无法解析 JSON 时按字符串处理")
@@ -303,6 +323,9 @@ def _print_result(result: dict, json_output: bool = False) -> None:
     if result.get("status") in {"stopped", "stop-requested", "killed"}:
         print(f"service {result['status']}: pid={result.get('pid')}")
         return
+    if "task_id" in result and "profile" in result and "live" in result:
+        _print_task_profile(result)
+        return
     if "task_id" in result and "status" in result:
         print(f"task {result['task_id']}: {result['status']} ({result.get('workflow_name')})")
         if result.get("error"):
@@ -391,6 +414,23 @@ def _print_result(result: dict, json_output: bool = False) -> None:
         print(item)
 
 
+def _print_task_profile(result: dict) -> None:
+    profile = result.get("profile")
+    state = "live" if result.get("live") else result.get("status")
+    if not profile:
+        print(f"task {result['task_id']}: no profile ({state})")
+        return
+    print(f"task {result['task_id']}: steps={profile.get('step_count')} ({state})")
+    phase_totals = profile.get("phase_totals_ms") or {}
+    print("phases: " + "  ".join(f"{phase}={value:.1f}ms" for phase, value in phase_totals.items()))
+    for item in (profile.get("nodes") or [])[:20]:
+        total = item.get("total") or {}
+        print(
+            f"{item['flow_id']}/{item['node_id']}  count={total.get('count')}  total={total.get('total_ms')}ms  "
+            f"avg={total.get('avg_ms')}ms  max={total.get('max_ms')}ms  action={item.get('action') or '-'}"
+        )
+
+
 def _tail_local_file(path: Path, lines: int) -> dict:
     if not path.is_file():
         return {"log_path": str(path), "content": ""}
@@ -525,6 +565,12 @@ def main() -> int:
                 except ServiceClientError:
                     _print_result(list_service_processes(workflow_service), args.json)
                 return 0
+            if args.action == "disk-usage":
+                try:
+                    _print_result(client.service_disk_usage(), args.json)
+                except ServiceClientError:
+                    _print_result(collect_disk_usage(workflow_service.data_root), args.json)
+                return 0
             if args.action == "refresh-plugins":
                 try:
                     _print_result(client.refresh_plugins(), args.json)
@@ -645,6 +691,17 @@ def main() -> int:
             if args.action == "wait":
                 _print_result(client.wait_for_task(args.task_id, args.timeout), args.json)
                 return 0
+            if args.action == "profile":
+                try:
+                    _print_result(client.get_task_profile(args.task_id), args.json)
+                except ServiceClientError:
+                    if local_task_manager is None:
+                        raise
+                    _print_result(local_task_manager.get_task_profile(args.task_id), args.json)
+                return 0
+            if args.action == "resume":
+                _print_result(client.resume_task(args.task_id, args.rewarm_flow), args.json)
+                return 0
         except (ServiceClientError, FileNotFoundError, ValueError, TimeoutError) as exc:
             print(f"error: {exc}", file=sys.stderr)
             return 2
@@ -663,7 +720,16 @@ def main() -> int:
                 _print_result(client.get_session(args.session_id), args.json)
                 return 0
             if args.action == "snapshots":
-                _print_result(client.get_session_snapshots(args.session_id, args.limit), args.json)
+                _print_result(
+                    client.get_session_snapshots(
+                        args.session_id,
+                        args.limit,
+                        cursor=args.cursor,
+                        phase=args.phase,
+                        node_id=args.node_id,
+                    ),
+                    args.json,
+                )
                 return 0
             if args.action == "snapshot-detail":
                 if args.snapshot_index is None:
@@ -786,10 +852,18 @@ def main() -> int:
         parser.error("--wait 只能和 --execute 一起使用")
     if (args.pause_before_start or args.breakpoints) and not args.execute:
         parser.error("--pause-before-start 和 --breakpoints 只能和 --execute 一起使用")
+    if args.hook_mode != "all" and not args.execute:
+        parser.error("--hook-mode 只能和 --execute 一起使用")
+    if (args.har_mode or args.har_path) and not args.execute:
+        parser.error("--har 和 --har-path 只能和 --execute 一起使用")
+    if args.har_path and not args.har_mode:
+        parser.error("--har-path 需要同时指定 --har record 或 --har replay")
     if (args.show or args.delete or args.execute) and not workflow_name:
         parser.error("--show、--delete、--execute 模式需要通过位置参数或 --name 指定 workflow")
     if args.local and (args.pause_before_start or args.breakpoints):
         parser.error("--local 模式不支持 --pause-before-start 或 --breakpoints，因为本地执行不会创建 session")
+    if args.local and args.har_mode:
+        parser.error("--local 模式不支持 --har，HAR 录制与回放由 service 任务提供")
     if not args.upload and not any([args.directory, args.list, workflow_name, args.show, args.delete, args.execute]):
         parser.error("workflow 命令至少需要一个操作，例如 --list、--upload、--show、--delete 或 --execute")
 
@@ -827,6 +901,9 @@ def main() -> int:
                     args.execute,
                     pause_before_start=args.pause_before_start,
                     breakpoints=workflow_breakpoints,
+                    hook_mode=args.hook_mode,
+                    har_mode=args.har_mode,
+                    har_path=args.har_path,
                 )
                 _print_result(result, args.json)
                 if args.wait and result.get("task"):
@@ -858,6 +935,9 @@ def main() -> int:
                 args.execute,
                 pause_before_start=args.pause_before_start,
                 breakpoints=workflow_breakpoints,
+                hook_mode=args.hook_mode,
+                har_mode=args.har_mode,
+                har_path=args.har_path,
             )
             _print_result(result, args.json)
             if args.wait and result.get("task"):
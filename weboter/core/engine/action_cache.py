@@ -0,0 +1,149 @@
+from collections import OrderedDict
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any
+
+
+def make_cache_key(action_name: str, inputs: dict[str, Any]) -> str | None:
+    """按 action 名称与解析后的 inputs 生成缓存键；inputs 无法规范化为 JSON 时返回 None"""
+    try:
+        canonical = json.dumps(
+            {"action": action_name, "inputs": inputs},
+            ensure_ascii=False,
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ActionCacheStats:
+    """单个任务内的缓存命中统计，同一任务的所有执行器共享"""
+
+    __slots__ = ("hits", "misses", "stores", "bypassed")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        # inputs/outputs 不可序列化或 action 拒绝缓存时计入 bypassed
+        self.bypassed = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "bypassed": self.bypassed,
+        }
+
+
+class ActionOutputCache:
+    """跨任务的 action 输出缓存。
+
+    每个条目一个 JSON 文件（<root>/<key>.json），内存中维护按写入顺序排列的索引，
+    超过 max_entries 时淘汰最早写入的条目；过期条目在读取时删除。
+    """
+
+    def __init__(self, root: Path, max_entries: int = 1000, default_ttl: float = 3600):
+        self.root = root
+        self.max_entries = max(1, int(max_entries))
+        self.default_ttl = float(default_ttl)
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, float] | None = None
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            index = self._load_index()
+            expires_at = index.get(key)
+            if expires_at is None:
+                return None
+            if expires_at <= time.time():
+                self._remove(key)
+                return None
+        try:
+            with open(self._entry_path(key), "r", encoding="utf-8") as file_obj:
+                return json.load(file_obj)["outputs"]
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self._remove(key)
+            return None
+
+    def put(self, key: str, action_name: str, outputs: dict[str, Any], ttl: float | None = None) -> bool:
+        """写入缓存；outputs 不可 JSON 序列化时跳过并返回 False"""
+        ttl = self.default_ttl if ttl is None else float(ttl)
+        if ttl <= 0:
+            return False
+        now = time.time()
+        try:
+            payload = json.dumps(
+                {"action": action_name, "created_at": now, "expires_at": now + ttl, "outputs": outputs},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        except (TypeError, ValueError):
+            return False
+        with self._lock:
+            index = self._load_index()
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self._entry_path(key)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(payload, encoding="utf-8")
+            os.replace(tmp_path, path)
+            index.pop(key, None)
+            index[key] = now + ttl
+            while len(index) > self.max_entries:
+                self._remove(next(iter(index)))
+        return True
+
+    def clear(self) -> int:
+        with self._lock:
+            index = self._load_index()
+            keys = list(index)
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            index = self._load_index()
+            now = time.time()
+            return {
+                "root": str(self.root),
+                "entries": len(index),
+                "expired": sum(1 for expires_at in index.values() if expires_at <= now),
+                "max_entries": self.max_entries,
+                "default_ttl": self.default_ttl,
+            }
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def _remove(self, key: str) -> None:
+        self._index.pop(key, None)
+        try:
+            self._entry_path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _load_index(self) -> OrderedDict[str, float]:
+        # 首次访问时从磁盘重建索引，按创建时间排序以保持淘汰顺序
+        if self._index is not None:
+            return self._index
+        entries: list[tuple[float, str, float]] = []
+        if self.root.is_dir():
+            for path in self.root.glob("*.json"):
+                try:
+                    with open(path, "r", encoding="utf-8") as file_obj:
+                        data = json.load(file_obj)
+                    entries.append((float(data["created_at"]), path.stem, float(data["expires_at"])))
+                except (OSError, ValueError, KeyError, TypeError):
+                    path.unlink(missing_ok=True)
+        entries.sort()
+        self._index = OrderedDict((key, expires_at) for _, key, expires_at in entries)
+        return self._index
@@ -0,0 +1,205 @@
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any
+
+from .runtime import Runtime
+
+
+# 检查点保存的运行时作用域；cur_outputs 在节点边界总是空的，$env 由任务重新构建
+CHECKPOINT_SCOPES = ("global", "flow", "prev_outputs")
+CHECKPOINT_VERSION = 1
+
+_SKIP = object()
+
+
+def _json_safe(value: Any, path: str, dropped: list[str]) -> Any:
+    """返回可 JSON 序列化的部分；浏览器、页面等对象被丢弃并记录路径"""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if not isinstance(key, str):
+                dropped.append(f"{path}.{key}")
+                continue
+            safe = _json_safe(item, f"{path}.{key}", dropped)
+            if safe is not _SKIP:
+                result[key] = safe
+        return result
+    if isinstance(value, (list, tuple)):
+        # 列表整体保留或整体丢弃，避免下标错位
+        items = []
+        for item in value:
+            safe = _json_safe(item, path, [])
+            if safe is _SKIP:
+                dropped.append(path)
+                return _SKIP
+            items.append(safe)
+        return items
+    dropped.append(path)
+    return _SKIP
+
+
+def capture_checkpoint(runtime: Runtime) -> dict[str, Any]:
+    """在节点执行前捕获根流程的可序列化状态，恢复时从 node_id 重新执行"""
+    dropped: list[str] = []
+    scopes = {
+        scope: _json_safe(runtime.data_context.data.get(scope, {}), scope, dropped)
+        for scope in CHECKPOINT_SCOPES
+    }
+    return {
+        "version": CHECKPOINT_VERSION,
+        "flow_id": runtime.flow.flow_id if runtime.flow else None,
+        "node_id": runtime.current_node_id,
+        "node_name": runtime.get_node_name(runtime.current_node_id) if runtime.current_node_id in runtime.nodes else None,
+        "saved_at": time.time(),
+        "scopes": scopes,
+        "dropped": dropped,
+    }
+
+
+def restore_checkpoint(runtime: Runtime, checkpoint: dict[str, Any]) -> None:
+    """将检查点写回已加载工作流的 runtime，工作流或节点不匹配时抛出 ValueError"""
+    if runtime.flow is None:
+        raise ValueError("No workflow loaded")
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {checkpoint.get('version')}")
+    if checkpoint.get("flow_id") != runtime.flow.flow_id:
+        raise ValueError(
+            f"Checkpoint belongs to flow '{checkpoint.get('flow_id')}', not '{runtime.flow.flow_id}'"
+        )
+    node_id = checkpoint.get("node_id")
+    if node_id not in runtime.nodes:
+        raise ValueError(f"Checkpoint node '{node_id}' not found in workflow")
+    scopes = checkpoint.get("scopes") or {}
+    for scope in CHECKPOINT_SCOPES:
+        runtime.data_context.data[scope] = dict(scopes.get(scope) or {})
+    runtime.data_context.data["cur_outputs"] = {}
+    runtime.set_current_node(node_id)
+
+
+class CheckpointStore:
+    """按任务保存最近一次检查点：<root>/<task_id>.json"""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def path(self, task_id: str) -> Path:
+        return self.root / f"{task_id}.json"
+
+    def save(self, task_id: str, checkpoint: dict[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(task_id)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(checkpoint, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def load(self, task_id: str) -> dict[str, Any] | None:
+        path = self.path(task_id)
+        if not path.is_file():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as file_obj:
+                return json.load(file_obj)
+        except ValueError:
+            return None
+
+    def delete(self, task_id: str) -> None:
+        self.path(task_id).unlink(missing_ok=True)
+
+
+class TaskCheckpointer:
+    """根执行器在每个节点边界调用 save；捕获在调用线程完成，写盘交给后台线程。
+
+    后台线程只保留最新一个待写检查点（新检查点覆盖未写入的旧检查点），两次写入至少间隔
+    min_interval 秒；节点与可序列化作用域都未变化时跳过。任务结束前必须调用 flush/close，
+    把最后一个检查点落盘。写入失败只记录警告，不影响任务执行。
+    """
+
+    def __init__(
+        self,
+        store: CheckpointStore,
+        task_id: str,
+        logger: logging.Logger | None = None,
+        min_interval: float = 1.0,
+    ):
+        self.store = store
+        self.task_id = task_id
+        self.logger = logger
+        self.min_interval = max(0.0, float(min_interval))
+        self.written = 0
+        self.skipped = 0
+        self._last_state: tuple[Any, Any] | None = None
+        self._pending: dict[str, Any] | None = None
+        self._writing = False
+        self._flush_requests = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def save(self, runtime: Runtime) -> None:
+        checkpoint = capture_checkpoint(runtime)
+        state = (checkpoint["node_id"], checkpoint["scopes"])
+        if state == self._last_state:
+            self.skipped += 1
+            return
+        self._last_state = state
+        with self._cond:
+            if self._closed:
+                return
+            if self._pending is not None:
+                self.skipped += 1
+            self._pending = checkpoint
+            self._cond.notify_all()
+        self._ensure_started()
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        """立即写入待写检查点并等待完成；超时返回 False"""
+        with self._cond:
+            self._flush_requests += 1
+            self._cond.notify_all()
+            try:
+                return self._cond.wait_for(lambda: self._pending is None and not self._writing, timeout)
+            finally:
+                self._flush_requests -= 1
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._drain_loop, name="weboter-checkpoint", daemon=True)
+            self._thread.start()
+
+    def _drain_loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                checkpoint, self._pending = self._pending, None
+                self._writing = True
+            self._write(checkpoint)
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+                # 节流：间隔内到达的检查点合并为最新一个，flush/close 时立即写入
+                self._cond.wait_for(lambda: self._closed or self._flush_requests > 0, self.min_interval)
+
+    def _write(self, checkpoint: dict[str, Any]) -> None:
+        try:
+            self.store.save(self.task_id, checkpoint)
+            self.written += 1
+        except (OSError, TypeError, ValueError) as exc:
+            if self.logger:
+                self.logger.warning("Failed to write checkpoint for task %s: %s", self.task_id, exc)
@@ -0,0 +1,98 @@
+import os
+from collections.abc import Mapping
+from typing import Any, Iterator
+
+
+def nest_flat_mapping(data: Mapping[str, Any]) -> dict[str, Any]:
+    """将 `a.b=1` 形式的扁平键展开为嵌套 dict，语义与按 `$env{a.b}` 逐项写入一致"""
+    result: dict[str, Any] = {}
+    for key, value in data.items():
+        parts = key.split('.')
+        current = result
+        for part in parts[:-1]:
+            if part not in current or not isinstance(current[part], dict):
+                current[part] = {}
+            current = current[part]
+        current[parts[-1]] = value
+    return result
+
+
+class EnvScope(Mapping):
+    """`$env` 作用域的只读分层视图，写入走本层的写时复制。
+
+    查找顺序为：本层写入 → 上层（父 runtime 的 EnvScope / 受管环境快照 / 进程环境）。
+    同名键若各层都是 dict，则返回合并视图；否则以最先命中的层为准，与历史上
+    “先写进程环境、再写受管环境覆盖”的结果一致。值在查找时才解析，不做整体拷贝。
+    """
+
+    __slots__ = ("_local", "_bases")
+
+    def __init__(self, bases: tuple[Mapping, ...] = (), local: dict | None = None):
+        self._local: dict[str, Any] = local if local is not None else {}
+        self._bases = tuple(bases)
+
+    @classmethod
+    def build(cls, managed_env: Mapping | None = None, environ: Mapping[str, str] | None = None) -> 'EnvScope':
+        """按任务构建一次：受管环境快照覆盖进程环境"""
+        process_env = nest_flat_mapping(dict(os.environ if environ is None else environ))
+        bases: list[Mapping] = []
+        if managed_env:
+            bases.append(managed_env)
+        bases.append(process_env)
+        return cls(tuple(bases))
+
+    def fork(self) -> 'EnvScope':
+        """为子 runtime 创建新的写入层；子流程的写入不会影响父流程"""
+        return EnvScope((self,))
+
+    def _layers(self) -> Iterator[Mapping]:
+        yield self._local
+        yield from self._bases
+
+    def __getitem__(self, key: str) -> Any:
+        nested: list[Mapping] = []
+        for layer in self._layers():
+            if key not in layer:
+                continue
+            value = layer[key]
+            if not isinstance(value, Mapping):
+                if nested:
+                    # 上层已是 dict，下层同名标量被覆盖
+                    break
+                return value
+            nested.append(value)
+        if not nested:
+            raise KeyError(key)
+        # 嵌套分组同样以只读视图返回，避免调用方改写共享快照
+        return EnvScope(tuple(nested))
+
+    def __contains__(self, key: object) -> bool:
+        return any(key in layer for layer in self._layers())
+
+    def __iter__(self) -> Iterator[str]:
+        seen: set[str] = set()
+        for layer in self._layers():
+            for key in layer:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def set_path(self, path: tuple[str, ...], value: Any):
+        """写入本层；路径中间节点按需创建为 dict"""
+        current = self._local
+        for part in path[:-1]:
+            if part not in current or not isinstance(current[part], dict):
+                current[part] = {}
+            current = current[part]
+        current[path[-1]] = value
+
+    def to_dict(self) -> dict[str, Any]:
+        """展开为普通嵌套 dict（用于导出/调试）"""
+        result: dict[str, Any] = {}
+        for key in self:
+            value = self[key]
+            result[key] = value.to_dict() if isinstance(value, EnvScope) else value
+        return result
@@ -1,20 +1,80 @@
+import asyncio
 import logging
 
-from .runtime import Runtime, DataContext
+from .runtime import Runtime
+from .env_scope import EnvScope
 from .action_manager import action_manager
 from .control_manager import control_manager
 from .io_pipe_impl import IOPipeImpl
+from .profiler import StepProfiler, StepTimer
+from .action_cache import ActionCacheStats, ActionOutputCache, make_cache_key
+from .checkpoint import TaskCheckpointer, restore_checkpoint
+from .har import HarSession
+from .lifecycle import ResourceTracker
+from .storage_state import StorageStateStore
+from .log_format import LazyRepr
+from .plan import ExecutionPlan, NodePlan, compile_flow_tree, compile_node, split_values
 from weboter.public.contracts import *
 from weboter.public.model import *
 
 
+# 引擎内部使用的固定变量引用，预先编译，避免每一步重复解析
+PW_INST_REF = VarRef.parse("$global{{__pw_inst__}}")
+BROWSER_REF = VarRef.parse("$global{{__browser__}}")
+ORIGINAL_BROWSER_REF = VarRef.parse("$global{{__original_browser__}}")
+CURRENT_PAGE_REF = VarRef.parse("$global{{current_page}}")
+PAGES_REF = VarRef.parse("$global{{pages}}")
+
+
+async def gather_or_cancel(coros):
+    """并发执行并按顺序返回结果；任一协程失败时取消其余协程并抛出首个异常"""
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class SerializedHooks:
+    """并发分支共用的 hooks 包装：同一时刻只允许一个分支进入异步 hook。
+
+    调试会话的暂停状态、快照与活动 executor 都是单份的；某个分支在 hook 中暂停或守护等待时，
+    其余分支会在各自下一次进入 hook 时等待，而不是继续执行并改写会话状态。
+    """
+
+    def __init__(self, hooks):
+        self._hooks = hooks
+        self._lock = asyncio.Lock()
+
+    def __getattr__(self, name):
+        # 未实现的 hook 照常抛出 AttributeError，保持执行器的 hasattr 判断
+        attr = getattr(self._hooks, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            async with self._lock:
+                return await attr(*args, **kwargs)
+
+        return call
+
+
 class Executor:
     
     def __init__(self, **kwargs):
-        self.runtime: Runtime = Runtime(managed_env=kwargs.get("managed_env"))
+        self.runtime: Runtime = Runtime(managed_env=kwargs.get("managed_env"), env=kwargs.get("env"))
         self.workflow: Flow | None = None
+        self.plan: ExecutionPlan | None = None
         self.action_manager = action_manager
         self.control_manager = control_manager
+        # 编译结果按 Flow 对象缓存，并与子流程执行器共享，避免循环调用子流程时重复编译
+        self._plan_cache: dict[int, ExecutionPlan] = kwargs.get("plan_cache")
+        if self._plan_cache is None:
+            self._plan_cache = {}
         self._ancestor_subflow_scopes: list[dict[str, Flow]] = [
             dict(scope) for scope in kwargs.get("ancestor_subflow_scopes", [])
         ]
@@ -22,13 +82,31 @@ class Executor:
         
         logger = kwargs.get("logger", None)
         self.hooks = kwargs.get("hooks")
+        # 同一任务的所有执行器共享 profiler，按节点/action 聚合各阶段耗时
+        self.profiler: StepProfiler | None = kwargs.get("profiler")
+        # 可缓存 action 的跨任务输出缓存，未配置时不启用
+        self.action_cache: ActionOutputCache | None = kwargs.get("action_cache")
+        self.cache_stats: ActionCacheStats | None = kwargs.get("cache_stats")
+        # 仅根执行器在节点边界写检查点，子流程执行器不继承
+        self.checkpointer: TaskCheckpointer | None = kwargs.get("checkpointer")
+        # service 提供的预热浏览器池，OpenBrowser 通过 io.executor.browser_pool 租用
+        self.browser_pool = kwargs.get("browser_pool")
+        # 按 profile 保存的浏览器登录态，OpenBrowser/SaveStorageState 通过 io.executor.storage_states 访问
+        self.storage_states: StorageStateStore | None = kwargs.get("storage_states")
+        # 任务级 HAR 录制/回放，OpenBrowser 通过 io.executor.har 读取
+        self.har: HarSession | None = kwargs.get("har")
+        # 任务期间创建的浏览器、context 与页面，与子流程执行器共享，由任务所有者在结束时调用 close_all
+        self.resources: ResourceTracker = kwargs.get("resources") or ResourceTracker()
         if logger and isinstance(logger, logging.Logger):
             self.logger = logger
         else:
             self.logger = None # 由于 flow 在加载工作流之前是未知的，因此无法在此处创建 logger，等工作流加载后再创建
             pass
+        self._quiet_logger: logging.Logger | None = None
 
     def load_workflow(self, flow: Flow):
+        # 先编译执行计划（包括全部子流程），未知的 action/control 与无效的静态 locator 在加载阶段即报错
+        self.plan = compile_flow_tree(flow, self.action_manager, self.control_manager, self._plan_cache)
         self.workflow = flow
         self.runtime.init_with_flow(flow)
         self._current_subflow_scope = {sub_flow.flow_id: sub_flow for sub_flow in flow.sub_flows}
@@ -42,46 +120,97 @@ class Executor:
             handler.setFormatter(formatter)
             self.logger.addHandler(handler)
 
-        self.logger.info(f">> Workflow '{flow.name}' loaded with {len(flow.nodes)} nodes and {len(flow.sub_flows)} sub-flows")
+        self.logger.info(">> Workflow '%s' loaded with %d nodes and %d sub-flows", flow.name, len(flow.nodes), len(flow.sub_flows))
+
+    def invalidate_plan(self, node_id: str):
+        """节点定义被修改或新增后重新编译该节点的执行计划（调试会话 patch_node/add_node 使用）"""
+        if not self.workflow:
+            raise ValueError("No workflow loaded")
+        node = self.runtime.get_node(node_id)
+        node_plan = compile_node(node, self.workflow.log, self.action_manager, self.control_manager)
+        self.plan = self.plan.with_node(node_plan)
+        self._plan_cache[id(self.workflow)] = self.plan
+
+    def node_logger(self, node_plan: NodePlan | None) -> logging.Logger:
+        """log=none 的节点使用仅输出 WARNING 以上的子 logger，不再逐步修改共享 logger 的级别"""
+        if node_plan is None or node_plan.log_mode != "none":
+            return self.logger
+        if self._quiet_logger is None:
+            # 不经 logging.getLogger 注册：随执行器释放，长期运行的 service 不会按任务累积 logger
+            self._quiet_logger = logging.Logger(f"{self.logger.name}.quiet", logging.WARNING)
+            self._quiet_logger.parent = self.logger
+        return self._quiet_logger
+
+    def _get_node_plan(self, node: Node) -> NodePlan:
+        node_plan = self.plan.get(node.node_id) if self.plan else None
+        if node_plan is None or node_plan.node is not node:
+            # 节点被直接替换（未经 invalidate_plan）时按需补编译
+            self.invalidate_plan(node.node_id)
+            node_plan = self.plan.get(node.node_id)
+        return node_plan
+
+    def track_resource(self, kind: str, resource):
+        # 浏览器池持有的 playwright 实例与浏览器跨任务复用，不随任务关闭
+        if self.browser_pool is not None and self.browser_pool.owns(resource):
+            return
+        self.resources.register(kind, resource)
+
+    @staticmethod
+    def _page_closed(page) -> bool:
+        is_closed = getattr(page, "is_closed", None)
+        return bool(is_closed()) if callable(is_closed) else False
 
     def extract_outputs(self, node: Node, io: IOPipeImpl):
         pw_inst = io.outputs.get('__pw_inst__', None)
         if pw_inst:
-            self.runtime.set_value("$global{{__pw_inst__}}", pw_inst)
+            self.track_resource("playwright", pw_inst)
+            self.runtime.set_ref(PW_INST_REF, pw_inst)
         
         # use browser_context and hide the original browser
         browser = io.outputs.get('__browser__', None)
         browser_context = io.outputs.get('__browser_context__', None)
         if browser and browser_context:
-            self.runtime.set_value("$global{{__browser__}}", browser_context)
-            self.runtime.set_value("$global{{__original_browser__}}", browser)
+            self.track_resource("browser", browser)
+            self.track_resource("context", browser_context)
+            self.runtime.set_ref(BROWSER_REF, browser_context)
+            self.runtime.set_ref(ORIGINAL_BROWSER_REF, browser)
         
         page = io.outputs.get('__page__', None)
         if page:
-            self.runtime.set_value("$global{{current_page}}", page)
-            pages = self.runtime.get_value("$global{{pages}}") or []
-            if page not in pages:
-                pages.append(page)
-                self.runtime.set_value("$global{{pages}}", pages)
+            self.track_resource("page", page)
+            self.runtime.set_ref(CURRENT_PAGE_REF, page)
+            pages = self.runtime.get_ref(PAGES_REF) or []
+            # 移除已关闭的页面（OpenPage max_pages 或工作流自行关闭），避免列表无限增长
+            open_pages = [item for item in pages if not self._page_closed(item)]
+            for item in pages:
+                if item not in open_pages:
+                    self.resources.forget(item)
+            if page not in open_pages:
+                open_pages.append(page)
+            if open_pages != pages:
+                self.runtime.set_ref(PAGES_REF, open_pages)
         
         # add outputs and prev_outputs
         self.runtime.store_outputs(io.outputs, node.outputs)
     
-    def prepare_action_io(self, node: Node) -> IOPipeImpl:
+    def prepare_action_io(self, node: Node, node_plan: NodePlan | None = None) -> IOPipeImpl:
         inst = IOPipeImpl()
         inst.set_runtime(self.runtime)
-        # add static inputs
-        for key, value in node.inputs.items():
-            # resolve from runtime if it's a variable
-            if isinstance(value, str) and DataContext.contains_var(value):
-                value = self.runtime.get_value(value)
-            inst.inputs[key] = value
+        if node_plan is None:
+            # 临时节点等未进入执行计划的节点，现场拆分
+            static_inputs, var_inputs = split_values(node.inputs)
+        else:
+            static_inputs, var_inputs = node_plan.static_inputs, node_plan.var_inputs
+        # add static inputs, then resolve variables from runtime
+        inst.inputs.update(static_inputs)
+        for key, ref in var_inputs:
+            inst.inputs[key] = self.runtime.get_ref(ref)
         # set pw instance, browser, page from context if available
-        inst.pw_inst = self.runtime.get_value("$global{{__pw_inst__}}")
-        inst.browser = self.runtime.get_value("$global{{__browser__}}")
-        inst.page = self.runtime.get_value("$global{{current_page}}")
+        inst.pw_inst = self.runtime.get_ref(PW_INST_REF)
+        inst.browser = self.runtime.get_ref(BROWSER_REF)
+        inst.page = self.runtime.get_ref(CURRENT_PAGE_REF)
         inst.executor = self
-        inst.logger = self.logger
+        inst.logger = self.node_logger(node_plan)
         return inst
 
     async def exec_action(self, action_name: str, io: IOPipeImpl):
@@ -90,16 +219,19 @@ class Executor:
             raise ValueError(f"Action '{action_name}' not found")
         await action.execute(io)
 
-    def prepare_control_io(self, node: Node) -> IOPipeImpl:
+    def prepare_control_io(self, node: Node, node_plan: NodePlan | None = None) -> IOPipeImpl:
         inst = IOPipeImpl()
         inst.set_runtime(self.runtime)
-        # add static params
-        for key, value in node.params.items():
-            if isinstance(value, str) and DataContext.contains_var(value):
-                value = self.runtime.get_value(value)
-            inst.params[key] = value
+        if node_plan is None:
+            static_params, var_params = split_values(node.params)
+        else:
+            static_params, var_params = node_plan.static_params, node_plan.var_params
+        # add static params, then resolve variables from runtime
+        inst.params.update(static_params)
+        for key, ref in var_params:
+            inst.params[key] = self.runtime.get_ref(ref)
         inst.executor = self
-        inst.logger = self.logger
+        inst.logger = self.node_logger(node_plan)
         return inst
 
     async def exec_control(self, control_name: str, io: IOPipeImpl) -> str:
@@ -121,45 +253,138 @@ class Executor:
             raise ValueError(f"Node '{node_id}' not found")
         if not node.control:
             raise ValueError(f"Node '{node_id}' has no control to execute")
-        
-        if node.log == "none" or self.workflow.log == "none":
-            self.logger.setLevel(logging.WARNING)
-        else:
-            self.logger.setLevel(logging.DEBUG)
 
-        self.logger.info("")
-        self.logger.info(f"=> Executing node '{node.name}' (ID: {node.node_id})")
-        if self.hooks and hasattr(self.hooks, "before_step"):
+        # 未启用 profiler 时 timer 为 None，各阶段计时不产生额外开销
+        timer = StepTimer() if self.profiler is not None else None
+        try:
+            await self._step_node(node, timer)
+        finally:
+            if timer is not None:
+                self.profiler.record(
+                    self.workflow.flow_id,
+                    node.node_id,
+                    node.name,
+                    node.action,
+                    timer.phases,
+                    nested=bool(self._ancestor_subflow_scopes),
+                )
+
+    async def _execute_action(self, node: Node, node_plan: NodePlan, action_io: IOPipeImpl):
+        """执行节点 action；声明了 cacheable 的 action 先查跨任务缓存，未命中时执行并写回"""
+        action = node_plan.action
+        if self.action_cache is None or not getattr(action, "cacheable", False):
+            await action.execute(action_io)
+            return
+        stats = self.cache_stats
+        key = make_cache_key(node.action, action_io.inputs)
+        if key is None:
+            if stats:
+                stats.bypassed += 1
+            await action.execute(action_io)
+            return
+        # 缓存读写是同步文件 IO，放到线程中执行，避免阻塞同一事件循环上的并发分支
+        cached = await asyncio.to_thread(self.action_cache.get, key)
+        if cached is not None:
+            if stats:
+                stats.hits += 1
+            action_io.outputs.update(cached)
+            return
+        if stats:
+            stats.misses += 1
+        await action.execute(action_io)
+        stored = action.should_cache(action_io.outputs) and await asyncio.to_thread(
+            self.action_cache.put, key, node.action, dict(action_io.outputs), getattr(action, "cache_ttl", None)
+        )
+        if stats:
+            if stored:
+                stats.stores += 1
+            else:
+                stats.bypassed += 1
+
+    def _wants_hooks(self, node: Node, node_plan: NodePlan) -> bool:
+        """hooks 可通过 wants_step 按粒度跳过本步的 before/after_step，未实现时每步派发"""
+        if not self.hooks:
+            return False
+        wants_step = getattr(self.hooks, "wants_step", None)
+        return wants_step is None or wants_step(self, node, node_plan)
+
+    async def _step_node(self, node: Node, timer: StepTimer | None):
+        node_plan = self._get_node_plan(node)
+        if timer:
+            timer.lap("resolve")
+        # 日志模式在格式化之前做门控：none 不产生任何记录，short 不渲染 inputs/params
+        verbose = node_plan.log_mode != "none"
+        if verbose:
+            self.logger.info("")
+            self.logger.info("=> Executing node '%s' (ID: %s)", node.name, node.node_id)
+            if timer:
+                timer.lap("log")
+        dispatch_hooks = self._wants_hooks(node, node_plan)
+        if dispatch_hooks and hasattr(self.hooks, "before_step"):
             await self.hooks.before_step(self, node)
+            # 暂停期间节点可能被 patch，重新获取执行计划
+            node_plan = self._get_node_plan(node)
+            verbose = node_plan.log_mode != "none"
+            if timer:
+                timer.lap("hooks")
         
         if node.action:
-            action_io = self.prepare_action_io(node)
-            if node.log == "short" or self.workflow.log == "short":
-                self.logger.info(f"   Action: {node.action}")
+            action_io = self.prepare_action_io(node, node_plan)
+            if timer:
+                timer.lap("resolve")
+            if not verbose:
+                pass
+            elif node_plan.log_mode == "short":
+                self.logger.info("   Action: %s", node.action)
             else:
-                self.logger.info(f"   Action: {node.action} with inputs {action_io.inputs}")
-            await self.exec_action(node.action, action_io)
+                self.logger.info("   Action: %s with inputs %s", node.action, LazyRepr(action_io.inputs))
+            if timer:
+                timer.lap("log")
+            await self._execute_action(node, node_plan, action_io)
+            if timer:
+                timer.lap("action")
             self.extract_outputs(node, action_io)
-            self.logger.info(f"   Action Done.")
+            if timer:
+                timer.lap("extract")
+            if verbose:
+                self.logger.info("   Action Done.")
+                if timer:
+                    timer.lap("log")
 
         # subflow action 有可能通过跳转到 __exit__ 来提前结束流程
         # 因此在执行控制流之前需要检查流程是否已经结束
         if self.runtime.should_exit():
-            self.logger.info(f"   Current flow should exit!")
+            if verbose:
+                self.logger.info("   Current flow should exit!")
             self.runtime.set_current_node('__exit__')
             return
         
-        control_io = self.prepare_control_io(node)
-        if node.log == "short" or self.workflow.log == "short":
-            self.logger.info(f"   Control: {node.control}")
+        control_io = self.prepare_control_io(node, node_plan)
+        if timer:
+            timer.lap("resolve")
+        if not verbose:
+            pass
+        elif node_plan.log_mode == "short":
+            self.logger.info("   Control: %s", node.control)
         else:
-            self.logger.info(f"   Control: {node.control} with params {control_io.params}")
-        next_node_id = await self.exec_control(node.control, control_io)
-        self.logger.info(f"   Next node: '{self.runtime.get_node_name(next_node_id)}' (ID: {next_node_id})")
+            self.logger.info("   Control: %s with params %s", node.control, LazyRepr(control_io.params))
+        if timer:
+            timer.lap("log")
+        next_node_id = await node_plan.control.calc_next(control_io)
+        if timer:
+            timer.lap("control")
+        if verbose:
+            self.logger.info("   Next node: '%s' (ID: %s)", self.runtime.get_node_name(next_node_id), next_node_id)
+            if timer:
+                timer.lap("log")
         self.runtime.set_current_node(next_node_id)
         self.runtime.switch_outputs()
-        if self.hooks and hasattr(self.hooks, "after_step"):
+        if timer:
+            timer.lap("control")
+        if dispatch_hooks and hasattr(self.hooks, "after_step"):
             await self.hooks.after_step(self, node, next_node_id)
+            if timer:
+                timer.lap("hooks")
     
     async def run(self):
         if not self.workflow:
@@ -171,6 +396,8 @@ class Executor:
             await self.hooks.on_workflow_loaded(self, self.workflow)
         
         while not self.runtime.finished():
+            if self.checkpointer is not None:
+                self.checkpointer.save(self.runtime)
             try:
                 await self.step_one()
             except Exception as exc:
@@ -183,6 +410,22 @@ class Executor:
         if self.hooks and hasattr(self.hooks, "on_finished"):
             await self.hooks.on_finished(self)
 
+    async def resume(self, checkpoint: dict, rewarm_flow_id: str | None = None):
+        """从检查点恢复运行时状态并从检查点节点继续执行。
+
+        浏览器、页面等对象不会写入检查点；rewarm_flow_id 指定的子流程会在继续执行前运行，
+        与 SubFlow 一样共享 $global，用于重新打开浏览器、恢复登录态。
+        """
+        if not self.workflow:
+            raise ValueError("No workflow loaded")
+        restore_checkpoint(self.runtime, checkpoint)
+        self.logger.info(">> Resuming workflow '%s' from node '%s'", self.workflow.name, self.runtime.current_node_id)
+        if rewarm_flow_id:
+            self.logger.info('   Re-warm sub flow with ID: %s >>>>>>>>', rewarm_flow_id)
+            await self._run_subflow(rewarm_flow_id, [])
+            self.logger.info('   Re-warm sub flow with ID: %s finished <<<<<<<<', rewarm_flow_id)
+        await self.run()
+
     def _iter_visible_subflow_scopes(self):
         # 可见性规则：优先当前作用域，其次最近上级作用域，逐层向上。
         if self._current_subflow_scope:
@@ -206,61 +449,266 @@ class Executor:
             )
         raise ValueError(f"Sub flow '{flow_id}' not found")
         
-    async def sub_flow_func(self, io: IOPipeImpl):
-        flow_id = io.inputs.get("flow_id")
-        if not flow_id:
-            raise ValueError("Param 'flow_id' is required for sub_flow_func")
-
-        self.logger.info(f'   Starting sub flow with ID: {flow_id} >>>>>>>>')
-        self.logger.info('')
+    def _spawn_subflow_executor(self, hooks=None) -> 'Executor':
         child_ancestor_scopes = [
             *self._ancestor_subflow_scopes,
             dict(self._current_subflow_scope),
         ]
-        executor = Executor(
+        return Executor(
             logger=self.logger,
-            hooks=self.hooks,
-            managed_env=self.runtime.data_context.data.get("env", {}),
+            hooks=hooks or self.hooks,
+            env=self._fork_env(),
             ancestor_subflow_scopes=child_ancestor_scopes,
+            plan_cache=self._plan_cache,
+            profiler=self.profiler,
+            action_cache=self.action_cache,
+            cache_stats=self.cache_stats,
+            browser_pool=self.browser_pool,
+            storage_states=self.storage_states,
+            har=self.har,
+            resources=self.resources,
         )
-        flow = self.get_subflow(flow_id)
-        if not flow:
-            raise ValueError(f"Sub flow '{flow_id}' not found")
 
-        sub_rt = executor.runtime
+    def _fork_env(self) -> EnvScope:
+        # 子流程共享父流程的 $env 视图，仅新增一层写时复制，不拷贝环境变量
+        env = self.runtime.data_context.data.get("env")
+        if isinstance(env, EnvScope):
+            return env.fork()
+        return EnvScope((env or {},))
 
-        # copy global vars
-        sub_rt.copy_data(self.runtime, prefix="global")
+    @staticmethod
+    def _to_pickers(items) -> list[VarPicker]:
+        pickers = []
+        for item in items or []:
+            pickers.append(item if isinstance(item, VarPicker) else VarPicker.deserialize(item))
+        return pickers
 
-        in_pickers = [VarPicker(picker) for picker in io.inputs.get("data_in", [])]
+    def _apply_data_in(self, sub_rt: Runtime, pickers: list[VarPicker]):
         # 将 picker.src 获取的值存储到 picker.dst 中，如果 dst 没有以 $ 开头，则默认存储到 flow 作用域中
-        for picker in in_pickers:
-            value = self.runtime.get_value(picker.src)
+        for picker in pickers:
             if picker.value is not None:
                 value = picker.value
+            else:
+                value = self.runtime.get_value(picker.src)
             dst = picker.dst
             if not dst.startswith("$"):
                 sub_rt.set_value(f"$flow{{{dst}}}", value)
             else:
                 sub_rt.set_value(dst, value)
 
-        executor.load_workflow(flow)
-        await executor.run()
-
-        out_pickers = [VarPicker(picker) for picker in io.inputs.get("data_out", [])]
-        # todo: 将子流程中的 picker.src 获取的值存储到 picker.dst 中，如果 dst 没有以 $ 开头，则默认存储到当前节点的输出中
-        for picker in out_pickers:
+    @staticmethod
+    def _collect_data_out(sub_rt: Runtime, pickers: list[VarPicker]) -> list[tuple[str, object]]:
+        values = []
+        for picker in pickers:
             value = sub_rt.get_value(picker.src)
             if picker.value is not None:
                 value = picker.value
-            dst = picker.dst
+            values.append((picker.dst, value))
+        return values
+
+    def _apply_data_out(self, io: IOPipeImpl, values: list[tuple[str, object]]) -> dict:
+        # 如果 dst 没有以 $ 开头，则默认存储到当前节点的输出中
+        local_outputs = {}
+        for dst, value in values:
             if not dst.startswith("$"):
                 io.outputs[dst] = value
+                local_outputs[dst] = value
             else:
                 self.runtime.set_value(dst, value)
+        return local_outputs
+
+    async def _run_subflow(
+        self,
+        flow_id: str,
+        data_in,
+        isolate_global: bool = False,
+        page=None,
+        flow_values: dict | None = None,
+        hooks=None,
+    ) -> Runtime:
+        """运行一次子流程并返回其 runtime。
+
+        isolate_global=False 时子流程与当前流程共享 $global（SubFlow 的既有语义）；
+        为 True 时子流程获得 $global 的浅拷贝，可选地以 page 作为其 current_page，用于并发分支。
+        flow_values 会在 data_in 之前直接写入子流程的 $flow 作用域。
+        hooks 用于替换子流程的 hooks，并发分支传入共享的 SerializedHooks。
+        """
+        executor = self._spawn_subflow_executor(hooks)
+        flow = self.get_subflow(flow_id)
+        if not flow:
+            raise ValueError(f"Sub flow '{flow_id}' not found")
+
+        sub_rt = executor.runtime
+        if isolate_global:
+            sub_rt.data_context.data["global"] = dict(self.runtime.data_context.data.get("global", {}))
+            if page is not None:
+                sub_rt.set_ref(CURRENT_PAGE_REF, page)
+            # 分支只登记自己打开的页面，OpenPage 的 max_pages 不会关闭父流程或其他分支的页面
+            sub_rt.set_ref(PAGES_REF, [page] if page is not None else [])
+        else:
+            # copy global vars
+            sub_rt.copy_data(self.runtime, prefix="global")
+
+        for name, value in (flow_values or {}).items():
+            sub_rt.set_value(f"$flow{{{name}}}", value)
+        self._apply_data_in(sub_rt, self._to_pickers(data_in))
+        executor.load_workflow(flow)
+        await executor.run()
+        return sub_rt
+
+    async def sub_flow_func(self, io: IOPipeImpl):
+        flow_id = io.inputs.get("flow_id")
+        if not flow_id:
+            raise ValueError("Param 'flow_id' is required for sub_flow_func")
+
+        self.logger.info('   Starting sub flow with ID: %s >>>>>>>>', flow_id)
+        self.logger.info('')
+        sub_rt = await self._run_subflow(flow_id, io.inputs.get("data_in", []))
+
+        out_pickers = self._to_pickers(io.inputs.get("data_out", []))
+        self._apply_data_out(io, self._collect_data_out(sub_rt, out_pickers))
         
         if sub_rt.should_exit():
             self.runtime.set_current_node('__exit__')
 
-        self.logger.info(f'   Sub flow with ID: {flow_id} finished <<<<<<<<')
-        
\ No newline at end of file
+        self.logger.info('   Sub flow with ID: %s finished <<<<<<<<', flow_id)
+
+    async def _open_branch_page(self):
+        browser = self.runtime.get_ref(BROWSER_REF)
+        if browser is None:
+            return None
+        page = await browser.new_page()
+        self.track_resource("page", page)
+        return page
+
+    @staticmethod
+    async def _close_branch_page(page):
+        if page is None:
+            return
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+    async def fork_join_func(self, io: IOPipeImpl):
+        """并发运行多个子流程分支，全部完成后按分支声明顺序合并 data_out"""
+        branches = io.inputs.get("branches") or []
+        if not isinstance(branches, list) or not branches:
+            raise ValueError("Input 'branches' must be a non-empty list for fork_join_func")
+        for index, branch in enumerate(branches):
+            if not isinstance(branch, dict) or not branch.get("flow_id"):
+                raise ValueError(f"Branch #{index} requires 'flow_id'")
+        new_page = io.inputs.get("new_page", True)
+        branch_hooks = SerializedHooks(self.hooks) if self.hooks else None
+
+        async def run_branch(index: int, branch: dict):
+            flow_id = branch["flow_id"]
+            page = await self._open_branch_page() if new_page else None
+            if new_page and page is None:
+                self.logger.warning('   Branch #%d (%s) has no browser context, running without a dedicated page', index, flow_id)
+            self.logger.info('   Fork branch #%d with sub flow ID: %s >>>>>>>>', index, flow_id)
+            try:
+                sub_rt = await self._run_subflow(
+                    flow_id,
+                    branch.get("data_in", []),
+                    isolate_global=True,
+                    page=page,
+                    hooks=branch_hooks,
+                )
+                # 子流程结束后立即读取 data_out，合并推迟到所有分支完成之后
+                values = self._collect_data_out(sub_rt, self._to_pickers(branch.get("data_out", [])))
+            finally:
+                await self._close_branch_page(page)
+            self.logger.info('   Fork branch #%d (%s) finished <<<<<<<<', index, flow_id)
+            return values, sub_rt.should_exit()
+
+        results = await gather_or_cancel(
+            [run_branch(index, branch) for index, branch in enumerate(branches)]
+        )
+
+        branch_outputs = []
+        should_exit = False
+        for values, branch_exit in results:
+            branch_outputs.append(self._apply_data_out(io, values))
+            should_exit = should_exit or branch_exit
+        io.outputs["branches"] = branch_outputs
+
+        if should_exit:
+            self.runtime.set_current_node('__exit__')
+
+    async def for_each_func(self, io: IOPipeImpl):
+        """对列表中的每一项运行一次子流程，按 concurrency 限制并发，结果按原顺序收集"""
+        flow_id = io.inputs.get("flow_id")
+        if not flow_id:
+            raise ValueError("Param 'flow_id' is required for for_each_func")
+        items = io.inputs.get("items")
+        if items is None:
+            items = []
+        if not isinstance(items, (list, tuple)):
+            raise ValueError(f"Input 'items' must be a list, got {type(items).__name__}")
+        try:
+            concurrency = int(io.inputs.get("concurrency", 1) or 1)
+        except (TypeError, ValueError):
+            raise ValueError("Input 'concurrency' must be an integer")
+        if concurrency < 1:
+            raise ValueError("Input 'concurrency' must be >= 1")
+        item_var = io.inputs.get("item_var") or "item"
+        index_var = io.inputs.get("index_var") or "index"
+        result_src = io.inputs.get("result_src") or "$flow{result}"
+        # 并发项不能共用父流程的 $global 与 current_page：并发时每项都获得 $global 浅拷贝，并从页面池取用独立页面
+        use_pages_requested = bool(io.inputs.get("use_pages", False))
+        if (use_pages_requested or concurrency > 1) and self.runtime.get_ref(BROWSER_REF) is None:
+            if use_pages_requested:
+                raise ValueError("ForEach 'use_pages' requires an open browser context, run OpenBrowser first")
+            # 没有 browser context 就无法为各项分配独立页面，退回串行执行
+            self.logger.warning("   ForEach has no browser context for per-item pages, running items serially")
+            concurrency = 1
+        use_pages = use_pages_requested or concurrency > 1
+        item_hooks = SerializedHooks(self.hooks) if self.hooks and concurrency > 1 else None
+        data_in = self._to_pickers(io.inputs.get("data_in", []))
+
+        semaphore = asyncio.Semaphore(concurrency)
+        idle_pages: list = []
+        opened_pages: list = []
+
+        async def acquire_page():
+            while idle_pages:
+                page = idle_pages.pop()
+                if not self._page_closed(page):
+                    return page
+                # 上一项关闭了页面，丢弃并换用新页面
+                self.resources.forget(page)
+            page = await self._open_branch_page()
+            if page is not None:
+                opened_pages.append(page)
+            return page
+
+        async def run_item(index: int, item):
+            async with semaphore:
+                page = await acquire_page() if use_pages else None
+                try:
+                    sub_rt = await self._run_subflow(
+                        flow_id,
+                        data_in,
+                        isolate_global=use_pages,
+                        page=page,
+                        flow_values={item_var: item, index_var: index},
+                        hooks=item_hooks,
+                    )
+                finally:
+                    if page is not None:
+                        idle_pages.append(page)
+                return sub_rt.get_value(result_src), sub_rt.should_exit()
+
+        self.logger.info('   ForEach over %d items with sub flow ID: %s (concurrency=%d) >>>>>>>>', len(items), flow_id, concurrency)
+        try:
+            results = await gather_or_cancel([run_item(index, item) for index, item in enumerate(items)])
+        finally:
+            for page in opened_pages:
+                await self._close_branch_page(page)
+
+        io.outputs["results"] = [value for value, _ in results]
+        io.outputs["count"] = len(results)
+        if any(item_exit for _, item_exit in results):
+            self.runtime.set_current_node('__exit__')
+        self.logger.info('   ForEach with sub flow ID: %s finished <<<<<<<<', flow_id)
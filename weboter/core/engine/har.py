@@ -0,0 +1,48 @@
+from pathlib import Path
+
+
+HAR_MODES = ("record", "replay")
+
+
+def validate_har_mode(mode: str | None) -> str | None:
+    if not mode:
+        return None
+    if mode not in HAR_MODES:
+        raise ValueError(f"Invalid HAR mode '{mode}', expected one of: {', '.join(HAR_MODES)}")
+    return mode
+
+
+class HarSession:
+    """任务级 HAR 录制/回放设置。
+
+    record 模式下 OpenBrowser 创建的 BrowserContext 通过 record_har_path 录制全部网络请求，
+    context 关闭时写出 HAR；replay 模式下通过 route_from_har 从 HAR 响应请求，未录制的请求直接中止。
+    同一任务中第 N 个 context 使用第 N 个文件：<path>、<stem>-2<suffix>、<stem>-3<suffix>...
+    """
+
+    def __init__(self, mode: str, path: Path | str):
+        self.mode = validate_har_mode(mode)
+        if self.mode is None:
+            raise ValueError("HAR mode is required")
+        self.path = Path(path)
+        self._contexts = 0
+
+    def next_path(self) -> Path:
+        index = self._contexts
+        self._contexts += 1
+        if index == 0:
+            return self.path
+        return self.path.with_name(f"{self.path.stem}-{index + 1}{self.path.suffix}")
+
+    def context_options(self, path: Path) -> dict:
+        if self.mode == "record":
+            path.parent.mkdir(parents=True, exist_ok=True)
+            return {"record_har_path": str(path)}
+        return {}
+
+    async def attach(self, context, path: Path) -> None:
+        if self.mode != "replay":
+            return
+        if not path.is_file():
+            raise FileNotFoundError(f"HAR file not found for replay: {path}")
+        await context.route_from_har(str(path), not_found="abort")
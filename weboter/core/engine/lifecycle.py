@@ -0,0 +1,93 @@
+import logging
+from typing import Any, Callable, Iterable
+
+
+# 资源类型 -> 关闭方法；按登记的逆序关闭，页面先于 context，context 先于浏览器，最后停止 playwright
+RESOURCE_CLOSERS = {
+    "page": "close",
+    "context": "close",
+    "browser": "close",
+    "playwright": "stop",
+}
+
+
+def playwright_driver_pid(pw_instance: Any) -> int | None:
+    """读取 playwright driver 子进程的 pid；依赖 playwright 内部属性，读取失败时返回 None（泄漏检查结果为 unknown）"""
+    try:
+        pid = pw_instance._impl_obj._connection._transport._proc.pid
+    except Exception:
+        # 内部属性链随 playwright 版本变化，任何读取异常都按 pid 未知处理
+        return None
+    return pid if isinstance(pid, int) else None
+
+
+class ResourceTracker:
+    """登记任务期间创建的 playwright 实例、浏览器、context 与页面，任务结束时统一关闭。
+
+    同一任务的所有执行器共享一个 tracker；浏览器池持有的 playwright 实例与浏览器不登记，由池负责回收。
+    process_probe(pid) 返回 pid 的子孙进程，用于在关闭前记录 driver 拉起的浏览器进程，
+    以便任务结束后检查是否有进程泄漏。
+    """
+
+    def __init__(self, process_probe: Callable[[int], Iterable[int]] | None = None):
+        self.process_probe = process_probe
+        self._items: list[tuple[str, Any]] = []
+        self._ids: set[int] = set()
+        self._driver_pids: list[int] = []
+        # 读取不到 driver pid 的 playwright 实例数，此时无法判断是否泄漏
+        self.unknown_drivers = 0
+        # 关闭前记录的 driver 及其子孙进程 pid
+        self.process_ids: set[int] = set()
+
+    def register(self, kind: str, resource: Any) -> None:
+        if kind not in RESOURCE_CLOSERS:
+            raise ValueError(f"Unknown resource kind: {kind}")
+        if resource is None or id(resource) in self._ids:
+            return
+        self._ids.add(id(resource))
+        self._items.append((kind, resource))
+        if kind == "playwright":
+            pid = playwright_driver_pid(resource)
+            if pid is not None:
+                self._driver_pids.append(pid)
+            else:
+                self.unknown_drivers += 1
+
+    def forget(self, resource: Any) -> None:
+        """移除已由工作流自行关闭的资源，长时间运行的任务中登记列表不随之增长"""
+        if id(resource) not in self._ids:
+            return
+        self._ids.discard(id(resource))
+        self._items = [item for item in self._items if item[1] is not resource]
+
+    def summary(self) -> dict[str, int]:
+        counts = {kind: 0 for kind in RESOURCE_CLOSERS}
+        for kind, _ in self._items:
+            counts[kind] += 1
+        return counts
+
+    async def close_all(self, logger: logging.Logger | None = None) -> list[str]:
+        """按登记的逆序关闭全部资源，单个资源关闭失败不影响其余资源；返回失败信息"""
+        self._collect_processes()
+        errors: list[str] = []
+        while self._items:
+            kind, resource = self._items.pop()
+            self._ids.discard(id(resource))
+            try:
+                await getattr(resource, RESOURCE_CLOSERS[kind])()
+            except Exception as exc:
+                errors.append(f"{kind}: {exc}")
+        if errors and logger:
+            logger.warning("Resource teardown finished with %d error(s): %s", len(errors), "; ".join(errors))
+        return errors
+
+    def _collect_processes(self) -> None:
+        # driver 退出后浏览器进程会被过继给 init，必须在关闭前按父子关系记录
+        for pid in self._driver_pids:
+            self.process_ids.add(pid)
+            if self.process_probe is None:
+                continue
+            try:
+                self.process_ids.update(self.process_probe(pid))
+            except OSError:
+                pass
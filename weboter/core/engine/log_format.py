@@ -0,0 +1,38 @@
+import reprlib
+
+
+MAX_REPR_CHARS = 2000
+
+_repr = reprlib.Repr()
+_repr.maxlevel = 3
+_repr.maxdict = 20
+_repr.maxlist = 20
+_repr.maxtuple = 20
+_repr.maxset = 20
+_repr.maxstring = 200
+_repr.maxother = 200
+
+
+def truncated_repr(value, limit: int = MAX_REPR_CHARS) -> str:
+    """有长度上限的 repr，避免大对象（页面 HTML、长列表）拖慢日志"""
+    try:
+        text = _repr.repr(value)
+    except Exception:
+        text = f"<{type(value).__name__}>"
+    if len(text) > limit:
+        text = f"{text[:limit]}...(+{len(text) - limit} chars)"
+    return text
+
+
+class LazyRepr:
+    """延迟求值的 repr：仅在日志记录通过级别过滤后才格式化，任务日志在记录线程插值"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self) -> str:
+        return truncated_repr(self.value)
+
+    __repr__ = __str__
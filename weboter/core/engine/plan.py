@@ -0,0 +1,182 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from weboter.public.contracts.action import ActionBase
+from weboter.public.contracts.control import ControlBase
+from weboter.public.contracts.interface import LocatorDefine
+from weboter.public.model import Flow, Node, VarRef
+
+
+LOG_MODES = ("none", "short", "full")
+
+# 调试钩子粒度：all 每步都派发；page 只在会改变页面的节点派发；
+# errors 只在出错/断点/暂停时派发；every:N 每 N 步派发一次
+HOOK_MODES = ("all", "page", "errors")
+HOOK_MODE_EVERY_PREFIX = "every:"
+
+
+def parse_hook_mode(value: str) -> tuple[str, int]:
+    """解析钩子粒度，返回 (mode, interval)；非 every:N 时 interval 为 1"""
+    mode = (value or "all").strip().lower()
+    if mode in HOOK_MODES:
+        return mode, 1
+    if mode.startswith(HOOK_MODE_EVERY_PREFIX):
+        try:
+            interval = int(mode[len(HOOK_MODE_EVERY_PREFIX):])
+        except ValueError:
+            interval = 0
+        if interval >= 1:
+            return "every", interval
+    raise ValueError(f"Invalid hook mode '{value}', expected one of: all, page, errors, every:N")
+
+
+def split_values(values: Mapping[str, Any]) -> tuple[Mapping[str, Any], tuple[tuple[str, VarRef], ...]]:
+    """将 inputs/params 拆分为静态值与变量引用，变量引用在加载时即完成编译"""
+    static: dict[str, Any] = {}
+    variables: list[tuple[str, VarRef]] = []
+    for key, value in values.items():
+        ref = VarRef.parse(value)
+        if ref is None:
+            static[key] = value
+        else:
+            variables.append((key, ref))
+    return MappingProxyType(static), tuple(variables)
+
+
+LOCATOR_TYPE = "LocatorDefine"
+LOCATOR_LIST_TYPE = "LocatorDefine[]"
+
+
+def locator_input_names(action: ActionBase | None) -> dict[str, bool]:
+    """返回声明为 LocatorDefine 的输入名 -> 是否为列表"""
+    result: dict[str, bool] = {}
+    for declaration in getattr(action, "inputs", None) or []:
+        accepted = declaration.accepted_types or []
+        if LOCATOR_LIST_TYPE in accepted:
+            result[declaration.name] = True
+        elif LOCATOR_TYPE in accepted:
+            result[declaration.name] = False
+    return result
+
+
+def parse_locator_inputs(static_inputs: Mapping[str, Any], action: ActionBase | None, node_id: str) -> Mapping[str, Any]:
+    """把静态的 LocatorDefine 输入预先解析为不可变对象，action 执行时直接使用；变量引用仍在运行时解析"""
+    locator_inputs = locator_input_names(action)
+    if not locator_inputs or not any(name in static_inputs for name in locator_inputs):
+        return static_inputs
+    parsed = dict(static_inputs)
+    for name, is_list in locator_inputs.items():
+        value = parsed.get(name)
+        if value is None or value == [] or value == {}:
+            continue
+        try:
+            if is_list:
+                if not isinstance(value, list):
+                    raise ValueError("expected a list of locators")
+                parsed[name] = tuple(LocatorDefine.deserialize(item) for item in value)
+            else:
+                parsed[name] = LocatorDefine.deserialize(value)
+        except (ValueError, TypeError, AttributeError) as exc:
+            raise ValueError(f"Invalid locator for input '{name}' (node '{node_id}'): {exc}") from None
+    return MappingProxyType(parsed)
+
+
+def resolve_log_mode(node_log: str, flow_log: str) -> str:
+    # 与历史判断顺序保持一致：任一为 none 则静默，其次任一为 short 则简略输出
+    if node_log == "none" or flow_log == "none":
+        return "none"
+    if node_log == "short" or flow_log == "short":
+        return "short"
+    return "full"
+
+
+@dataclass(frozen=True, slots=True)
+class NodePlan:
+    """单个节点的执行计划：预绑定 action/control 实例，并预先拆分静态值与变量引用"""
+    node: Node
+    action: ActionBase | None
+    control: ControlBase | None
+    static_inputs: Mapping[str, Any]
+    var_inputs: tuple[tuple[str, VarRef], ...]
+    static_params: Mapping[str, Any]
+    var_params: tuple[tuple[str, VarRef], ...]
+    log_mode: str
+    touches_page: bool = True
+    hook_mode: tuple[str, int] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ExecutionPlan:
+    """工作流的不可变执行计划，节点修改时通过 with_node 生成新计划"""
+    flow: Flow
+    nodes: Mapping[str, NodePlan]
+
+    def get(self, node_id: str) -> NodePlan | None:
+        return self.nodes.get(node_id)
+
+    def with_node(self, node_plan: NodePlan) -> 'ExecutionPlan':
+        nodes = dict(self.nodes)
+        nodes[node_plan.node.node_id] = node_plan
+        return ExecutionPlan(flow=self.flow, nodes=MappingProxyType(nodes))
+
+
+def compile_node(node: Node, flow_log: str, action_manager, control_manager) -> NodePlan:
+    """编译单个节点；引用了未注册的 action/control 时立即抛出 ValueError"""
+    action = None
+    if node.action:
+        action = action_manager.get_action(node.action)
+        if not action:
+            raise ValueError(f"Action '{node.action}' not found (node '{node.node_id}')")
+    control = None
+    if node.control:
+        control = control_manager.get_control(node.control)
+        if not control:
+            raise ValueError(f"Control '{node.control}' not found (node '{node.node_id}')")
+    hook_mode = None
+    if node.hook_mode:
+        try:
+            hook_mode = parse_hook_mode(node.hook_mode)
+        except ValueError as exc:
+            raise ValueError(f"{exc} (node '{node.node_id}')") from None
+    static_inputs, var_inputs = split_values(node.inputs)
+    static_inputs = parse_locator_inputs(static_inputs, action, node.node_id)
+    static_params, var_params = split_values(node.params)
+    return NodePlan(
+        node=node,
+        action=action,
+        control=control,
+        static_inputs=static_inputs,
+        var_inputs=var_inputs,
+        static_params=static_params,
+        var_params=var_params,
+        log_mode=resolve_log_mode(node.log, flow_log),
+        # 只有 control 的节点不会改变页面
+        touches_page=bool(getattr(action, "touches_page", True)) if action else False,
+        hook_mode=hook_mode,
+    )
+
+
+def compile_flow(flow: Flow, action_manager, control_manager) -> ExecutionPlan:
+    """将单个 Flow 的节点编译为执行计划，不包含其子流程"""
+    nodes = {
+        node.node_id: compile_node(node, flow.log, action_manager, control_manager)
+        for node in flow.nodes
+    }
+    return ExecutionPlan(flow=flow, nodes=MappingProxyType(nodes))
+
+
+def compile_flow_tree(flow: Flow, action_manager, control_manager, cache: dict[int, ExecutionPlan]) -> ExecutionPlan:
+    """编译 flow 及其全部子流程（递归）并按 id(flow) 写入 cache，子流程中的错误同样在加载时抛出"""
+    plan = cache.get(id(flow))
+    if plan is not None and plan.flow is flow:
+        # 已缓存的计划在编译时已经递归编译过子流程
+        return plan
+    plan = compile_flow(flow, action_manager, control_manager)
+    for sub_flow in flow.sub_flows:
+        try:
+            compile_flow_tree(sub_flow, action_manager, control_manager, cache)
+        except ValueError as exc:
+            raise ValueError(f"{exc} (sub-flow '{sub_flow.flow_id}')") from None
+    cache[id(flow)] = plan
+    return plan
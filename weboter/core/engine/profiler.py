@@ -0,0 +1,143 @@
+from bisect import bisect_left
+import threading
+import time
+from typing import Any
+
+
+PROFILE_PHASES = ("resolve", "action", "extract", "control", "hooks", "log")
+
+# 直方图桶上界（毫秒），最后一个桶收纳所有更慢的样本
+BUCKET_BOUNDS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 30000)
+
+
+class TimingHistogram:
+    """耗时直方图：固定桶计数 + count/total/min/max"""
+
+    __slots__ = ("count", "total_ms", "min_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms: float | None = None
+        self.max_ms: float | None = None
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def add(self, value_ms: float):
+        self.count += 1
+        self.total_ms += value_ms
+        if self.min_ms is None or value_ms < self.min_ms:
+            self.min_ms = value_ms
+        if self.max_ms is None or value_ms > self.max_ms:
+            self.max_ms = value_ms
+        self.buckets[bisect_left(BUCKET_BOUNDS_MS, value_ms)] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min_ms, 3) if self.min_ms is not None else None,
+            "max_ms": round(self.max_ms, 3) if self.max_ms is not None else None,
+            "buckets": self.buckets.copy(),
+        }
+
+
+class StepTimer:
+    """单步计时器：Executor.step_one 内按阶段累加耗时"""
+
+    __slots__ = ("phases", "_mark")
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self._mark = time.perf_counter()
+
+    def lap(self, phase: str):
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._mark) * 1000
+        self._mark = now
+
+
+class StepProfiler:
+    """按节点与 action 聚合每一步各阶段耗时。
+
+    同一任务的所有执行器（含子流程）共享一个实例；聚合在任务线程中写入，
+    API 线程通过 snapshot() 读取，因此用锁保护。
+    子流程内的步骤已计入父节点（SubFlow / ForkJoin / ForEach）的 action 阶段，
+    phase_totals_ms 只累加根流程步骤，避免嵌套耗时重复计算。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.step_count = 0
+        self._by_node: dict[str, dict[str, Any]] = {}
+        self._by_action: dict[str, dict[str, TimingHistogram]] = {}
+        self._phase_totals: dict[str, float] = {phase: 0.0 for phase in PROFILE_PHASES}
+
+    def record(
+        self,
+        flow_id: str,
+        node_id: str,
+        node_name: str,
+        action: str,
+        phases: dict[str, float],
+        nested: bool = False,
+    ):
+        total = sum(phases.values())
+        with self._lock:
+            self.step_count += 1
+            if not nested:
+                for phase, value in phases.items():
+                    self._phase_totals[phase] = self._phase_totals.get(phase, 0.0) + value
+            key = f"{flow_id}/{node_id}"
+            entry = self._by_node.get(key)
+            if entry is None:
+                entry = {
+                    "flow_id": flow_id,
+                    "node_id": node_id,
+                    "node_name": node_name,
+                    "action": action,
+                    "phases": {},
+                    "total": TimingHistogram(),
+                }
+                self._by_node[key] = entry
+            self._add_phases(entry["phases"], phases)
+            entry["total"].add(total)
+
+            if action:
+                action_phases = self._by_action.setdefault(action, {})
+                self._add_phases(action_phases, phases)
+
+    @staticmethod
+    def _add_phases(target: dict[str, TimingHistogram], phases: dict[str, float]):
+        for phase, value in phases.items():
+            histogram = target.get(phase)
+            if histogram is None:
+                histogram = target[phase] = TimingHistogram()
+            histogram.add(value)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            nodes = []
+            for entry in self._by_node.values():
+                nodes.append({
+                    "flow_id": entry["flow_id"],
+                    "node_id": entry["node_id"],
+                    "node_name": entry["node_name"],
+                    "action": entry["action"],
+                    "total": entry["total"].to_dict(),
+                    "phases": {phase: hist.to_dict() for phase, hist in entry["phases"].items()},
+                })
+            actions = {
+                name: {phase: hist.to_dict() for phase, hist in phases.items()}
+                for name, phases in self._by_action.items()
+            }
+            phase_totals = dict(self._phase_totals)
+            step_count = self.step_count
+        nodes.sort(key=lambda item: item["total"]["total_ms"], reverse=True)
+        return {
+            "step_count": step_count,
+            "bucket_bounds_ms": list(BUCKET_BOUNDS_MS),
+            "phase_totals_ms": {phase: round(value, 3) for phase, value in phase_totals.items()},
+            "nodes": nodes,
+            "actions": actions,
+        }
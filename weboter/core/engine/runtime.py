@@ -1,4 +1,5 @@
 from weboter.public.model import *
+from .env_scope import EnvScope
 
 class DataContext:
 
@@ -7,11 +8,7 @@ class DataContext:
         """
         检查输入的变量名是否是可用的变量：形如 $env{name}
         """
-        if not key.startswith('$'):
-            return False
-        if '{' not in key or '}' not in key:
-            return False
-        return True
+        return VarRef.is_var(key)
     
     def __init__(self):
         self.data = {
@@ -22,57 +19,65 @@ class DataContext:
             'cur_outputs': {}
         }
 
+    @staticmethod
+    def compile(key: str) -> VarRef:
+        """
+        将变量名编译为 VarRef，编译结果按原始字符串缓存，重复查找不再重新解析
+        """
+        ref = VarRef.parse(key)
+        if ref is None:
+            raise KeyError(f"输入的变量名格式不正确: {key}")
+        return ref
+
     def get_data(self, key: str):
         """
         根据变量名获取对应的值
         变量名形如 $env{name}、$global{name}、$flow{name}、$prev_outputs{name}、$cur_outputs{name}
         """
-        if not self.contains_var(key):
-            raise KeyError(f"输入的变量名格式不正确: {key}")
-        
-        prefix_end = key.index('{')
-        suffix_start = key.index('}')
-        prefix = key[1:prefix_end]
-        var_name = key[prefix_end + 1:suffix_start]
+        return self.get_ref(self.compile(key))
+
+    def set_data(self, key: str, value):
+        """
+        根据变量名设置对应的值
+        变量名形如 $env{name}、$global{name}、$flow{name}、$prev_outputs{name}、$cur_outputs{name}
+        """
+        self.set_ref(self.compile(key), value)
 
-        if prefix not in self.data:
-            raise KeyError(f"未知的变量前缀: {prefix}")
+    def get_ref(self, ref: VarRef):
+        """根据已编译的变量引用获取对应的值"""
+        collection = self.data.get(ref.prefix)
+        if collection is None and ref.prefix not in self.data:
+            raise KeyError(f"未知的变量前缀: {ref.prefix}")
 
         # name 允许 aa.bb.cc 的形式
-        collection = self.data[prefix]
-        parts = var_name.split('.')
         value = collection
-        for part in parts:
+        for part in ref.path:
             if part not in value:
                 return None
             value = value[part]
+        if isinstance(value, EnvScope):
+            # 读取 $env 分组时返回普通 dict，保持与历史行为一致
+            return value.to_dict()
         return value
 
-    def set_data(self, key: str, value):
-        """
-        根据变量名设置对应的值
-        变量名形如 $env{name}、$global{name}、$flow{name}、$prev_outputs{name}、$cur_outputs{name}
-        """
-        if not self.contains_var(key):
-            raise KeyError(f"输入的变量名格式不正确: {key}")
-        
-        prefix_end = key.index('{')
-        suffix_start = key.index('}')
-        prefix = key[1:prefix_end]
-        var_name = key[prefix_end + 1:suffix_start]
+    def set_ref(self, ref: VarRef, value):
+        """根据已编译的变量引用设置对应的值"""
+        collection = self.data.get(ref.prefix)
+        if collection is None and ref.prefix not in self.data:
+            raise KeyError(f"未知的变量前缀: {ref.prefix}")
 
-        if prefix not in self.data:
-            raise KeyError(f"未知的变量前缀: {prefix}")
+        if isinstance(collection, EnvScope):
+            # $env 为分层只读视图，写入落在当前 runtime 的写时复制层
+            collection.set_path(ref.path, value)
+            return
 
-        # name 允许 aa.bb.cc 的形式
-        collection = self.data[prefix]
-        parts = var_name.split('.')
         current = collection
-        for part in parts[:-1]:
+        path = ref.path
+        for part in path[:-1]:
             if part not in current or not isinstance(current[part], dict):
                 current[part] = {}
             current = current[part]
-        current[parts[-1]] = value
+        current[path[-1]] = value
 
     def store_outputs(self, outputs: dict, out_cfgs: list[NodeOutputConfig] | None = None):
         """
@@ -139,12 +144,19 @@ class DataContext:
 
 class Runtime:
     
-    def __init__(self, managed_env: dict | None = None):
+    def __init__(self, managed_env: dict | None = None, env: EnvScope | None = None):
         self.flow: Flow | None = None
         self.nodes = {}
         self.data_context = DataContext()
-        self.__load_environment(managed_env)
+        # env 由上层（任务或父 runtime）提供时直接复用，不再逐项拷贝环境变量
+        if env is None:
+            env = EnvScope.build(managed_env)
+        self.data_context.data['env'] = env
         self.current_node_id: str | None = None
+
+    @property
+    def env(self) -> EnvScope:
+        return self.data_context.data['env']
     
     def finished(self) -> bool:
         return self.current_node_id == '__end__' or self.current_node_id == '__exit__'
@@ -162,6 +174,12 @@ class Runtime:
     
     def set_value(self, key: str, value):
         self.data_context.set_data(key, value)
+
+    def get_ref(self, ref: VarRef):
+        return self.data_context.get_ref(ref)
+
+    def set_ref(self, ref: VarRef, value):
+        self.data_context.set_ref(ref, value)
     
     def store_outputs(self, outputs: dict, out_cfgs: list[NodeOutputConfig] | None = None):
         self.data_context.store_outputs(outputs, out_cfgs)
@@ -192,20 +210,3 @@ class Runtime:
 
     def copy_data(self, other: 'Runtime', prefix: str = ""):
         self.data_context.copy_data(other.data_context, prefix)
-
-    def __load_environment(self, managed_env: dict | None = None):
-        # 先加载系统环境变量，再加载 service 内部受管环境变量，后者可以覆盖前者。
-        import os
-        for key, value in os.environ.items():
-            self.data_context.set_data(f"$env{{{key}}}", value)
-        if managed_env:
-            self.__load_env_mapping(managed_env)
-
-    def __load_env_mapping(self, data: dict, prefix: str = ""):
-        for key, value in data.items():
-            name = f"{prefix}.{key}" if prefix else key
-            if isinstance(value, dict):
-                self.__load_env_mapping(value, name)
-                continue
-            self.data_context.set_data(f"$env{{{name}}}", value)
-    
\ No newline at end of file
@@ -0,0 +1,102 @@
+import json
+import os
+from pathlib import Path
+import re
+import tempfile
+import time
+from typing import Any
+
+
+PROFILE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$")
+
+
+def validate_profile_name(profile: str) -> str:
+    if not isinstance(profile, str) or not PROFILE_NAME_PATTERN.match(profile):
+        raise ValueError(f"Invalid storage profile name: {profile!r}; use letters, digits, '_', '.', '-'")
+    return profile
+
+
+class StorageStateStore:
+    """按 profile 名称保存浏览器 storage state（cookies + localStorage）：<root>/<profile>.json。
+
+    文件包含登录态，权限设为仅当前用户可读写；过期条目在读取时删除。
+    """
+
+    def __init__(self, root: Path, default_ttl: float = 86400):
+        self.root = root
+        self.default_ttl = float(default_ttl)
+
+    def path(self, profile: str) -> Path:
+        return self.root / f"{validate_profile_name(profile)}.json"
+
+    def save(self, profile: str, state: dict[str, Any], ttl: float | None = None) -> dict[str, Any]:
+        ttl = self.default_ttl if ttl is None else float(ttl)
+        if ttl <= 0:
+            raise ValueError("Storage state ttl must be positive")
+        path = self.path(profile)
+        now = time.time()
+        entry = {"profile": profile, "saved_at": now, "expires_at": now + ttl, "state": state}
+        self.root.mkdir(parents=True, exist_ok=True)
+        # 多个任务可能同时刷新同一 profile，每次写入使用独立的临时文件
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, prefix=f".{profile}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file_obj:
+                json.dump(entry, file_obj, ensure_ascii=False, separators=(",", ":"))
+            os.chmod(tmp_name, 0o600)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return self._describe(entry)
+
+    def load(self, profile: str, max_age: float | None = None) -> dict[str, Any] | None:
+        """返回未过期的 storage state；max_age 额外限制距上次保存的秒数"""
+        path = self.path(profile)
+        if not path.is_file():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as file_obj:
+                entry = json.load(file_obj)
+            saved_at = float(entry["saved_at"])
+            expires_at = float(entry["expires_at"])
+            state = entry["state"]
+        except (OSError, ValueError, KeyError, TypeError):
+            path.unlink(missing_ok=True)
+            return None
+        now = time.time()
+        if expires_at <= now:
+            path.unlink(missing_ok=True)
+            return None
+        if max_age and now - saved_at > float(max_age):
+            return None
+        return state
+
+    def delete(self, profile: str) -> bool:
+        path = self.path(profile)
+        existed = path.is_file()
+        path.unlink(missing_ok=True)
+        return existed
+
+    def list_profiles(self) -> list[dict[str, Any]]:
+        items = []
+        if not self.root.is_dir():
+            return items
+        for path in sorted(self.root.glob("*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as file_obj:
+                    items.append(self._describe(json.load(file_obj)))
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+        return items
+
+    @staticmethod
+    def _describe(entry: dict[str, Any]) -> dict[str, Any]:
+        state = entry.get("state") or {}
+        return {
+            "profile": entry["profile"],
+            "saved_at": entry["saved_at"],
+            "expires_at": entry["expires_at"],
+            "expired": entry["expires_at"] <= time.time(),
+            "cookies": len(state.get("cookies") or []),
+            "origins": len(state.get("origins") or []),
+        }
@@ -25,7 +25,8 @@ class WorkflowReader:
                     outputs=[NodeOutputConfig(**output) for output in node.get('outputs', [])],
                     control=node.get('control', ''),
                     params=node.get('params', {}),
-                    log=node.get('log', 'short')
+                    log=node.get('log', 'short'),
+                    hook_mode=node.get('hook_mode', '')
                 ) for node in data['nodes']
             ]
 
@@ -77,6 +78,7 @@ class WorkflowWriter:
                     "control": node.control,
                     "params": node.params,
                     "log": node.log,
+                    **({"hook_mode": node.hook_mode} if node.hook_mode else {}),
                 }
                 for node in flow.nodes
             ],
@@ -474,13 +474,19 @@ def create_mcp_server() -> FastMCP:
             execute: bool = True,
             pause_before_start: bool = False,
             breakpoints: list[dict[str, Any]] | None = None,
+            hook_mode: str = "all",
+            har_mode: str | None = None,
+            har_path: str | None = None,
         ) -> dict[str, Any]:
-            """上传一个 workflow 文件到 service，并可选在创建 session 时预设起步即停或断点。"""
+            """上传一个 workflow 文件到 service，并可选在创建 session 时预设起步即停或断点；har_mode=record/replay 录制或回放网络请求。"""
             return client.upload_workflow(
                 Path(path),
                 execute=execute,
                 pause_before_start=pause_before_start,
                 breakpoints=breakpoints,
+                hook_mode=hook_mode,
+                har_mode=har_mode,
+                har_path=har_path,
             )
 
     if "workflow_submit_managed" in enabled_tools:
@@ -490,8 +496,11 @@ def create_mcp_server() -> FastMCP:
             directory: str | None = None,
             pause_before_start: bool = False,
             breakpoints: list[dict[str, Any]] | None = None,
+            hook_mode: str = "all",
+            har_mode: str | None = None,
+            har_path: str | None = None,
         ) -> dict[str, Any]:
-            """从指定目录或 service 管理目录中选择 workflow，并在提交时预设起步即停或断点。"""
+            """从指定目录或 service 管理目录中选择 workflow，并在提交时预设起步即停或断点；har_mode=record/replay 录制或回放网络请求。"""
             target_directory = directory or managed_workflow_directory()
             return client.handle_directory(
                 target_directory,
@@ -499,6 +508,9 @@ def create_mcp_server() -> FastMCP:
                 execute=True,
                 pause_before_start=pause_before_start,
                 breakpoints=breakpoints,
+                hook_mode=hook_mode,
+                har_mode=har_mode,
+                har_path=har_path,
             )
 
     if "workflow_delete_managed" in enabled_tools:
@@ -540,9 +552,16 @@ def create_mcp_server() -> FastMCP:
 
     if "session_snapshots" in enabled_tools:
         @server.tool()
-        def session_snapshots(session_id: str, limit: int = 20) -> dict[str, Any]:
-            """读取执行会话快照摘要。返回每个快照可进一步获取的 sections，而不是一次性返回全部内容。"""
-            return client.get_session_snapshots(session_id, limit)
+        def session_snapshots(
+            session_id: str,
+            limit: int = 20,
+            cursor: int | None = None,
+            phase: str | None = None,
+            node_id: str | None = None,
+        ) -> dict[str, Any]:
+            """读取执行会话快照摘要（由新到旧）。返回每个快照可进一步获取的 sections，而不是一次性返回全部内容。
+            可按 phase、node_id 过滤；next_cursor 不为空时作为 cursor 传入读取下一页。"""
+            return client.get_session_snapshots(session_id, limit, cursor=cursor, phase=phase, node_id=node_id)
 
     if "session_snapshot_detail" in enabled_tools:
         @server.tool()
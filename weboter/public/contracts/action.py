@@ -18,6 +18,11 @@ class ActionBase(ABC):
     description: str = "Base class for actions"
     inputs: list[InputFieldDeclaration] = []
     outputs: list[OutputFieldDeclaration] = []
+    # 是否可能改变页面状态；纯数据 action 置为 False，hook_mode=page 时跳过其调试钩子
+    touches_page: bool = True
+    # 输出只取决于 inputs 的 I/O 密集 action（如网络请求）可声明 cacheable，启用输出缓存时按 action 名称 + inputs 复用结果
+    cacheable: bool = False
+    cache_ttl: float | None = None  # 秒，None 表示使用缓存配置的默认值
 
     def __init__(self, name: str = "BaseAction"):
         self.name = name
@@ -28,4 +33,8 @@ class ActionBase(ABC):
         Execute the action with the given input and output.
         User defined actions must override this method.
         """
-        raise NotImplementedError("Subclasses must implement this method.")
\ No newline at end of file
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def should_cache(self, outputs: dict) -> bool:
+        """cacheable action 执行完成后判断本次输出是否允许写入缓存，可用于排除失败响应"""
+        return True
\ No newline at end of file
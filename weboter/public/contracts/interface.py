@@ -1,4 +1,5 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
 
 @dataclass
 class InputFieldDeclaration:
@@ -17,31 +18,52 @@ class OutputFieldDeclaration:
     type: str = "any" # Data type of the field
 
 
-@dataclass
+def _freeze(value):
+    # convert nested dict/list values in ext to tuples, only used for hashing
+    if isinstance(value, (dict, MappingProxyType)):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+@dataclass(frozen=True)
 class LocatorDefine:
-    """Define a locator declaration"""
+    """Define a locator declaration (immutable and hashable, parsed once at workflow load)"""
     element: str
     type: str = "text"  # Type of the locator (role, text, label, placeholder, alt, title, testid, css, xpath)
-    ext: dict = field(default_factory=dict)  # Additional locator information
+    ext: dict = field(default_factory=dict)  # Additional locator information, read-only after creation
     # Position of the element if multiple are found, accepted values: "first", "last", "all", or an integer index (0-based)
     pos: str | int = "first"
     sub: 'LocatorDefine | None' = None  # Optional sub-locator for nested elements
 
+    def __post_init__(self):
+        object.__setattr__(self, "ext", MappingProxyType(dict(self.ext or {})))
+
+    def __hash__(self):
+        return hash((self.element, self.type, _freeze(self.ext), self.pos, self.sub))
+
+    def with_pos(self, pos: str | int, innermost: bool = False) -> 'LocatorDefine':
+        """Return a copy with another pos; innermost=True changes the deepest sub locator instead"""
+        if innermost and self.sub:
+            return replace(self, sub=self.sub.with_pos(pos, innermost=True))
+        return replace(self, pos=pos)
+
     def to_dict(self) -> dict:
         return {
             "element": self.element,
             "type": self.type,
-            "ext": self.ext,
+            "ext": dict(self.ext),
             "pos": self.pos
         }
     
     @classmethod
-    def from_dict(cls, data: dict) -> 'LocatorDefine':
+    def from_dict(cls, data: dict, sub: 'LocatorDefine | None' = None) -> 'LocatorDefine':
         return cls(
             element=data.get("element", ""),
             type=data.get("type", "text"),
             ext=data.get("ext", {}),
-            pos=data.get("pos", "first")
+            pos=data.get("pos", "first"),
+            sub=sub
         )
     
     def to_list(self) -> list:
@@ -58,15 +80,16 @@ class LocatorDefine:
         """
         if not data or not isinstance(data, list):
             raise ValueError("Input data must be a non-empty list")
-        inst = cls.from_dict(data[0])
-        inst.sub = cls.from_list(data[1:]) if len(data) > 1 else None
-        return inst
+        return cls.from_dict(data[0], sub=cls.from_list(data[1:]) if len(data) > 1 else None)
     
     def serialize(self) -> str:
         return self.to_list() if self.sub else self.to_dict()
 
     @classmethod
-    def deserialize(cls, data: dict | list) -> 'LocatorDefine':
+    def deserialize(cls, data: 'dict | list | LocatorDefine') -> 'LocatorDefine':
+        if isinstance(data, LocatorDefine):
+            # already parsed when the workflow was loaded
+            return data
         if isinstance(data, list):
             return cls.from_list(data)
         elif isinstance(data, dict):
@@ -5,8 +5,10 @@ Defines core data structures for workflow representation:
 - Node: Workflow operation with action, control, inputs and outputs
 - Link: Connection between workflow nodes
 - DataContext: Runtime execution state
+- VarRef: 已编译的变量引用（$prefix{a.b.c}）
 """
 
 from .model import Node, Flow, NodeOutputConfig, NodeId
+from .var_ref import VarRef
 
-__all__ = ["Node", "Flow", "NodeOutputConfig", "NodeId"]
+__all__ = ["Node", "Flow", "NodeOutputConfig", "NodeId", "VarRef"]
@@ -31,6 +31,7 @@ class Node:
     control: str = ""  # 流程控制 格式: "package.ControlClass"
     params: Dict[str, str] = field(default_factory=dict)  # 控制参数
     log: str = "short"  # log level for this node, accepted values: "none", "short", "full"
+    hook_mode: str = ""  # 调试钩子粒度，空表示沿用任务设置，可选 "all" / "page" / "errors" / "every:N"
 
 @dataclass
 class Flow:
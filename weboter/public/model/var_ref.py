@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+VAR_REF_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class VarRef:
+    """已编译的变量引用，形如 $prefix{a.b.c}。
+
+    raw 为原始字符串，prefix 为作用域名（env/global/flow/...），path 为按 '.' 拆分后的路径。
+    解析规则与历史实现保持一致：取第一个 '{' 与第一个 '}' 之间的内容作为变量名，
+    因此内部键 `$global{{current_page}}` 会被解析为路径 ('{current_page',)。
+    """
+    raw: str
+    prefix: str
+    path: tuple[str, ...]
+
+    @staticmethod
+    def is_var(key) -> bool:
+        """检查输入是否是变量引用：以 $ 开头，且同时包含 '{' 和 '}'。"""
+        if not isinstance(key, str):
+            return False
+        return key.startswith('$') and '{' in key and '}' in key
+
+    @classmethod
+    def parse(cls, key) -> 'VarRef | None':
+        """编译变量引用；不是合法变量引用时返回 None。结果按原始字符串做有界 LRU 缓存。"""
+        if not isinstance(key, str):
+            return None
+        return _compile(key)
+
+    @property
+    def name(self) -> str:
+        return '.'.join(self.path)
+
+    def __str__(self) -> str:
+        return self.raw
+
+
+@lru_cache(maxsize=VAR_REF_CACHE_SIZE)
+def _compile(key: str) -> VarRef | None:
+    if not VarRef.is_var(key):
+        return None
+    prefix_end = key.index('{')
+    suffix_start = key.index('}')
+    prefix = key[1:prefix_end]
+    var_name = key[prefix_end + 1:suffix_start]
+    return VarRef(raw=key, prefix=prefix, path=tuple(var_name.split('.')))
+
+
+def var_ref_cache_info():
+    """返回编译缓存的命中统计，便于基准测试与排查。"""
+    return _compile.cache_info()